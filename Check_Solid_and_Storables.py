@@ -1,7 +1,7 @@
 import propellant_tank_calculations as Calcs
 import Mass_functions as Mfunc
 import numpy as np
-from typing import Tuple
+from typing import Dict, Optional, Tuple
 
 from dictionaries import fuel_ratios, prop_densities
 
@@ -36,7 +36,7 @@ def Check_Solid_and_Storables(
         tank_radius     : float = 2.6, 
         tank_height     : float = np.nan, 
         Num_Tank        : int = 1,
-
+        coefficients    : Optional[Dict] = None,
     )-> Tuple[float, float, float, float]:
 
     '''
@@ -46,6 +46,7 @@ def Check_Solid_and_Storables(
         Num_Tank            (Int)   : Number of identical tanks to split propellant across
         tank_radius         (Float) : Preferred tank radius (m). If tank_height is NaN, Calcs.find_cyl_tank_dim can compute height.
         tank_height         (Float) : Preferred tank height (m). If NaN, Calcs.find_cyl_tank_dim can compute height.
+        coefficients        (Dict)  : MER coefficient overrides, see Mass_functions.MER_COEFFICIENTS
 
     Outputs: 
         tank_radius         (Float) : Final tank radius used (m)
@@ -90,7 +91,7 @@ def Check_Solid_and_Storables(
         )
 
         # prepare return values
-        Tank_Mass = Num_Tank*Mfunc.Motor_Casing(M_pr/Num_Tank)
+        Tank_Mass = Num_Tank*Mfunc.Motor_Casing(M_pr/Num_Tank, **Mfunc.mer_kwargs(coefficients, 'Motor_Casing'))
         Insulation_mass = 0
         tank_radius = casing_radius
         total_height = casing_height
@@ -1,23 +1,95 @@
 import numpy as np
-from typing import Dict
+from typing import Dict, Optional
+
+from dictionaries import mixture_names
+from property_tables import to_mixture_codes
+
+# Every estimator works element-wise: thrusts, masses, areas, lengths, coefficients and
+# mixtures may be scalars or NumPy arrays that broadcast against each other. Scalar inputs
+# return a scalar, array inputs return an array of the broadcast shape.
+
+# Default coefficients of the mass estimating relationships, these are the keyword arguments
+# of the functions below. Pass arrays instead to evaluate many coefficient sets at once.
+MER_COEFFICIENTS: Dict[str, Dict[str, float]] = {
+    'Rocket_Engine' : {'thrust_coefficient': 7.81e-4, 'expansion_coefficient': 3.37e-5, 'fixed_mass': 59},
+    'Motor_Casing'  : {'coefficient': 0.135},
+    'Struct_Mass'   : {'coefficient': 2.25e-4},
+    'M_fairing'     : {'coefficient': 4.95, 'exponent': 1.15},
+    'M_avionic'     : {'coefficient': 10, 'exponent': 0.361},
+    'M_wiring'      : {'coefficient': 1.058, 'exponent': 0.25},
+    'M_gimbals'     : {'coefficient': 237.8, 'exponent': 0.9375},
+}
+
+
+def mer_kwargs(coefficients: Optional[Dict[str, Dict[str, object]]], function: str)-> Dict[str, object]:
+    """
+    Inputs:
+        coefficients (Dict[str, Dict[str, object]]): coefficient overrides per function, None for the defaults
+        function     (str)                        : function name, e.g. 'M_fairing'
+
+    Output:
+        kwargs (Dict[str, object]): keyword arguments to pass to the function
+    """
+    if coefficients is None:
+        return {}
+    return coefficients.get(function, {})
+
+
+def take_coefficients(
+        coefficients    : Optional[Dict[str, Dict[str, object]]],
+        index           : np.ndarray,
+        size            : int,
+    )-> Optional[Dict[str, Dict[str, object]]]:
+    """
+    Inputs:
+        coefficients (Dict[str, Dict[str, object]]): coefficient overrides, scalars or arrays of size designs
+        index        (np.ndarray)                  : designs to keep
+        size         (int)                         : number of designs the arrays belong to
+
+    Output:
+        coefficients (Dict[str, Dict[str, object]]): the overrides of the kept designs, scalars unchanged
+    """
+    if coefficients is None:
+        return None
+    return {
+        function: {
+            name: value if np.ndim(value) == 0 else np.broadcast_to(value, size)[index]
+            for name, value in kwargs.items()
+        }
+        for function, kwargs in coefficients.items()
+    }
+
+
+def _mixture_values(values, mixture):
+    # per-mixture value(s) of a mixture name, integer code or array of names / codes,
+    # values is a dict keyed by mixture name or an array indexed by mixture code
+    if isinstance(mixture, str) and isinstance(values, dict):
+        return values[mixture]
+    if isinstance(values, dict):
+        values = np.array([values[name] for name in mixture_names], dtype=float)
+    return np.asarray(values)[to_mixture_codes(mixture)]
+
 
 # Rocket Engine Mass
 # Inputs:
 #   Thrust      : Thrust produced by the engine [Newtons]
-#   Mixture     : Type of mixture, correlates to a specific Ae/At
-#   Stage number: Stage 1 or 2
+#   Mixture     : mixture name, integer mixture code or array of either, correlates to a specific Ae/At
+#   Stage number: Stage 1 or 2, Ae/At by mixture name (dict) or by mixture code (array, see property_tables)
+#   thrust_coefficient, expansion_coefficient, fixed_mass : MER coefficients
 # Output:
 #   Mass of rocket engine [kg]
 def Rocket_Engine(
         Thrust                  : float,
         mixture                 : str,
         Expansion_ratio_stage   : Dict[str, float],
-
+        thrust_coefficient      : float = 7.81*10**(-4),
+        expansion_coefficient   : float = 3.37*10**(-5),
+        fixed_mass              : float = 59,
     )-> float:
 
-    expansion_ratio = Expansion_ratio_stage[mixture]
+    expansion_ratio = _mixture_values(Expansion_ratio_stage, mixture)
 
-    engine_mass = 7.81*10**(-4)*Thrust + 3.37*10**(-5)*Thrust*np.sqrt(expansion_ratio) + 59
+    engine_mass = thrust_coefficient*Thrust + expansion_coefficient*Thrust*np.sqrt(expansion_ratio) + fixed_mass
     
     return engine_mass
 
@@ -25,62 +97,70 @@ def Rocket_Engine(
 # Motor Casing Mass
 # Inputs:
 #   M_pr : Propellant mass [kg]
+#   coefficient : MER coefficient
 # Output:
 #   Motor casing mass [kg]
-def Motor_Casing(M_pr: float)-> float:
-    return 0.135*M_pr
+def Motor_Casing(M_pr: float, coefficient: float = 0.135)-> float:
+    return coefficient*M_pr
 
 
 # Structural Mass
 # Inputs:
 #   Thrust : Thrust produced by the stage [Newtons]
+#   coefficient : MER coefficient
 # Output:
 #   Thrust Structure mass [kg]
-def Struct_Mass(Thrust: float)-> float:
-    return 2.25*10**(-4)*Thrust
+def Struct_Mass(Thrust: float, coefficient: float = 2.25*10**(-4))-> float:
+    return coefficient*Thrust
 
 
 # Payload Fairing Mass
 # Inputs:
 #   A_fairing : Fairing surface area [m^2]
+#   coefficient, exponent : MER coefficients
 # Output:
 #   Fairing mass [kg]
-def M_fairing(A_fairing: float)-> float:
-    return 4.95*A_fairing**1.15
+def M_fairing(A_fairing: float, coefficient: float = 4.95, exponent: float = 1.15)-> float:
+    return coefficient*A_fairing**exponent
 
 
 # Avionics Mass
 # Inputs:
 #   Mo : Stage initial mass [kg]
+#   coefficient, exponent : MER coefficients
 # Output:
 #   Avionics mass [kg]
-def M_avionic(Mo: float)-> float:
-    return 10*Mo**0.361
+def M_avionic(Mo: float, coefficient: float = 10, exponent: float = 0.361)-> float:
+    return coefficient*Mo**exponent
 
 
 # Wiring Mass
 # Inputs:
 #   Mo : Stage initial mass [kg]
 #   l  : Stage 1 length [m]
+#   coefficient, exponent : MER coefficients
 # Output:
 #   Wiring mass [kg]
-def M_wiring(Mo: float, l: float)-> float:
-    return 1.058*np.sqrt(Mo)*l**0.25
+def M_wiring(Mo: float, l: float, coefficient: float = 1.058, exponent: float = 0.25)-> float:
+    return coefficient*np.sqrt(Mo)*l**exponent
 
 
 # Gimbal Mass
 # Inputs:
 #   Thrust : Thrust produced by the engine [Newtons]
-#   Mixture: name of propellant mixture
-#   Stage_number: stage 1 or stage 2
+#   Mixture: mixture name, integer mixture code or array of either
+#   Stage_number: stage 1 or stage 2, chamber pressure by mixture name (dict) or by mixture code (array)
+#   coefficient, exponent : MER coefficients
 # Output:
 #   Gimbal mass [kg]
 def M_gimbals(
         Thrust                  : float,
         mixture                 : str,
-        Chamber_pressure_stage  : Dict[str, int], 
+        Chamber_pressure_stage  : Dict[str, int],
+        coefficient             : float = 237.8,
+        exponent                : float = 0.9375,
     )-> float:
 
-    Po = Chamber_pressure_stage[mixture]
+    Po = _mixture_values(Chamber_pressure_stage, mixture)
 
-    return 237.8*(Thrust/Po)**0.9375
+    return coefficient*(Thrust/Po)**exponent
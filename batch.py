@@ -0,0 +1,212 @@
+import itertools
+import json
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import IO, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from design_server import RESULT_COLUMNS, evaluate_parsed, parse_design, result_rows
+
+
+'''
+JSONL batch evaluation of designs, the command line counterpart of main.py.
+
+Every input line is one design object with the keys of design_server (X, s1_prop_mix,
+s2_prop_mix and optionally stage_1_radius, stage_2_radius, nose_h, nose_r, m_pl, the
+defaults being those of main.py). Every output line is the result object of the design
+on the same input line, in input order: the RESULT_COLUMNS values, NaN and infinities
+as null and feasible = false for non-physical designs. A line that is not a valid design
+(see design_server.parse_design) gives
+    {"line": <input line number>, "error": <message>}
+instead, blank lines are skipped.
+
+Lines are read in chunks of chunk_size designs and each chunk is parsed, evaluated with
+one design_pipeline.evaluate_designs call and encoded as JSONL in a worker process. At
+most two chunks per worker are in flight, so the input is streamed and memory does not
+grow with the file. Progress and throughput go to stderr.
+
+Usage Examples:
+    python batch.py designs.jsonl -o results.jsonl
+    python batch.py designs.jsonl --workers 8 --columns X total_mass feasible
+    cat designs.jsonl | python batch.py > results.jsonl
+
+    with open('designs.jsonl') as source, open('results.jsonl', 'w') as sink:
+        report = run_batch(source, sink, workers = 4)
+    print(report.designs / report.seconds, 'designs/s')
+'''
+
+
+@dataclass(slots=True)
+class BatchReport:
+    designs     : int       # result lines written
+    rejected    : int       # of which invalid designs
+    chunks      : int
+    seconds     : float     # wall time
+
+
+def evaluate_lines(
+        lines           : Sequence[Tuple[int, str]],
+        columns         : Optional[Sequence[str]] = None,
+        thrust_method   : str = 'fixed_point',
+    )-> Tuple[str, int]:
+    """
+    Inputs:
+        lines           (Sequence[Tuple[int, str]]) : (line number, JSON design object) of every design
+        columns         (Sequence[str])             : result columns written, defaults to RESULT_COLUMNS
+        thrust_method   (str)                       : thrust solver, see design_pipeline.evaluate_designs
+
+    Outputs:
+        text        (str): one JSONL result line per input line, in the same order
+        rejected    (int): lines that were not valid designs
+    """
+    designs = []
+    errors = {}
+    for position, (number, line) in enumerate(lines):
+        try:
+            designs.append(parse_design(json.loads(line)))
+        except (TypeError, ValueError) as err:
+            # json.JSONDecodeError is a ValueError as well, a bad line never stops the batch
+            errors[position] = {'line': number, 'error': str(err)}
+
+    rows = iter(result_rows(evaluate_parsed(designs, thrust_method)) if designs else [])
+    # strict JSON, result_rows gives None for non-finite values
+    out = []
+    for position in range(len(lines)):
+        if position in errors:
+            out.append(json.dumps(errors[position], allow_nan=False))
+            continue
+        row = next(rows)
+        if columns is not None:
+            row = {column: row[column] for column in columns}
+        out.append(json.dumps(row, allow_nan=False))
+
+    return ''.join(line + '\n' for line in out), len(errors)
+
+
+def _evaluate_chunk(task):
+    # ProcessPoolExecutor entry point, one argument tuple per chunk
+    return evaluate_lines(*task)
+
+
+def read_chunks(source: Iterable[str], chunk_size: int)-> Iterator[List[Tuple[int, str]]]:
+    """
+    Inputs:
+        source      (Iterable[str]) : JSONL lines
+        chunk_size  (int)           : designs per chunk
+
+    Output:
+        Iterator of chunks of (line number, line), blank lines left out, line numbers from 1
+    """
+    lines = ((number, line) for number, line in enumerate(source, 1) if line.strip())
+    while True:
+        chunk = list(itertools.islice(lines, chunk_size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def run_batch(
+        source              : Iterable[str],
+        sink                : IO[str],
+        workers             : Optional[int] = None,
+        chunk_size          : int = 2000,
+        columns             : Optional[Sequence[str]] = None,
+        thrust_method       : str = 'fixed_point',
+        progress            : Optional[IO[str]] = None,
+        progress_interval   : float = 1.0,
+    )-> BatchReport:
+    """
+    Inputs:
+        source              (Iterable[str]) : JSONL design lines, e.g. an open file or sys.stdin
+        sink                (IO[str])       : where the JSONL results are written
+        workers             (int)           : worker processes, defaults to os.cpu_count(), 1 runs in this process
+        chunk_size          (int)           : designs evaluated per evaluate_designs call
+        columns             (Sequence[str]) : result columns written, defaults to RESULT_COLUMNS
+        thrust_method       (str)           : thrust solver, see design_pipeline.evaluate_designs
+        progress            (IO[str])       : where progress lines are written, None for none
+        progress_interval   (float)         : seconds between progress lines
+
+    Output:
+        report (BatchReport): designs written, invalid lines, chunks and wall time
+    """
+    if columns is not None:
+        unknown = [column for column in columns if column not in RESULT_COLUMNS]
+        if unknown:
+            raise ValueError(f'Unknown result columns {", ".join(unknown)}')
+        columns = list(columns)
+    if chunk_size < 1:
+        raise ValueError('chunk_size must be at least 1')
+    workers = (os.cpu_count() or 1) if workers is None else workers
+
+    report = BatchReport(designs=0, rejected=0, chunks=0, seconds=0.0)
+    start = last_progress = time.perf_counter()
+
+    def write(text, rejected):
+        nonlocal last_progress
+        sink.write(text)
+        report.designs += text.count('\n')
+        report.rejected += rejected
+        report.chunks += 1
+        now = time.perf_counter()
+        if progress is not None and now - last_progress >= progress_interval:
+            last_progress = now
+            progress.write(f'{report.designs} designs, {report.designs / (now - start):.0f} designs/s\n')
+            progress.flush()
+
+    tasks = ((chunk, columns, thrust_method) for chunk in read_chunks(source, chunk_size))
+
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            # two chunks per worker in flight, results written in submission order
+            pending = deque(executor.submit(_evaluate_chunk, task) for task in itertools.islice(tasks, 2 * workers))
+            while pending:
+                text, rejected = pending.popleft().result()
+                for task in itertools.islice(tasks, 1):
+                    pending.append(executor.submit(_evaluate_chunk, task))
+                write(text, rejected)
+    else:
+        for task in tasks:
+            write(*_evaluate_chunk(task))
+
+    sink.flush()
+    report.seconds = time.perf_counter() - start
+    if progress is not None:
+        progress.write(f'{report.designs} designs ({report.rejected} rejected) in {report.seconds:.2f} s, '
+                       f'{report.designs / max(report.seconds, 1e-9):.0f} designs/s\n')
+        progress.flush()
+    return report
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Evaluate JSONL designs, results as JSONL in input order')
+    parser.add_argument('input', nargs='?', default='-', help='JSONL design file, - for stdin')
+    parser.add_argument('-o', '--output', default='-', help='JSONL result file, - for stdout')
+    parser.add_argument('--workers', type=int, default=None, help='worker processes, defaults to the CPU count')
+    parser.add_argument('--chunk-size', type=int, default=2000)
+    parser.add_argument('--columns', nargs='+', default=None, help='result columns, defaults to all')
+    parser.add_argument('--thrust-method', default='fixed_point', choices=['fixed_point', 'enumerate'])
+    parser.add_argument('--quiet', action='store_true', help='no progress on stderr')
+    args = parser.parse_args()
+
+    source = sys.stdin if args.input == '-' else open(args.input)
+    sink = sys.stdout if args.output == '-' else open(args.output, 'w')
+    try:
+        run_batch(
+            source,
+            sink,
+            workers=args.workers,
+            chunk_size=args.chunk_size,
+            columns=args.columns,
+            thrust_method=args.thrust_method,
+            progress=None if args.quiet else sys.stderr,
+        )
+    finally:
+        if source is not sys.stdin:
+            source.close()
+        if sink is not sys.stdout:
+            sink.close()
@@ -0,0 +1,116 @@
+import argparse
+import json
+import os
+import subprocess
+import sys
+from typing import Dict, List
+
+
+'''
+Import time of the project modules, measured with `python -X importtime` in a fresh
+interpreter per module so nothing is cached between measurements.
+
+Reports the cumulative import time of each module and which heavy dependencies
+(pandas, scipy, matplotlib) it pulls in. Results are written as JSON so runs can be
+compared, and --max-ms makes the script fail when a module gets slower than allowed.
+
+Usage Examples:
+    python benchmarks/import_time.py
+    python benchmarks/import_time.py --output import_time.json --max-ms 300
+'''
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# modules that run a single design evaluation, none of them should need a heavy dependency
+MODULES: List[str] = [
+    'main',
+    'design_pipeline',
+    'part1',
+    'sweep',
+    'export_fn',
+]
+
+HEAVY_DEPENDENCIES: List[str] = [
+    'pandas',
+    'scipy',
+    'matplotlib',
+]
+
+
+def measure_import(module: str, repeats: int = 5)-> Dict[str, object]:
+    """
+    Inputs:
+        module  (str): module to import
+        repeats (int): number of fresh interpreters, the fastest run is reported
+
+    Output:
+        result (Dict[str, object]): module, import time (ms) and heavy dependencies loaded,
+            import_ms is None and error holds the message if the import fails
+    """
+    best_us = None
+    loaded = set()
+    error = None
+    for _ in range(repeats):
+        completed = subprocess.run(
+            [sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+            cwd=REPO_ROOT,
+            capture_output=True,
+            text=True,
+        )
+        if completed.returncode != 0:
+            error = completed.stderr.strip().splitlines()[-1]
+            break
+
+        # lines look like: "import time:       self [us] |  cumulative | imported package"
+        cumulative_us = None
+        for line in completed.stderr.splitlines():
+            if not line.startswith('import time:') or '|' not in line:
+                continue
+            fields = [field.strip() for field in line[len('import time:'):].split('|')]
+            if not fields[1].isdigit():
+                continue
+            name = fields[2]
+            if name.split('.')[0] in HEAVY_DEPENDENCIES:
+                loaded.add(name.split('.')[0])
+            if name == module:
+                cumulative_us = int(fields[1])
+
+        if cumulative_us is not None and (best_us is None or cumulative_us < best_us):
+            best_us = cumulative_us
+
+    return {
+        'module'            : module,
+        'import_ms'         : None if best_us is None else best_us / 1000,
+        'heavy_dependencies': sorted(loaded),
+        'error'             : error,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Measure import time of the project modules')
+    parser.add_argument('--output', default='import_time.json', help='JSON results file')
+    parser.add_argument('--repeats', type=int, default=5, help='fresh interpreters per module')
+    parser.add_argument('--max-ms', type=float, default=None, help='fail if any module is slower')
+    args = parser.parse_args()
+
+    results = [measure_import(module, args.repeats) for module in MODULES]
+
+    with open(args.output, 'w') as file:
+        json.dump({'python': sys.version.split()[0], 'results': results}, file, indent=2)
+
+    for result in results:
+        if result['error'] is not None:
+            print(f"{result['module']:<20} failed: {result['error']}")
+            continue
+        heavy = ', '.join(result['heavy_dependencies']) or '-'
+        print(f"{result['module']:<20} {result['import_ms']:>8.1f} ms   heavy: {heavy}")
+
+    if args.max_ms is not None:
+        slow = [r['module'] for r in results if r['import_ms'] is not None and r['import_ms'] > args.max_ms]
+        if slow:
+            print(f'Import time regression (> {args.max_ms} ms): {", ".join(slow)}')
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,210 @@
+import argparse
+import contextlib
+import io
+import json
+import os
+import sys
+import tempfile
+import timeit
+import numpy as np
+from typing import Callable, Dict, List, Tuple
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+import Check_Solid_and_Storables as css
+import design_pipeline as dp
+import Fairing_area as fa
+import main as main_module
+import mass_estimation_part2 as me2
+import Mass_functions as Mfunc
+import propellant_tank_calculations as Calcs
+import thrust_convergance as tc
+
+from dictionaries import (
+    mixture_names,
+    Expansion_ratio_stage1,
+    Chamber_pressure_stage1,
+)
+from property_tables import stage_1_properties
+
+
+'''
+Microbenchmarks of every mass-estimating relationship and pipeline stage.
+
+Each benchmark is timed for a single (scalar) call and, where the function accepts
+arrays, for one batched call over BATCH_SIZE designs. Results are written as JSON;
+--compare flags every benchmark that got slower than --threshold times a previous run.
+
+Usage Examples:
+    python benchmarks/microbench.py --output bench.json
+    python benchmarks/microbench.py --output new.json --compare bench.json --threshold 1.25
+    python benchmarks/microbench.py --filter thrust
+'''
+
+BATCH_SIZE = 10000
+
+# (name, mode, number of designs per call, function)
+Benchmark = Tuple[str, str, int, Callable[[], object]]
+
+
+def _sized_design(X: float = 44, s1: str = 'LOX_RP1', s2: str = 'LOX_LH2')-> Dict[str, object]:
+    return dp.size_design(X, s1, s2)
+
+
+def _benchmarks()-> List[Benchmark]:
+    rng = np.random.default_rng(0)
+    n = BATCH_SIZE
+
+    thrust = rng.uniform(1e5, 5e6, n)
+    area = rng.uniform(10, 500, n)
+    mass = rng.uniform(1e4, 5e6, n)
+    length = rng.uniform(5, 80, n)
+    volume = rng.uniform(10, 3000, n)
+    radius = rng.uniform(1.5, 8, n)
+    height = rng.uniform(40, 80, n)
+    X = rng.uniform(30, 60, n)
+    codes = rng.integers(0, len(mixture_names), n)
+
+    expansion_ratio = stage_1_properties['expansion_ratio']
+    chamber_pressure = stage_1_properties['chamber_pressure']
+
+    benchmarks: List[Benchmark] = [
+        # Mass_functions
+        ('Rocket_Engine', 'scalar', 1, lambda: Mfunc.Rocket_Engine(1.9e6, 'LOX_RP1', Expansion_ratio_stage1)),
+        ('Rocket_Engine', 'batch', n, lambda: Mfunc.Rocket_Engine(thrust, codes, expansion_ratio)),
+        ('Motor_Casing', 'scalar', 1, lambda: Mfunc.Motor_Casing(1e6)),
+        ('Motor_Casing', 'batch', n, lambda: Mfunc.Motor_Casing(mass)),
+        ('Struct_Mass', 'scalar', 1, lambda: Mfunc.Struct_Mass(1.9e6)),
+        ('Struct_Mass', 'batch', n, lambda: Mfunc.Struct_Mass(thrust)),
+        ('M_fairing', 'scalar', 1, lambda: Mfunc.M_fairing(120.0)),
+        ('M_fairing', 'batch', n, lambda: Mfunc.M_fairing(area)),
+        ('M_avionic', 'scalar', 1, lambda: Mfunc.M_avionic(4e6)),
+        ('M_avionic', 'batch', n, lambda: Mfunc.M_avionic(mass)),
+        ('M_wiring', 'scalar', 1, lambda: Mfunc.M_wiring(4e6, 30.0)),
+        ('M_wiring', 'batch', n, lambda: Mfunc.M_wiring(mass, length)),
+        ('M_gimbals', 'scalar', 1, lambda: Mfunc.M_gimbals(1.9e6, 'LOX_RP1', Chamber_pressure_stage1)),
+        ('M_gimbals', 'batch', n, lambda: Mfunc.M_gimbals(thrust, codes, chamber_pressure)),
+
+        # propellant tanks
+        ('find_prop_mass_volume', 'scalar', 1, lambda: Calcs.find_prop_mass_volume(1e6, 'LOX', 'RP1', 'LOX_RP1')),
+        ('find_prop_mass_volume', 'batch', n, lambda: Calcs.find_prop_mass_volume(mass, 'LOX', 'RP1', 'LOX_RP1')),
+        ('find_cyl_tank_dim[radius]', 'scalar', 1, lambda: Calcs.find_cyl_tank_dim(1000.0, radius=3.0)),
+        ('find_cyl_tank_dim[radius]', 'batch', n, lambda: Calcs.find_cyl_tank_dim(volume, radius=radius)),
+        ('find_cyl_tank_dim[height]', 'scalar', 1, lambda: Calcs.find_cyl_tank_dim(1000.0, height=40.0)),
+        ('find_cyl_tank_dim[height]', 'batch', n, lambda: Calcs.find_cyl_tank_dim(volume, height=height)),
+    ]
+
+    for mixture in mixture_names:
+        benchmarks += [
+            (f'Check_Solid_and_Storables[{mixture}]', 'scalar', 1,
+                lambda mixture=mixture: css.Check_Solid_and_Storables(mixture, 1e6, tank_radius=3.0)),
+            (f'Check_Solid_and_Storables[{mixture}]', 'batch', n,
+                lambda mixture=mixture: css.Check_Solid_and_Storables(mixture, mass, tank_radius=radius)),
+        ]
+
+    sized = _sized_design()
+    thrust_args = (
+        sized['m_0'], sized['m_0_2'], sized['m_pr_1'], sized['m_pr_2'], sized['m_pl'],
+        sized['stage_1_other_masses'], sized['stage_2_other_masses'], 'LOX_RP1', 'LOX_LH2',
+    )
+    sized_batch = dp.size_design(X, 'LOX_RP1', 'LOX_LH2', stage_1_radius=np.full(n, 7.8))
+    thrust_batch_args = (
+        sized_batch['m_0'], sized_batch['m_0_2'], sized_batch['m_pr_1'], sized_batch['m_pr_2'], 26000,
+        sized_batch['stage_1_other_masses'], sized_batch['stage_2_other_masses'], 'LOX_RP1', 'LOX_LH2',
+    )
+
+    benchmarks += [
+        ('fairing_area', 'scalar', 1, lambda: fa.fairing_area(7.8, 30.0, 2.6, 45.0, 6, 2.6)),
+        ('fairing_area', 'batch', n, lambda: fa.fairing_area(radius, length, 2.6, height, 6, 2.6)),
+        ('thrust_convergance[fixed_point]', 'scalar', 1, lambda: tc.thrust_convergance(*thrust_args)),
+        ('thrust_convergance[enumerate]', 'scalar', 1, lambda: tc.thrust_convergance(*thrust_args, method='enumerate')),
+        ('thrust_convergance_batch', 'batch', n, lambda: tc.thrust_convergance_batch(*thrust_batch_args)),
+        ('thrust_convergance_batch[enumerate]', 'batch', n, lambda: tc.thrust_convergance_batch(*thrust_batch_args, method='enumerate')),
+        ('mass_estimation', 'scalar', 1, lambda: me2.mass_estimation(44, 'LOX_RP1', 'LOX_LH2')),
+        ('mass_estimation', 'batch', n, lambda: me2.mass_estimation(X, 'LOX_RP1', 'LOX_LH2')),
+
+        # end to end
+        ('evaluate_design', 'scalar', 1, lambda: dp.evaluate_design(44, 'LOX_RP1', 'LOX_LH2')),
+        ('evaluate_designs', 'batch', n, lambda: dp.evaluate_designs(
+            X, np.array(mixture_names)[codes], 'LOX_LH2', stage_1_radius=radius)),
+        ('main', 'scalar', 1, _run_main),
+    ]
+
+    return benchmarks
+
+
+def _run_main():
+    # main() prints its report and writes results.csv in the working directory
+    with tempfile.TemporaryDirectory() as directory, contextlib.redirect_stdout(io.StringIO()):
+        cwd = os.getcwd()
+        os.chdir(directory)
+        try:
+            main_module.main()
+        finally:
+            os.chdir(cwd)
+
+
+def time_benchmark(fn: Callable[[], object], repeats: int = 5)-> float:
+    """
+    Inputs:
+        fn      (callable): benchmark to time
+        repeats (int)     : timing repeats, the fastest is reported
+
+    Output:
+        seconds (float): time of one call
+    """
+    timer = timeit.Timer(fn)
+    number, _ = timer.autorange()
+    return min(timer.repeat(repeat=repeats, number=number)) / number
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Microbenchmarks of the mass estimating relationships and pipeline')
+    parser.add_argument('--output', default='bench.json', help='JSON results file')
+    parser.add_argument('--repeats', type=int, default=5, help='timing repeats per benchmark')
+    parser.add_argument('--filter', default='', help='only run benchmarks whose name contains this text')
+    parser.add_argument('--compare', default=None, help='previous JSON results to compare against')
+    parser.add_argument('--threshold', type=float, default=1.25, help='slowdown ratio reported as a regression')
+    args = parser.parse_args()
+
+    results = []
+    for name, mode, size, fn in _benchmarks():
+        if args.filter not in name:
+            continue
+        seconds = time_benchmark(fn, args.repeats)
+        results.append({
+            'name'          : name,
+            'mode'          : mode,
+            'size'          : size,
+            'seconds'       : seconds,
+            'us_per_design' : seconds / size * 1e6,
+        })
+        print(f'{name:<42} {mode:<7} {seconds * 1e6:>12.2f} us/call {seconds / size * 1e6:>10.3f} us/design')
+
+    with open(args.output, 'w') as file:
+        json.dump({
+            'python'    : sys.version.split()[0],
+            'numpy'     : np.__version__,
+            'batch_size': BATCH_SIZE,
+            'results'   : results,
+        }, file, indent=2)
+
+    if args.compare is not None:
+        with open(args.compare) as file:
+            previous = {(r['name'], r['mode']): r for r in json.load(file)['results']}
+
+        regressions = []
+        for result in results:
+            old = previous.get((result['name'], result['mode']))
+            if old is not None and result['seconds'] > args.threshold * old['seconds']:
+                regressions.append((result['name'], result['mode'], result['seconds'] / old['seconds']))
+
+        for name, mode, ratio in regressions:
+            print(f'Regression: {name} ({mode}) is {ratio:.2f}x slower')
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,192 @@
+import hashlib
+import json
+import os
+import numpy as np
+from typing import Dict, List
+
+
+'''
+Checkpoints of long runs split into deterministic chunks (sweeps, Monte Carlo).
+
+A run is a fixed list of chunks, numbered in the order they would be evaluated. Every
+finished chunk is saved to its own file and then recorded in a small manifest:
+
+    directory/
+        manifest.json       parameters hash, number of chunks, finished chunk numbers
+        chunk-000000.npz    result arrays of chunk 0
+        chunk-000001.npz
+        ...
+
+Files are written to a temporary name, synced and renamed into place, so a run killed at
+any point leaves either the previous or the new version of a file. A chunk file that is
+not in the manifest is ignored and evaluated again. On restart only the chunks missing from
+the manifest are evaluated, the others are read back, so an interrupted run gives the same
+results as one that was not. The manifest keeps a hash of the run parameters and refuses
+to resume a run with different ones.
+
+Usage Examples:
+    checkpoint = Checkpoint('sweep_checkpoint', {'X_values': [40, 44, 48], 'chunk_size': 2}, n_chunks = 2)
+    for i in checkpoint.unfinished():
+        checkpoint.save(i, evaluate_chunk(i))
+    chunks = [checkpoint.load(i) for i in range(checkpoint.n_chunks)]
+
+    sweep.sweep(X_values = np.arange(1, 100, 0.001), checkpoint_dir = 'sweep_checkpoint')
+'''
+
+MANIFEST = 'manifest.json'
+
+
+def parameters_hash(parameters: Dict[str, object])-> str:
+    """
+    Input:
+        parameters (Dict[str, object]): JSON serialisable run parameters, numpy scalars are taken as float
+
+    Output:
+        hash (str): 40 hex characters, the same for the same parameters in every run
+    """
+    return hashlib.sha1(json.dumps(parameters, sort_keys=True, default=float).encode()).hexdigest()
+
+
+def _replace(path: str, write)-> None:
+    # write through a temporary file, sync it and rename it into place
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'wb') as file:
+        write(file)
+        file.flush()
+        os.fsync(file.fileno())
+    os.replace(tmp_path, path)
+
+
+def chunk_path(directory: str, chunk: int)-> str:
+    """
+    Inputs:
+        directory   (str): checkpoint directory
+        chunk       (int): chunk number
+
+    Output:
+        path (str): file of the chunk results
+    """
+    return os.path.join(directory, f'chunk-{chunk:06d}.npz')
+
+
+def write_chunk(directory: str, chunk: int, designs: Dict[str, object])-> None:
+    """
+    Inputs:
+        directory   (str)               : checkpoint directory
+        chunk       (int)               : chunk number
+        designs     (Dict[str, object]) : result arrays of the chunk, e.g. evaluate_designs output
+
+    Writes the chunk file only, the chunk is finished once Checkpoint.mark_finished records it.
+    Safe to call from worker processes.
+    """
+    arrays = {}
+    for column, values in designs.items():
+        values = np.array(values) if isinstance(values, list) else np.asarray(values)
+        # names as fixed width strings, the file is read without pickle
+        arrays[column] = values.astype(str) if values.dtype == object else values
+    _replace(chunk_path(directory, chunk), lambda file: np.savez(file, **arrays))
+
+
+def read_chunk(directory: str, chunk: int)-> Dict[str, object]:
+    """
+    Inputs:
+        directory   (str): checkpoint directory
+        chunk       (int): chunk number
+
+    Output:
+        designs (Dict[str, object]): the arrays given to write_chunk, 2-D arrays as lists of
+            rows and strings as object arrays, like evaluate_designs returns them
+    """
+    designs = {}
+    with np.load(chunk_path(directory, chunk)) as data:
+        for column in data.files:
+            values = data[column]
+            if values.ndim == 2:
+                designs[column] = list(values)
+            else:
+                designs[column] = values.astype(object) if values.dtype.kind == 'U' else values
+    return designs
+
+
+class Checkpoint:
+    """
+    Inputs:
+        directory   (str)               : checkpoint directory, created if missing
+        parameters  (Dict[str, object]) : everything the chunk results depend on, JSON serialisable
+        n_chunks    (int)               : number of chunks of the run
+
+    Raises ValueError if the directory holds the checkpoint of a run with other parameters.
+    """
+
+    def __init__(
+            self,
+            directory   : str,
+            parameters  : Dict[str, object],
+            n_chunks    : int,
+        ):
+        self.directory = directory
+        self.n_chunks = n_chunks
+        self.parameters_hash = parameters_hash(parameters)
+        self.finished = set()
+
+        os.makedirs(directory, exist_ok=True)
+        manifest_path = os.path.join(directory, MANIFEST)
+        if os.path.exists(manifest_path):
+            with open(manifest_path) as file:
+                manifest = json.load(file)
+            if manifest['parameters_hash'] != self.parameters_hash or manifest['n_chunks'] != n_chunks:
+                raise ValueError(f'{directory} holds the checkpoint of a different run, use a new directory')
+            self.finished = set(manifest['finished'])
+        else:
+            self._write_manifest()
+
+    @property
+    def complete(self)-> bool:
+        return len(self.finished) == self.n_chunks
+
+    def is_finished(self, chunk: int)-> bool:
+        return chunk in self.finished
+
+    def unfinished(self)-> List[int]:
+        """
+        Output:
+            chunks (List[int]): numbers of the chunks still to evaluate, in order
+        """
+        return [chunk for chunk in range(self.n_chunks) if chunk not in self.finished]
+
+    def mark_finished(self, chunk: int)-> None:
+        """
+        Input:
+            chunk (int): chunk whose file has been written with write_chunk
+        """
+        self.finished.add(chunk)
+        self._write_manifest()
+
+    def save(self, chunk: int, designs: Dict[str, object])-> None:
+        """
+        Inputs:
+            chunk   (int)               : chunk number
+            designs (Dict[str, object]) : result arrays of the chunk
+        """
+        write_chunk(self.directory, chunk, designs)
+        self.mark_finished(chunk)
+
+    def load(self, chunk: int)-> Dict[str, object]:
+        """
+        Input:
+            chunk (int): number of a finished chunk
+
+        Output:
+            designs (Dict[str, object]): result arrays of the chunk, see read_chunk
+        """
+        if chunk not in self.finished:
+            raise ValueError(f'Chunk {chunk} is not finished')
+        return read_chunk(self.directory, chunk)
+
+    def _write_manifest(self)-> None:
+        manifest = {
+            'parameters_hash'   : self.parameters_hash,
+            'n_chunks'          : self.n_chunks,
+            'finished'          : sorted(self.finished),
+        }
+        _replace(os.path.join(self.directory, MANIFEST), lambda file: file.write(json.dumps(manifest).encode()))
@@ -0,0 +1,269 @@
+import numpy as np
+from dataclasses import fields
+from typing import Dict, Tuple
+
+import design_pipeline as dp
+import Mass_functions as Mfunc
+import mass_estimation_part2 as me2
+import thrust_convergance as tc
+
+from design_pipeline import MASS_MARGIN
+
+
+'''
+Converged designs: closing the inert mass fraction assumption of mass_estimation.
+
+mass_estimation sizes the propellant with assumed inert mass fractions delta_1 / delta_2,
+the rest of the design chain then gives the actual ones (s1_inert_m_frac = stage 1 inert
+mass / LV gross mass, s2_inert_m_frac = stage 2 inert mass / stage 2 gross mass). Closing
+the design means finding the fractions that reproduce themselves:
+
+    delta = G(delta),   G = mass_estimation -> tank sizing -> fairings -> thrust -> inert fractions
+
+At the fixed point the part 1 gross masses equal the final ones, so wiring and avionics
+are sized on the final masses as well.
+
+The fixed point is solved for every design at once. Each outer iteration is one call to
+design_pipeline.evaluate_designs on the designs that have not converged, the thrust iteration
+starting from the thrust of the previous outer iteration. The plain iteration delta = G(delta)
+already contracts by about 7x per step (the fractions oscillate around the fixed point),
+it is accelerated with Anderson mixing of the last two iterates, falling back to the plain
+step where the mixed one is undefined or leaves the physical range.
+
+Usage Examples:
+    designs = close_designs(np.arange(30, 60), 'LOX_RP1', 'LOX_LH2')
+    designs['delta_1'], designs['closure_iterations'], designs['closure_residual']
+
+    design = close_design(44, 'LOX_RP1', 'LOX_LH2')
+'''
+
+# Extra columns of a closed design
+CLOSURE_COLUMNS = [
+    'delta_1',
+    'delta_2',
+    'closure_iterations',
+    'closure_residual',
+    'closure_converged',
+]
+
+
+def _scatter(target, values, idx, keep):
+    # write the kept designs of a subset of evaluate_designs outputs back, the export lists column by column
+    for key, value in values.items():
+        if isinstance(value, list):
+            for column, column_values in zip(target[key], value):
+                column[idx[keep]] = column_values[keep]
+        else:
+            target[key][idx[keep]] = value[keep]
+
+
+def close_designs(
+        X,
+        s1_prop_mix,
+        s2_prop_mix,
+        stage_1_radius  = 2.6 * 3,
+        stage_2_radius  = 2.6,
+        nose_h          = 6,
+        nose_r          = 2.6,
+        m_pl            = 26000,
+        coefficients    = None,
+        mass_margin     = MASS_MARGIN,
+        tolerance       : float = 1e-6,
+        max_iterations  : int = 50,
+        accelerate      : bool = True,
+        initial_thrust_1= None,
+        initial_thrust_2= None,
+    )-> Dict[str, np.ndarray]:
+    """
+    Inputs:
+        same as design_pipeline.evaluate_designs, every input can be an array of designs
+        tolerance       (float) : absolute change of the inert mass fractions to call a design closed
+        max_iterations  (int)   : outer iteration limit
+        accelerate      (bool)  : Anderson acceleration, False for the plain fixed-point iteration
+
+    Outputs:
+        designs (Dict[str, np.ndarray]) : evaluate_designs outputs of the closed designs, plus
+            'delta_1', 'delta_2'    (float): closed inert mass fractions
+            'closure_iterations'    (int)  : evaluations of the design chain used by the design
+            'closure_residual'      (float): largest |G(delta) - delta| at the returned design
+            'closure_converged'     (bool) : residual below tolerance
+            thrust_evaluations is summed over the outer iterations.
+
+    Designs that are non-physical at the initial fractions, or become so while closing, are
+    returned with feasible = False and closure_converged = False.
+    """
+    s1_codes = tc.to_mixture_codes(s1_prop_mix)
+    s2_codes = tc.to_mixture_codes(s2_prop_mix)
+
+    inputs = dict(zip(
+        ('X', 's1_prop_mix', 's2_prop_mix', 'stage_1_radius', 'stage_2_radius', 'nose_h', 'nose_r', 'm_pl', 'mass_margin'),
+        [np.ravel(x) for x in np.broadcast_arrays(
+            np.asarray(X, dtype=float),
+            s1_codes,
+            s2_codes,
+            np.asarray(stage_1_radius, dtype=float),
+            np.asarray(stage_2_radius, dtype=float),
+            np.asarray(nose_h, dtype=float),
+            np.asarray(nose_r, dtype=float),
+            np.asarray(m_pl, dtype=float),
+            np.asarray(mass_margin, dtype=float),
+        )],
+    ))
+    n = inputs['X'].size
+
+    def evaluate(idx, delta_1, delta_2, thrust_1, thrust_2):
+        return dp.evaluate_designs(
+            coefficients=Mfunc.take_coefficients(coefficients, idx, n),
+            initial_thrust_1=thrust_1,
+            initial_thrust_2=thrust_2,
+            delta_1=delta_1,
+            delta_2=delta_2,
+            **{key: value[idx] for key, value in inputs.items()},
+        )
+
+    # first pass with the fractions assumed by mass_estimation
+    delta_1 = np.full(n, me2.delta_1)
+    delta_2 = np.full(n, me2.delta_2)
+    designs = evaluate(np.arange(n), delta_1, delta_2, initial_thrust_1, initial_thrust_2)
+    thrust_evaluations = designs['thrust_evaluations'].astype(int)
+    iterations = np.ones(n, dtype=int)
+
+    g_1 = designs['s1_inert_m_frac'].copy()
+    g_2 = designs['s2_inert_m_frac'].copy()
+    residual_1 = g_1 - delta_1
+    residual_2 = g_2 - delta_2
+
+    # previous iterate for the Anderson step, NaN until there is one
+    previous_delta_1 = np.full(n, np.nan)
+    previous_delta_2 = np.full(n, np.nan)
+    previous_residual_1 = np.full(n, np.nan)
+    previous_residual_2 = np.full(n, np.nan)
+
+    failed = ~(designs['feasible'] & np.isfinite(residual_1) & np.isfinite(residual_2))
+    converged = ~failed & (np.abs(residual_1) < tolerance) & (np.abs(residual_2) < tolerance)
+    active = np.flatnonzero(~failed & ~converged)
+
+    while active.size and iterations[active[0]] < max_iterations:
+        # plain fixed-point step
+        new_delta_1 = g_1[active]
+        new_delta_2 = g_2[active]
+
+        accelerated = np.zeros(active.size, dtype=bool)
+        if accelerate:
+            # Anderson step with one previous iterate: the combination of the last two
+            # G(delta) with the smallest combined residual
+            r_1, r_2 = residual_1[active], residual_2[active]
+            dr_1 = r_1 - previous_residual_1[active]
+            dr_2 = r_2 - previous_residual_2[active]
+            with np.errstate(divide='ignore', invalid='ignore'):
+                gamma = (dr_1 * r_1 + dr_2 * r_2) / (dr_1 * dr_1 + dr_2 * dr_2)
+            anderson_1 = g_1[active] - gamma * (g_1[active] - previous_delta_1[active] - previous_residual_1[active])
+            anderson_2 = g_2[active] - gamma * (g_2[active] - previous_delta_2[active] - previous_residual_2[active])
+            # only while the residual shrinks, a design that does not close falls back to plain steps
+            progress = np.maximum(np.abs(r_1), np.abs(r_2)) < np.maximum(
+                np.abs(previous_residual_1[active]), np.abs(previous_residual_2[active]))
+            accelerated = (progress & np.isfinite(anderson_1) & np.isfinite(anderson_2)
+                           & (anderson_1 > 0) & (anderson_1 < 1) & (anderson_2 > 0) & (anderson_2 < 1))
+            new_delta_1[accelerated] = anderson_1[accelerated]
+            new_delta_2[accelerated] = anderson_2[accelerated]
+
+        previous_delta_1[active] = delta_1[active]
+        previous_delta_2[active] = delta_2[active]
+        previous_residual_1[active] = residual_1[active]
+        previous_residual_2[active] = residual_2[active]
+        delta_1[active] = new_delta_1
+        delta_2[active] = new_delta_2
+
+        step = evaluate(active, new_delta_1, new_delta_2, designs['s1_thrust'][active], designs['s2_thrust'][active])
+        iterations[active] += 1
+        thrust_evaluations[active] += step['thrust_evaluations']
+
+        physical = step['feasible'] & np.isfinite(step['s1_inert_m_frac']) & np.isfinite(step['s2_inert_m_frac'])
+        _scatter(designs, step, active, physical)
+
+        # an accelerated step out of the physical range is taken back and replaced by a plain step,
+        # a plain step out of it means the design does not close
+        lost = active[~physical]
+        delta_1[lost] = previous_delta_1[lost]
+        delta_2[lost] = previous_delta_2[lost]
+        residual_1[lost] = previous_residual_1[lost]
+        residual_2[lost] = previous_residual_2[lost]
+        for previous in (previous_delta_1, previous_delta_2, previous_residual_1, previous_residual_2):
+            previous[lost] = np.nan
+        failed[active[~physical & ~accelerated]] = True
+
+        closing = active[physical]
+        g_1[closing] = designs['s1_inert_m_frac'][closing]
+        g_2[closing] = designs['s2_inert_m_frac'][closing]
+        residual_1[closing] = g_1[closing] - delta_1[closing]
+        residual_2[closing] = g_2[closing] - delta_2[closing]
+
+        done = (np.abs(residual_1[closing]) < tolerance) & (np.abs(residual_2[closing]) < tolerance)
+        converged[closing[done]] = True
+        active = active[(physical & ~np.isin(active, closing[done])) | (~physical & accelerated)]
+
+    designs['feasible'] = designs['feasible'] & ~failed
+    designs['thrust_evaluations'] = thrust_evaluations
+    designs['delta_1'] = delta_1
+    designs['delta_2'] = delta_2
+    designs['closure_iterations'] = iterations
+    designs['closure_residual'] = np.maximum(np.abs(residual_1), np.abs(residual_2))
+    designs['closure_converged'] = converged
+
+    return designs
+
+
+def close_design(
+        X               : float,
+        s1_prop_mix     : str,
+        s2_prop_mix     : str,
+        stage_1_radius  : float = 2.6 * 3,
+        stage_2_radius  : float = 2.6,
+        nose_h          : float = 6,
+        nose_r          : float = 2.6,
+        m_pl            : float = 26000,
+        tolerance       : float = 1e-6,
+        max_iterations  : int = 50,
+    )-> Tuple[dp.DesignResult, Dict[str, object]]:
+    """
+    Inputs:
+        same as design_pipeline.evaluate_design, tolerance and max_iterations see close_designs
+
+    Outputs:
+        design (DesignResult)       : the closed design
+        info   (Dict[str, object])  : the CLOSURE_COLUMNS values of the design
+
+    Raises ValueError if the design is non-physical or becomes so while closing.
+    """
+    designs = close_designs(
+        X,
+        s1_prop_mix,
+        s2_prop_mix,
+        stage_1_radius=stage_1_radius,
+        stage_2_radius=stage_2_radius,
+        nose_h=nose_h,
+        nose_r=nose_r,
+        m_pl=m_pl,
+        tolerance=tolerance,
+        max_iterations=max_iterations,
+    )
+    if not designs['feasible'][0]:
+        raise ValueError(f'Non-physical design, the inert mass fractions do not close for a stage 1 dV split of {X}%')
+
+    # first (only) design as python scalars, the export lists element by element
+    values = {
+        key: [column[0].item() for column in value] if isinstance(value, list) else np.asarray(value)[:1].tolist()[0]
+        for key, value in designs.items()
+    }
+    values['s1_engine_count'] = int(values['s1_engine_count'])
+    values['s2_engine_count'] = int(values['s2_engine_count'])
+
+    design = dp.DesignResult(**{field.name: values[field.name] for field in fields(dp.DesignResult)})
+    return design, {column: values[column] for column in CLOSURE_COLUMNS}
+
+
+if __name__ == '__main__':
+    design, info = close_design(44, 'LOX_RP1', 'LOX_LH2')
+    print(f"delta_1 = {info['delta_1']:.4f}, delta_2 = {info['delta_2']:.4f} "
+          f"after {info['closure_iterations']} iterations (residual {info['closure_residual']:.1e})")
+    print(f'Total mass: {design.total_mass:.3f} (kg), total cost with margin: {design.total_cost_with_margin:.3f} $M 2025')
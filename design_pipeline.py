@@ -0,0 +1,753 @@
+import math
+import numpy as np
+from dataclasses import dataclass, fields
+from typing import Dict, List, Optional, Tuple
+
+import mass_estimation_part2 as me2
+import Mass_functions as Mfunc
+import thrust_convergance as tc
+import Check_Solid_and_Storables as css
+import Fairing_area as fa
+
+from dictionaries import mixture_names, Thrust_stage1, Thrust_stage2
+
+
+'''
+Full design chain for a single launch vehicle design:
+    mass_estimation -> Check_Solid_and_Storables -> fairing_area
+    -> thrust_convergance -> thrust_mass_calculations -> cost
+
+main.py runs this for one hard-coded design, sweep.py runs it over a design space.
+
+The chain is split in two halves around the thrust iteration:
+    size_design   : propellant, tank, fairing, wiring and avionics sizing
+    mass_budget   : inert masses, costs and totals once the thrust is known
+evaluate_design runs one design through both, evaluate_designs runs arrays of designs
+and iterates the thrust of all of them at once with thrust_convergance_batch.
+'''
+
+# Margin applied to the inert masses
+MASS_MARGIN = 1.3
+
+STAGE_1_INERT_INDICIES = [2, 4, 6, 8, 10, 13, 16, 17, 19]
+STAGE_2_INERT_INDICIES = [3, 5, 7, 9, 11, 12, 14, 15, 18]
+
+# Columns of a results table (sweep, results_writer), in order. Inputs first, then the design outputs.
+INPUT_COLUMNS = [
+    'X',
+    's1_prop_mix',
+    's2_prop_mix',
+    'stage_1_radius',
+    'stage_2_radius',
+    'nose_h',
+    'nose_r',
+    'm_pl',
+]
+
+OUTPUT_COLUMNS = [
+    'm_pr_1',
+    'm_pr_2',
+    'm_0',
+    'm_0_2',
+    's1_tank_radius',
+    's2_tank_radius',
+    's1_total_height',
+    's2_total_height',
+    's1_L_D',
+    's2_L_D',
+    's1_engine_count',
+    's2_engine_count',
+    's1_thrust',
+    's2_thrust',
+    's1_T_W',
+    's2_T_W',
+    's1_m_0',
+    's2_m_0',
+    's1_inert_mass',
+    's2_inert_mass',
+    's1_inert_m_frac',
+    's2_inert_m_frac',
+    's1_cost',
+    's2_cost',
+    's1_cost_with_margin',
+    's2_cost_with_margin',
+    'stage_1_totals',
+    'stage_2_totals',
+    'total_mass',
+    'total_cost',
+    'total_cost_with_margin',
+]
+
+# feasibility and thrust iteration status of each design
+STATUS_COLUMNS = [
+    'feasible',
+    'thrust_evaluations',
+    'thrust_converged',
+]
+
+
+@dataclass(slots=True)
+class DesignResult:
+    """
+    Result record of one design, returned by evaluate_design.
+
+    Field names match the keys of the evaluate_designs arrays, masses in kg,
+    thrust in N, lengths in m and costs in $M 2025.
+    masses_for_output and totals are the lists used by export_fn.export.
+    """
+    # inputs
+    X                       : float
+    s1_prop_mix             : str
+    s2_prop_mix             : str
+    stage_1_radius          : float
+    stage_2_radius          : float
+    nose_h                  : float
+    nose_r                  : float
+    m_pl                    : float
+    # part 1 estimate
+    m_pr_1                  : float
+    m_pr_2                  : float
+    m_0                     : float
+    m_0_2                   : float
+    # geometry
+    s1_tank_radius          : float
+    s2_tank_radius          : float
+    s1_total_height         : float
+    s2_total_height         : float
+    s1_L_D                  : float
+    s2_L_D                  : float
+    # thrust
+    s1_engine_count         : int
+    s2_engine_count         : int
+    s1_thrust               : float
+    s2_thrust               : float
+    s1_T_W                  : float
+    s2_T_W                  : float
+    s1_m_0                  : float
+    s2_m_0                  : float
+    # per-stage mass budget
+    s1_tanks_mass           : float
+    s2_tanks_mass           : float
+    s1_insul_mass           : float
+    s2_insul_mass           : float
+    s1_engine_mass          : float
+    s2_engine_mass          : float
+    s1_t_struct_m           : float
+    s2_t_struct_m           : float
+    s1_gimbal_mass          : float
+    s2_gimbal_mass          : float
+    avionic_mass            : float
+    s1_wiring_mass          : float
+    s2_wiring_mass          : float
+    payload_fairing_m       : float
+    inter_fairing_m         : float
+    s1_tank_f_m             : float
+    s2_tank_f_m             : float
+    aft_fairing_m           : float
+    nose_fairing_m          : float
+    # inert masses and costs
+    s1_inert_mass           : float
+    s2_inert_mass           : float
+    s1_inert_m_frac         : float
+    s2_inert_m_frac         : float
+    s1_cost                 : float
+    s2_cost                 : float
+    s1_cost_with_margin     : float
+    s2_cost_with_margin     : float
+    # totals
+    stage_1_totals          : float
+    stage_2_totals          : float
+    total_mass              : float
+    total_cost              : float
+    total_cost_with_margin  : float
+    # lists used by export_fn.export
+    masses                  : List[float]
+    masses_for_output       : List[float]
+    totals                  : List[float]
+    # thrust solver
+    thrust_evaluations      : int
+    thrust_converged        : bool
+    # evaluate_design raises for non-physical designs, so a record is always feasible
+    feasible                : bool = True
+
+    def as_dict(self)-> Dict[str, object]:
+        """
+        Output:
+            design (Dict[str, object]) : every field of the record, keyed by field name
+        """
+        return {field.name: getattr(self, field.name) for field in fields(self)}
+
+
+def size_design(
+        X               : float,
+        s1_prop_mix     : str,
+        s2_prop_mix     : str,
+        stage_1_radius  : float = 2.6 * 3,
+        stage_2_radius  : float = 2.6,
+        nose_h          : float = 6,
+        nose_r          : float = 2.6,
+        m_pl            : float = 26000,
+        verbose         : bool = False,
+        coefficients    : Optional[Dict] = None,
+        delta_1         : float = me2.delta_1,
+        delta_2         : float = me2.delta_2,
+    )-> Dict[str, object]:
+    """
+    Inputs:
+        same as evaluate_design. X, the radii, nose dimensions and payload mass can
+        also be arrays of designs sharing the same mixture pair.
+        coefficients (Dict): MER coefficient overrides, see Mass_functions.MER_COEFFICIENTS
+        delta_1, delta_2 (float): inert mass fractions assumed by mass_estimation, scalars or one per design
+
+    Outputs:
+        sized (Dict[str, object]) : inputs plus every mass that does not depend on thrust,
+            including stage_1_other_masses / stage_2_other_masses for thrust_convergance
+
+    For a single design a non-physical dV split raises ValueError, for arrays of
+    designs the non-physical ones are set to NaN instead.
+    """
+
+    if verbose:
+        print('----------------------------------------')
+        print(f'Stage 1 Delta-V split: {X}%')
+        print('Stage 1 Mixture: ', s1_prop_mix)
+        print('Stage 2 Mixture: ', s2_prop_mix)
+        print('----------------------------------------')
+
+    ## start by finding part 1 values, gross and propellant mass of each stage
+    m_pr_1, m_pr_2, m_0, m_0_2 = me2.mass_estimation(X, s1_prop_mix, s2_prop_mix, verbose=verbose, delta_1=delta_1, delta_2=delta_2)
+
+    physical = (m_0 > 0) & (m_0_2 > 0)
+    if np.ndim(physical) == 0:
+        if not physical:
+            raise ValueError(f'Non-physical design, no positive gross mass for a stage 1 dV split of {X}%')
+    else:
+        m_pr_1 = np.where(physical, m_pr_1, np.nan)
+        m_pr_2 = np.where(physical, m_pr_2, np.nan)
+        m_0 = np.where(physical, m_0, np.nan)
+        m_0_2 = np.where(physical, m_0_2, np.nan)
+
+    ## determine tank/insulation/casing properties
+
+    s1_tank_radius, s1_total_height, s1_tanks_mass, s1_insul_mass = css.Check_Solid_and_Storables(
+        s1_prop_mix,
+        m_pr_1,
+        tank_radius=stage_1_radius,
+        coefficients=coefficients,
+    )
+    s2_tank_radius, s2_total_height, s2_tanks_mass, s2_insul_mass = css.Check_Solid_and_Storables(
+        s2_prop_mix,
+        m_pr_2,
+        tank_radius=stage_2_radius,
+        coefficients=coefficients,
+    )
+
+    if verbose:
+        print('----------------------------------------')
+        print(f'Stage 1 Height: {s1_total_height:.2f} (m)')
+        print(f'Stage 2 Height: {s2_total_height:.2f} (m)')
+        print(f'Stage 1 L/D: {s1_total_height / s1_tank_radius:.2f}')
+        print(f'Stage 2 L/D: {s2_total_height / s2_tank_radius:.2f}')
+        print('----------------------------------------')
+
+
+    # determine mass of other elements
+
+    # determine fairing mass using surface area
+    f_nose_A, f_pl_A, f_s1_A, f_s2_A, f_if_A, f_aft_A = fa.fairing_area(
+        s1_tank_radius,
+        s1_total_height,
+        s2_tank_radius,
+        s2_total_height,
+        nose_h,
+        nose_r
+    )
+
+    fairing_kwargs = Mfunc.mer_kwargs(coefficients, 'M_fairing')
+    nose_fairing_m      = Mfunc.M_fairing(f_nose_A, **fairing_kwargs)
+    payload_fairing_m   = Mfunc.M_fairing(f_pl_A, **fairing_kwargs)
+    s1_tank_f_m         = Mfunc.M_fairing(f_s1_A, **fairing_kwargs)
+    s2_tank_f_m         = Mfunc.M_fairing(f_s2_A, **fairing_kwargs)
+    inter_fairing_m     = Mfunc.M_fairing(f_if_A, **fairing_kwargs)
+    aft_fairing_m       = Mfunc.M_fairing(f_aft_A, **fairing_kwargs)
+
+    s1_fairing_mass = s1_tank_f_m + inter_fairing_m + aft_fairing_m
+    s2_fairing_mass = s2_tank_f_m + payload_fairing_m + nose_fairing_m
+
+
+    avionic_mass = Mfunc.M_avionic(m_0, **Mfunc.mer_kwargs(coefficients, 'M_avionic')) # attributed to second stage only
+
+    wiring_kwargs = Mfunc.mer_kwargs(coefficients, 'M_wiring')
+    s1_wiring_mass = Mfunc.M_wiring(m_0, s1_total_height, **wiring_kwargs)
+    s2_wiring_mass = Mfunc.M_wiring(m_0_2, s2_total_height, **wiring_kwargs)
+
+    # find thrust required
+    # other masses is the combination of all inert masses, minus thrust structure, engine, and gimbal masses
+    stage_1_other_masses = s1_tanks_mass + s1_insul_mass + s1_fairing_mass + s1_wiring_mass
+    stage_2_other_masses = s2_tanks_mass + s2_insul_mass + s2_fairing_mass + s2_wiring_mass + avionic_mass
+
+    return {
+        # inputs
+        'X'                     : X,
+        's1_prop_mix'           : s1_prop_mix,
+        's2_prop_mix'           : s2_prop_mix,
+        'stage_1_radius'        : stage_1_radius,
+        'stage_2_radius'        : stage_2_radius,
+        'nose_h'                : nose_h,
+        'nose_r'                : nose_r,
+        'm_pl'                  : m_pl,
+        # part 1 estimate
+        'm_pr_1'                : m_pr_1,
+        'm_pr_2'                : m_pr_2,
+        'm_0'                   : m_0,
+        'm_0_2'                 : m_0_2,
+        # geometry
+        's1_tank_radius'        : s1_tank_radius,
+        's2_tank_radius'        : s2_tank_radius,
+        's1_total_height'       : s1_total_height,
+        's2_total_height'       : s2_total_height,
+        # masses independent of thrust
+        's1_tanks_mass'         : s1_tanks_mass,
+        's2_tanks_mass'         : s2_tanks_mass,
+        's1_insul_mass'         : s1_insul_mass,
+        's2_insul_mass'         : s2_insul_mass,
+        'nose_fairing_m'        : nose_fairing_m,
+        'payload_fairing_m'     : payload_fairing_m,
+        's1_tank_f_m'           : s1_tank_f_m,
+        's2_tank_f_m'           : s2_tank_f_m,
+        'inter_fairing_m'       : inter_fairing_m,
+        'aft_fairing_m'         : aft_fairing_m,
+        'avionic_mass'          : avionic_mass,
+        's1_wiring_mass'        : s1_wiring_mass,
+        's2_wiring_mass'        : s2_wiring_mass,
+        'stage_1_other_masses'  : stage_1_other_masses,
+        'stage_2_other_masses'  : stage_2_other_masses,
+    }
+
+
+def mass_budget(
+        sized           : Dict[str, object],
+        t_req1          : float,
+        t_req2          : float,
+        s1_m_0          : float,
+        s2_m_0          : float,
+        thrust_masses   : list,
+        s1_engine_count : int,
+        s2_engine_count : int,
+        verbose         : bool = False,
+        mass_margin     : float = MASS_MARGIN,
+    )-> Dict[str, object]:
+    """
+    Inputs:
+        sized           (Dict)  : output of size_design
+        t_req1          (float) : converged stage 1 thrust (N)
+        t_req2          (float) : converged stage 2 thrust (N)
+        s1_m_0          (float) : stage 1 total mass from thrust_mass_calculations (kg)
+        s2_m_0          (float) : stage 2 total mass from thrust_mass_calculations (kg)
+        thrust_masses   (list)  : component masses from thrust_mass_calculations (kg)
+        s1_engine_count (int)   : number of stage 1 engines
+        s2_engine_count (int)   : number of stage 2 engines
+        verbose         (bool)  : print the inert masses, costs and inert mass fractions
+        mass_margin     (float) : margin applied to the inert masses
+
+    Outputs:
+        design (Dict[str, object]) : every DesignResult field except the thrust solver ones.
+            Works element-wise on arrays of designs.
+    """
+    m_pr_1 = sized['m_pr_1']
+    m_pr_2 = sized['m_pr_2']
+    s1_tanks_mass = sized['s1_tanks_mass']
+    s2_tanks_mass = sized['s2_tanks_mass']
+    s1_insul_mass = sized['s1_insul_mass']
+    s2_insul_mass = sized['s2_insul_mass']
+    avionic_mass = sized['avionic_mass']
+    s1_wiring_mass = sized['s1_wiring_mass']
+    s2_wiring_mass = sized['s2_wiring_mass']
+    payload_fairing_m = sized['payload_fairing_m']
+    inter_fairing_m = sized['inter_fairing_m']
+    s1_tank_f_m = sized['s1_tank_f_m']
+    s2_tank_f_m = sized['s2_tank_f_m']
+    aft_fairing_m = sized['aft_fairing_m']
+
+    s1_engine_mass = thrust_masses[0]   # Engines
+    s2_engine_mass = thrust_masses[1]
+    s1_t_struct_m = thrust_masses[2]    # Thrust structure
+    s2_t_struct_m = thrust_masses[3]
+    s1_gimbal_mass = thrust_masses[4]   # Gimbals
+    s2_gimbal_mass = thrust_masses[5]
+
+    masses = [
+        m_pr_1,             # Propellant
+        m_pr_2,
+        s1_tanks_mass,      # Propellant tanks -> is casing mass for solids
+        s2_tanks_mass,
+        s1_insul_mass,      # Propellant tank insulation
+        s2_insul_mass,
+        s1_engine_mass,     # Engines
+        s2_engine_mass,
+        s1_t_struct_m,      # Thrust structure
+        s2_t_struct_m,
+        s1_gimbal_mass,     # Gimbals
+        s2_gimbal_mass,
+        avionic_mass,       # Avionics -> stage 2 only
+        s1_wiring_mass,     # Wiring
+        s2_wiring_mass,
+        payload_fairing_m,  # Payload fairing
+        inter_fairing_m,    # Inter-stage fairing
+        s1_tank_f_m,        # Tank fairing
+        s2_tank_f_m,
+        aft_fairing_m,      # Aft fairing
+    ]
+
+    s1_inert_mass = sum([masses[i] for i in STAGE_1_INERT_INDICIES])
+    s2_inert_mass = sum([masses[i] for i in STAGE_2_INERT_INDICIES])
+
+    if verbose:
+        print('----------------------------------------')
+        print(f'Stage 1 Inert Mass: {s1_inert_mass:.3f} (kg)')
+        print(f'Stage 2 Inert Mass: {s2_inert_mass:.3f} (kg)')
+        print('----------------------------------------')
+
+    s1_inert_mass_w_margin = mass_margin * s1_inert_mass
+    s2_inert_mass_w_margin = mass_margin * s2_inert_mass
+
+    s1_cost = me2.stage_nre_cost(s1_inert_mass)
+    s2_cost = me2.stage_nre_cost(s2_inert_mass)
+
+    s1_cost_with_margin = me2.stage_nre_cost(s1_inert_mass_w_margin)
+    s2_cost_with_margin = me2.stage_nre_cost(s2_inert_mass_w_margin)
+
+    if verbose:
+        print(f'Stage 1 cost is: {s1_cost:.3f} $M 2025')
+        print(f'Stage 2 cost is: {s2_cost:.3f} $M 2025')
+        print(f'Total cost is {(s1_cost + s2_cost)/1000:.3f} $B 2025')
+        print('----------------------------------------')
+        print(f'Stage 1 cost with margin is: {s1_cost_with_margin:.3f} $M 2025')
+        print(f'Stage 2 cost with margin is: {s2_cost_with_margin:.3f} $M 2025')
+        print(f'Total cost is {(s1_cost_with_margin + s2_cost_with_margin)/1000:.3f} $B 2025')
+        print('----------------------------------------')
+
+
+    # find inert mass fraction
+
+    s1_inert_m_frac = s1_inert_mass / s1_m_0
+    s2_inert_m_frac = s2_inert_mass / s2_m_0
+
+    if verbose:
+        print(f'Stage 1 inert mass fraction is: {s1_inert_m_frac:.3f}')
+        print(f'Stage 2 inert mass fraction is: {s2_inert_m_frac:.3f}')
+        print('----------------------------------------')
+
+    masses_for_output = [
+        (m_pr_1+m_pr_2),                    # Propellant
+        (s1_tanks_mass+s2_tanks_mass),      # Propellant tanks -> is casing mass for solids
+        (s1_insul_mass+s2_insul_mass),      # Propellant tank insulation
+        (s1_engine_mass+s2_engine_mass),    # Engines
+        (s1_t_struct_m+s2_t_struct_m),      # Thrust structure
+        (s1_gimbal_mass+s2_gimbal_mass),    # Gimbals
+        (avionic_mass),                     # Avionics -> stage 2 only
+        (s1_wiring_mass+s2_wiring_mass),    # Wiring
+        payload_fairing_m,                  # Payload fairing
+        inter_fairing_m,                    # Inter-stage fairing
+        (s1_tank_f_m+s2_tank_f_m),          # Tank fairings
+        aft_fairing_m,                      # Aft fairing
+    ]
+
+    stage_1_totals = (
+        m_pr_1 +                # Stage 1 propellant
+        mass_margin*(s1_tanks_mass +         # Propellant tanks
+        s1_insul_mass +         # Tank insulation
+        s1_engine_mass +        # Engines
+        s1_t_struct_m +         # Thrust structure
+        s1_gimbal_mass +        # Gimbals
+        s1_wiring_mass +        # Wiring
+        s1_tank_f_m +           # Inter-tank fairing
+        aft_fairing_m)           # Aft fairing
+    )
+
+    stage_2_totals = (
+        m_pr_2 +                # Stage 2 propellant
+        mass_margin*(s2_tanks_mass +         # Propellant tanks
+        s2_insul_mass +         # Tank insulation
+        s2_engine_mass +        # Engines
+        s2_t_struct_m +         # Thrust structure
+        s2_gimbal_mass +        # Gimbals
+        avionic_mass +          # Avionics (stage 2 only)
+        s2_wiring_mass +        # Wiring
+        payload_fairing_m +     # Payload fairing
+        inter_fairing_m +       # Inter-stage fairing
+        s2_tank_f_m)             # Inter-tank fairing
+    )
+
+    # Overall totals
+    cost_w_margin = s1_cost_with_margin + s2_cost_with_margin
+
+    totals = [
+        stage_1_totals,
+        stage_2_totals,
+        stage_1_totals + stage_2_totals,
+        (s1_cost+s2_cost),
+        cost_w_margin,
+    ]
+
+    return {
+        # inputs
+        'X'                     : sized['X'],
+        's1_prop_mix'           : sized['s1_prop_mix'],
+        's2_prop_mix'           : sized['s2_prop_mix'],
+        'stage_1_radius'        : sized['stage_1_radius'],
+        'stage_2_radius'        : sized['stage_2_radius'],
+        'nose_h'                : sized['nose_h'],
+        'nose_r'                : sized['nose_r'],
+        'm_pl'                  : sized['m_pl'],
+        # part 1 estimate
+        'm_pr_1'                : m_pr_1,
+        'm_pr_2'                : m_pr_2,
+        'm_0'                   : sized['m_0'],
+        'm_0_2'                 : sized['m_0_2'],
+        # geometry
+        's1_tank_radius'        : sized['s1_tank_radius'],
+        's2_tank_radius'        : sized['s2_tank_radius'],
+        's1_total_height'       : sized['s1_total_height'],
+        's2_total_height'       : sized['s2_total_height'],
+        's1_L_D'                : sized['s1_total_height'] / sized['s1_tank_radius'],
+        's2_L_D'                : sized['s2_total_height'] / sized['s2_tank_radius'],
+        # thrust
+        's1_engine_count'       : s1_engine_count,
+        's2_engine_count'       : s2_engine_count,
+        's1_thrust'             : t_req1,
+        's2_thrust'             : t_req2,
+        's1_T_W'                : t_req1 / (s1_m_0 * tc.g_0),
+        's2_T_W'                : t_req2 / (s2_m_0 * tc.g_0),
+        's1_m_0'                : s1_m_0,
+        's2_m_0'                : s2_m_0,
+        # per-stage mass budget
+        's1_tanks_mass'         : s1_tanks_mass,
+        's2_tanks_mass'         : s2_tanks_mass,
+        's1_insul_mass'         : s1_insul_mass,
+        's2_insul_mass'         : s2_insul_mass,
+        's1_engine_mass'        : s1_engine_mass,
+        's2_engine_mass'        : s2_engine_mass,
+        's1_t_struct_m'         : s1_t_struct_m,
+        's2_t_struct_m'         : s2_t_struct_m,
+        's1_gimbal_mass'        : s1_gimbal_mass,
+        's2_gimbal_mass'        : s2_gimbal_mass,
+        'avionic_mass'          : avionic_mass,
+        's1_wiring_mass'        : s1_wiring_mass,
+        's2_wiring_mass'        : s2_wiring_mass,
+        'payload_fairing_m'     : payload_fairing_m,
+        'inter_fairing_m'       : inter_fairing_m,
+        's1_tank_f_m'           : s1_tank_f_m,
+        's2_tank_f_m'           : s2_tank_f_m,
+        'aft_fairing_m'         : aft_fairing_m,
+        'nose_fairing_m'        : sized['nose_fairing_m'],
+        # inert masses and costs
+        's1_inert_mass'         : s1_inert_mass,
+        's2_inert_mass'         : s2_inert_mass,
+        's1_inert_m_frac'       : s1_inert_m_frac,
+        's2_inert_m_frac'       : s2_inert_m_frac,
+        's1_cost'               : s1_cost,
+        's2_cost'               : s2_cost,
+        's1_cost_with_margin'   : s1_cost_with_margin,
+        's2_cost_with_margin'   : s2_cost_with_margin,
+        # totals
+        'stage_1_totals'        : stage_1_totals,
+        'stage_2_totals'        : stage_2_totals,
+        'total_mass'            : stage_1_totals + stage_2_totals,
+        'total_cost'            : s1_cost + s2_cost,
+        'total_cost_with_margin': cost_w_margin,
+        # lists used by export_fn.export
+        'masses'                : masses,
+        'masses_for_output'     : masses_for_output,
+        'totals'                : totals,
+    }
+
+
+def evaluate_design(
+        X               : float,
+        s1_prop_mix     : str,
+        s2_prop_mix     : str,
+        stage_1_radius  : float = 2.6 * 3,
+        stage_2_radius  : float = 2.6,
+        nose_h          : float = 6,
+        nose_r          : float = 2.6,
+        m_pl            : float = 26000,
+        verbose         : bool = False,
+        initial_thrust  : Optional[Tuple[float, float]] = None,
+        thrust_method   : str = 'fixed_point',
+    )-> DesignResult:
+    """
+    Inputs:
+        X               (float) : stage 1 dV fraction percentage
+        s1_prop_mix     (str)   : stage 1 propellant name
+        s2_prop_mix     (str)   : stage 2 propellant name
+        stage_1_radius  (float) : stage 1 tank radius (m)
+        stage_2_radius  (float) : stage 2 tank radius (m)
+        nose_h          (float) : nose cone height (m)
+        nose_r          (float) : nose cone radius (m)
+        m_pl            (float) : payload mass (kg)
+        verbose         (bool)  : print the intermediate results, nothing is printed by default
+        initial_thrust  (tuple) : (stage 1, stage 2) thrust to start the thrust iteration from,
+                                  e.g. the thrust of a neighbouring design
+        thrust_method   (str)   : thrust_convergance method, 'enumerate' for the exact engine count solution
+
+    Outputs:
+        design (DesignResult) : inputs, per-stage mass budget, engine counts, thrust, T/W, L/D,
+            costs and inert fractions of the design
+
+    Raises ValueError if the dV split is non-physical (negative or NaN gross mass).
+    """
+    sized = size_design(
+        X,
+        s1_prop_mix,
+        s2_prop_mix,
+        stage_1_radius=stage_1_radius,
+        stage_2_radius=stage_2_radius,
+        nose_h=nose_h,
+        nose_r=nose_r,
+        m_pl=m_pl,
+        verbose=verbose,
+    )
+    m_pr_1 = sized['m_pr_1']
+    m_pr_2 = sized['m_pr_2']
+    stage_1_other_masses = sized['stage_1_other_masses']
+    stage_2_other_masses = sized['stage_2_other_masses']
+
+    t_req1, t_req2, thrust_info = tc.thrust_convergance(sized['m_0'], sized['m_0_2'], m_pr_1, m_pr_2, m_pl, stage_1_other_masses, stage_2_other_masses, s1_prop_mix, s2_prop_mix, verbose=verbose, full_output=True, initial_thrust=initial_thrust, method=thrust_method)
+
+    # find total rocket mass from thrust
+    s1_m_0, s2_m_0, thrust_masses = tc.thrust_mass_calculations(m_pr_1, m_pr_2, m_pl, stage_1_other_masses, stage_2_other_masses, t_req1, t_req2, s1_prop_mix, s2_prop_mix)
+
+    s1_engine_count = math.ceil(t_req1 / Thrust_stage1[s1_prop_mix])
+    s2_engine_count = math.ceil(t_req2 / Thrust_stage2[s2_prop_mix])
+
+    design = mass_budget(sized, t_req1, t_req2, s1_m_0, s2_m_0, thrust_masses, s1_engine_count, s2_engine_count, verbose=verbose)
+
+    return DesignResult(
+        thrust_evaluations=thrust_info['evaluations'],
+        thrust_converged=thrust_info['converged'],
+        **design,
+    )
+
+
+def evaluate_designs(
+        X,
+        s1_prop_mix,
+        s2_prop_mix,
+        stage_1_radius  = 2.6 * 3,
+        stage_2_radius  = 2.6,
+        nose_h          = 6,
+        nose_r          = 2.6,
+        m_pl            = 26000,
+        coefficients    = None,
+        mass_margin     = MASS_MARGIN,
+        initial_thrust_1= None,
+        initial_thrust_2= None,
+        delta_1         = me2.delta_1,
+        delta_2         = me2.delta_2,
+        thrust_method   : str = 'fixed_point',
+    )-> Dict[str, np.ndarray]:
+    """
+    Inputs:
+        same as evaluate_design, every input can be an array of designs and all of
+        them broadcast against each other. Mixtures are names or integer mixture codes.
+        coefficients    (Dict)  : MER coefficient overrides (see Mass_functions.MER_COEFFICIENTS),
+                                  scalars or 1-D arrays with one entry per design
+        mass_margin     (float) : margin applied to the inert masses, scalar or one per design
+        initial_thrust_1, initial_thrust_2 : thrust iteration warm start, one per design,
+                                  NaN where the design starts cold
+        delta_1, delta_2 : inert mass fractions assumed by mass_estimation, scalars or one per design
+        thrust_method   (str)   : thrust_convergance_batch method, 'fixed_point' or 'enumerate'
+
+    Outputs:
+        designs (Dict[str, np.ndarray]) : same keys as the DesignResult fields, each holding a 1-D array
+            with one entry per design, plus
+            'feasible'      (bool) : False for non-physical dV splits (outputs are NaN)
+            'thrust_evaluations'    (int)  : thrust_mass_calculations calls used by the thrust iteration,
+                                             equivalent calls for 'enumerate'
+            'thrust_converged'      (bool) : thrust iteration met its tolerance
+
+    Designs are sized one mixture pair at a time, the thrust of every design is then
+    iterated in a single call to thrust_convergance_batch.
+    """
+    s1_codes = tc.to_mixture_codes(s1_prop_mix)
+    s2_codes = tc.to_mixture_codes(s2_prop_mix)
+
+    (X, s1_codes, s2_codes, stage_1_radius, stage_2_radius, nose_h, nose_r, m_pl) = [
+        np.ravel(x) for x in np.broadcast_arrays(
+            np.asarray(X, dtype=float),
+            s1_codes,
+            s2_codes,
+            np.asarray(stage_1_radius, dtype=float),
+            np.asarray(stage_2_radius, dtype=float),
+            np.asarray(nose_h, dtype=float),
+            np.asarray(nose_r, dtype=float),
+            np.asarray(m_pl, dtype=float),
+        )
+    ]
+    n = X.size
+    delta_1 = np.broadcast_to(np.asarray(delta_1, dtype=float), (n,))
+    delta_2 = np.broadcast_to(np.asarray(delta_2, dtype=float), (n,))
+
+    # size every design, one mixture pair at a time
+    sized = {}
+    pair_codes = s1_codes * len(mixture_names) + s2_codes
+    for pair_code in np.unique(pair_codes):
+        idx = np.flatnonzero(pair_codes == pair_code)
+        s1_code, s2_code = divmod(int(pair_code), len(mixture_names))
+        sized_pair = size_design(
+            X[idx],
+            mixture_names[s1_code],
+            mixture_names[s2_code],
+            stage_1_radius=stage_1_radius[idx],
+            stage_2_radius=stage_2_radius[idx],
+            nose_h=nose_h[idx],
+            nose_r=nose_r[idx],
+            m_pl=m_pl[idx],
+            verbose=False,
+            coefficients=Mfunc.take_coefficients(coefficients, idx, n),
+            delta_1=delta_1[idx],
+            delta_2=delta_2[idx],
+        )
+        for key, value in sized_pair.items():
+            if key in ('s1_prop_mix', 's2_prop_mix'):
+                continue
+            if key not in sized:
+                sized[key] = np.empty(n)
+            sized[key][idx] = value
+
+    sized['s1_prop_mix'] = np.array(mixture_names, dtype=object)[s1_codes]
+    sized['s2_prop_mix'] = np.array(mixture_names, dtype=object)[s2_codes]
+
+    m_pr_1 = sized['m_pr_1']
+    m_pr_2 = sized['m_pr_2']
+    stage_1_other_masses = sized['stage_1_other_masses']
+    stage_2_other_masses = sized['stage_2_other_masses']
+
+    t_req1, t_req2, iterations, converged = tc.thrust_convergance_batch(
+        sized['m_0'],
+        sized['m_0_2'],
+        m_pr_1,
+        m_pr_2,
+        m_pl,
+        stage_1_other_masses,
+        stage_2_other_masses,
+        s1_codes,
+        s2_codes,
+        coefficients=coefficients,
+        initial_thrust_1=initial_thrust_1,
+        initial_thrust_2=initial_thrust_2,
+        method=thrust_method,
+    )
+
+    # find total rocket mass from thrust
+    s1_m_0, s2_m_0, thrust_masses = tc.thrust_mass_calculations_batch(m_pr_1, m_pr_2, m_pl, stage_1_other_masses, stage_2_other_masses, t_req1, t_req2, s1_codes, s2_codes, coefficients=coefficients)
+
+    s1_engine_count, s2_engine_count = tc.engine_counts_batch(t_req1, t_req2, s1_codes, s2_codes)
+
+    designs = mass_budget(sized, t_req1, t_req2, s1_m_0, s2_m_0, thrust_masses, s1_engine_count, s2_engine_count, verbose=False, mass_margin=mass_margin)
+    designs['feasible'] = np.isfinite(sized['m_0'])
+    designs['thrust_evaluations'] = iterations
+    designs['thrust_converged'] = converged
+
+    return designs
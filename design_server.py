@@ -0,0 +1,456 @@
+import http.client
+import json
+import math
+import queue
+import threading
+import time
+import numpy as np
+from concurrent.futures import Future
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Union
+
+import design_pipeline as dp
+
+from design_pipeline import INPUT_COLUMNS, OUTPUT_COLUMNS, STATUS_COLUMNS
+from dictionaries import mixture_codes
+
+
+'''
+Long-running local design evaluation service.
+
+Keeps the design chain imported and warm, and answers design queries over HTTP on localhost:
+
+    POST /evaluate      body: one design object, a list of them, or {"designs": [...], "columns": [...]}
+                        reply: one result object, or a list in the same order. "columns" is
+                        optional and limits the result objects to those columns
+    GET  /health        reply: {"status": "ok", "requests": ..., "designs": ..., "batches": ...}
+
+A design object holds the evaluate_design inputs (X, s1_prop_mix, s2_prop_mix and optionally
+stage_1_radius, stage_2_radius, nose_h, nose_r, m_pl), a result object every RESULT_COLUMNS
+value, NaN and infinities as null. Non-physical designs come back with feasible = false,
+invalid designs (unknown keys, mixtures, non-numeric values, non-positive geometry or a
+negative payload mass) are rejected with status 400.
+
+Requests are not evaluated one by one: a single batching thread collects every design
+that arrives within batch_window seconds (up to max_batch designs) and evaluates them with
+one design_pipeline.evaluate_designs call, so concurrent clients share the vectorised
+evaluation. Connections are kept alive (HTTP/1.1), use DesignClient to reuse one.
+
+Usage Examples:
+    python design_server.py --port 8765
+
+    client = DesignClient(port = 8765)
+    result = client.evaluate({'X': 44, 's1_prop_mix': 'LOX_RP1', 's2_prop_mix': 'LOX_LH2'})
+    designs = [{'X': X, 's1_prop_mix': 'LOX_RP1', 's2_prop_mix': 'LOX_LH2'} for X in range(30, 60)]
+    results = client.evaluate(designs)
+    masses = client.evaluate(designs, columns = ['total_mass', 'feasible'])
+
+    curl -d '{"X": 44, "s1_prop_mix": "LOX_RP1", "s2_prop_mix": "LOX_LH2"}' localhost:8765/evaluate
+'''
+
+RESULT_COLUMNS = INPUT_COLUMNS + OUTPUT_COLUMNS + STATUS_COLUMNS
+
+# Result columns sent as integers, evaluate_designs holds them as floats (NaN when non-physical)
+_INTEGER_COLUMNS = ['s1_engine_count', 's2_engine_count']
+
+# Geometry inputs that have to be positive
+_POSITIVE_INPUTS = ['stage_1_radius', 'stage_2_radius', 'nose_h', 'nose_r']
+
+# Inputs a design object may leave out
+DESIGN_DEFAULTS: Dict[str, float] = {
+    'stage_1_radius': 2.6 * 3,
+    'stage_2_radius': 2.6,
+    'nose_h'        : 6,
+    'nose_r'        : 2.6,
+    'm_pl'          : 26000,
+}
+
+
+def parse_design(design: Dict[str, object])-> Dict[str, object]:
+    """
+    Input:
+        design (Dict[str, object]): design object of a request
+
+    Output:
+        design (Dict[str, object]): every INPUT_COLUMNS value, defaults filled in, numbers as float
+
+    Raises ValueError for a design that is not an object, has unknown or missing keys,
+    unknown mixtures, non-numeric inputs, non-positive radii or nose dimensions or a
+    negative payload mass.
+    """
+    if not isinstance(design, dict):
+        raise ValueError('A design must be a JSON object')
+
+    unknown = [key for key in design if key not in INPUT_COLUMNS]
+    if unknown:
+        raise ValueError(f'Unknown design inputs {", ".join(unknown)}, use {", ".join(INPUT_COLUMNS)}')
+
+    design = dict(DESIGN_DEFAULTS, **design)
+    missing = [column for column in INPUT_COLUMNS if column not in design]
+    if missing:
+        raise ValueError(f'Missing design inputs {", ".join(missing)}')
+
+    for column in ('s1_prop_mix', 's2_prop_mix'):
+        if not isinstance(design[column], str) or design[column] not in mixture_codes:
+            raise ValueError('Invalid mixture name, check naming convention in dictionary')
+
+    for column in INPUT_COLUMNS:
+        if column in ('s1_prop_mix', 's2_prop_mix'):
+            continue
+        value = design[column]
+        if isinstance(value, bool) or not isinstance(value, (int, float)) or not math.isfinite(value):
+            raise ValueError(f'{column} must be a finite number')
+        design[column] = float(value)
+
+    # the tank and fairing geometry divides by these, a zero gives infinite masses and L/D
+    for column in _POSITIVE_INPUTS:
+        if not design[column] > 0:
+            raise ValueError(f'{column} must be positive')
+    if design['m_pl'] < 0:
+        raise ValueError('m_pl must not be negative')
+
+    return design
+
+
+def evaluate_parsed(designs: List[Dict[str, object]], thrust_method: str = 'fixed_point')-> Dict[str, np.ndarray]:
+    """
+    Inputs:
+        designs         (List[Dict[str, object]]): parsed designs, see parse_design
+        thrust_method   (str)                    : thrust solver, see design_pipeline.evaluate_designs
+
+    Output:
+        designs (Dict[str, np.ndarray]): design_pipeline.evaluate_designs outputs, one entry per design
+    """
+    return dp.evaluate_designs(
+        np.array([design['X'] for design in designs]),
+        np.array([design['s1_prop_mix'] for design in designs]),
+        np.array([design['s2_prop_mix'] for design in designs]),
+        stage_1_radius=np.array([design['stage_1_radius'] for design in designs]),
+        stage_2_radius=np.array([design['stage_2_radius'] for design in designs]),
+        nose_h=np.array([design['nose_h'] for design in designs]),
+        nose_r=np.array([design['nose_r'] for design in designs]),
+        m_pl=np.array([design['m_pl'] for design in designs]),
+        thrust_method=thrust_method,
+    )
+
+
+def result_rows(designs: Dict[str, object])-> List[Dict[str, object]]:
+    """
+    Input:
+        designs (Dict[str, object]): design_pipeline.evaluate_designs outputs
+
+    Output:
+        rows (List[Dict[str, object]]): RESULT_COLUMNS of every design as JSON ready values,
+            NaN and infinities as None and engine counts as int
+    """
+    columns = {}
+    for column in RESULT_COLUMNS:
+        values = np.asarray(designs[column])
+        if values.dtype.kind == 'f':
+            missing = ~np.isfinite(values)
+            values = values.astype(int if column in _INTEGER_COLUMNS and not missing.any() else object)
+            if missing.any():
+                values[missing] = None
+                if column in _INTEGER_COLUMNS:
+                    values[~missing] = values[~missing].astype(float).astype(int)
+        columns[column] = values.tolist()
+    return [dict(zip(columns, row)) for row in zip(*columns.values())]
+
+
+class DesignBatcher:
+    """
+    Inputs:
+        max_batch       (int)   : most designs evaluated in one evaluate_designs call
+        batch_window    (float) : seconds to wait for more designs after the first one arrives
+        thrust_method   (str)   : thrust solver, see design_pipeline.evaluate_designs
+
+    Collects the designs submitted from any thread and evaluates them in batches on
+    one worker thread. With no batch window a batch is whatever was submitted while the
+    previous one was evaluated: a lone query is answered at once and the batches grow
+    with the load. A batch of one design takes the scalar design_pipeline.evaluate_design
+    path, which has less overhead than a batch call.
+    """
+
+    def __init__(
+            self,
+            max_batch       : int = 4096,
+            batch_window    : float = 0.0,
+            thrust_method   : str = 'fixed_point',
+        ):
+        self.max_batch = max_batch
+        self.batch_window = batch_window
+        self.thrust_method = thrust_method
+
+        self.requests = 0
+        self.designs = 0
+        self.batches = 0
+
+        self._queue: 'queue.Queue[Optional[tuple]]' = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self)-> None:
+        """
+        Starts the worker thread.
+        """
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name='design-batcher', daemon=True)
+            self._thread.start()
+
+    def stop(self)-> None:
+        """
+        Evaluates the designs already submitted, then stops the worker thread.
+        """
+        if self._thread is not None:
+            self._queue.put(None)
+            self._thread.join()
+            self._thread = None
+
+    def submit(self, designs: List[Dict[str, object]])-> Future:
+        """
+        Input:
+            designs (List[Dict[str, object]]): parsed designs, see parse_design
+
+        Output:
+            future (Future): resolves to the list of result rows, in the same order
+        """
+        future = Future()
+        if not designs:
+            future.set_result([])
+            return future
+        self._queue.put((designs, future))
+        return future
+
+    def _run(self)-> None:
+        stopping = False
+        while not stopping:
+            item = self._queue.get()
+            if item is None:
+                return
+
+            # gather what arrives within the batch window
+            pending = [item]
+            size = len(item[0])
+            deadline = time.perf_counter() + self.batch_window
+            while size < self.max_batch:
+                timeout = deadline - time.perf_counter()
+                try:
+                    item = self._queue.get(timeout=timeout) if timeout > 0 else self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is None:
+                    stopping = True
+                    break
+                pending.append(item)
+                size += len(item[0])
+
+            self._evaluate(pending)
+
+    def _evaluate(self, pending: List[tuple])-> None:
+        designs = [design for request_designs, _ in pending for design in request_designs]
+        try:
+            rows = self._evaluate_single(designs[0]) if len(designs) == 1 else None
+            if rows is None:
+                rows = result_rows(evaluate_parsed(designs, self.thrust_method))
+        except Exception as err:
+            for _, future in pending:
+                future.set_exception(err)
+            return
+
+        self.requests += len(pending)
+        self.designs += len(designs)
+        self.batches += 1
+
+        start = 0
+        for request_designs, future in pending:
+            future.set_result(rows[start:start + len(request_designs)])
+            start += len(request_designs)
+
+    def _evaluate_single(self, design: Dict[str, object])-> Optional[List[Dict[str, object]]]:
+        try:
+            result = dp.evaluate_design(thrust_method=self.thrust_method, **design)
+        except ValueError:
+            # non-physical, the batch path returns it with feasible = False
+            return None
+        row = {}
+        for column in RESULT_COLUMNS:
+            value = getattr(result, column)
+            row[column] = None if isinstance(value, float) and not math.isfinite(value) else value
+        return [row]
+
+
+class DesignRequestHandler(BaseHTTPRequestHandler):
+    # HTTP/1.1 keeps the connections of DesignClient alive, without Nagle's algorithm the
+    # separate header and body writes of a reply are not held back waiting for an ACK
+    protocol_version = 'HTTP/1.1'
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        if self.path != '/health':
+            self._reply(404, {'error': f'Unknown path {self.path}'})
+            return
+        batcher = self.server.batcher
+        self._reply(200, {
+            'status'    : 'ok',
+            'requests'  : batcher.requests,
+            'designs'   : batcher.designs,
+            'batches'   : batcher.batches,
+        })
+
+    def do_POST(self):
+        if self.path != '/evaluate':
+            self._reply(404, {'error': f'Unknown path {self.path}'})
+            return
+
+        try:
+            body = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))))
+            single = isinstance(body, dict) and 'designs' not in body
+            columns = None
+            if single:
+                designs = [body]
+            elif isinstance(body, dict):
+                designs = body['designs']
+                columns = body.get('columns')
+            else:
+                designs = body
+            if not isinstance(designs, list):
+                raise ValueError('designs must be a list of design objects')
+            if columns is not None:
+                if not isinstance(columns, list) or not all(isinstance(column, str) for column in columns):
+                    raise ValueError('columns must be a list of result column names')
+                unknown = [column for column in columns if column not in RESULT_COLUMNS]
+                if unknown:
+                    raise ValueError(f'Unknown result columns {", ".join(map(str, unknown))}')
+            designs = [parse_design(design) for design in designs]
+        except ValueError as err:
+            # json.JSONDecodeError is a ValueError as well
+            self._reply(400, {'error': str(err)})
+            return
+
+        try:
+            rows = self.server.batcher.submit(designs).result()
+        except Exception as err:
+            self._reply(500, {'error': str(err)})
+            return
+
+        if columns is not None:
+            rows = [{column: row[column] for column in columns} for row in rows]
+        self._reply(200, rows[0] if single else rows)
+
+    def _reply(self, status: int, payload)-> None:
+        # strict JSON, result rows hold None for non-finite values
+        body = json.dumps(payload, allow_nan=False).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        # one line per request would dominate the service time
+        pass
+
+
+def make_server(
+        host            : str = '127.0.0.1',
+        port            : int = 8765,
+        max_batch       : int = 4096,
+        batch_window    : float = 0.0,
+        thrust_method   : str = 'fixed_point',
+    )-> ThreadingHTTPServer:
+    """
+    Inputs:
+        host, port      : address to listen on, localhost by default. Port 0 picks a free port
+        max_batch, batch_window, thrust_method : see DesignBatcher
+
+    Output:
+        server (ThreadingHTTPServer): started batcher in server.batcher, call serve_forever() to
+            answer requests, shutdown() / server_close() then server.batcher.stop() to stop
+    """
+    server = ThreadingHTTPServer((host, port), DesignRequestHandler)
+    server.daemon_threads = True
+    server.batcher = DesignBatcher(max_batch=max_batch, batch_window=batch_window, thrust_method=thrust_method)
+    server.batcher.start()
+
+    # evaluate once so the first request does not pay for the lazy set up
+    dp.evaluate_designs(np.array([44.0]), 'LOX_RP1', 'LOX_LH2')
+    return server
+
+
+class DesignClient:
+    """
+    Inputs:
+        host, port  : address of a running design_server
+        timeout     (float): seconds to wait for a reply
+
+    Client keeping one connection open to the server.
+    """
+
+    def __init__(self, host: str = '127.0.0.1', port: int = 8765, timeout: float = 60):
+        self.connection = http.client.HTTPConnection(host, port, timeout=timeout)
+
+    def evaluate(
+            self,
+            designs : Union[Dict[str, object], List[Dict[str, object]]],
+            columns : Optional[List[str]] = None,
+        ):
+        """
+        Inputs:
+            designs (Dict or List[Dict]): one design object or a list of them
+            columns (List[str])         : result columns to return, all of RESULT_COLUMNS by default.
+                                          Large batches are mostly JSON encoding, fewer columns are faster
+
+        Output:
+            results (Dict or List[Dict]): result objects, same shape as designs
+
+        Raises ValueError with the server message if the request is rejected.
+        """
+        if columns is not None:
+            results = self.evaluate({'designs': [designs] if isinstance(designs, dict) else designs, 'columns': columns})
+            return results[0] if isinstance(designs, dict) else results
+
+        body = json.dumps(designs)
+        self.connection.request('POST', '/evaluate', body=body, headers={'Content-Type': 'application/json'})
+        response = self.connection.getresponse()
+        payload = json.loads(response.read())
+        if response.status != 200:
+            raise ValueError(payload.get('error', f'Request failed with status {response.status}'))
+        return payload
+
+    def health(self)-> Dict[str, object]:
+        """
+        Output:
+            status (Dict[str, object]): server status and request / design / batch counts
+        """
+        self.connection.request('GET', '/health')
+        return json.loads(self.connection.getresponse().read())
+
+    def close(self)-> None:
+        self.connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Local design evaluation service')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--max-batch', type=int, default=4096)
+    parser.add_argument('--batch-window', type=float, default=0.0, help='seconds to wait for more designs')
+    parser.add_argument('--thrust-method', default='fixed_point', choices=['fixed_point', 'enumerate'])
+    args = parser.parse_args()
+
+    server = make_server(args.host, args.port, args.max_batch, args.batch_window, args.thrust_method)
+    print(f'Serving designs on http://{args.host}:{server.server_address[1]}/evaluate')
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        server.batcher.stop()
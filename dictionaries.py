@@ -6,7 +6,19 @@
 # Solid=dict(Isp=269, Thrust_st1=4500000, Thrust_st2=2940000, A_e1=6.6, A_e2=2.34, Pressure_st1=10500000, Pressure_st2=5000000)
 # Storeable=dict(Isp=285, Thrust_st1=1750000, Thrust_st2=67000, A_e1=1.5, A_e2=1.13, Pressure_st1=15700000, Pressure_st2=14700000)
 
-from typing import Dict
+from typing import Dict, List, Tuple
+
+# valid mixture names, see Check_Solid_and_Storables
+mixture_names: List[str] = [
+    'LOX_LH2',
+    'LOX_LCH4',
+    'LOX_RP1',
+    'Solid',
+    'Storables',
+]
+
+# mixture name : integer mixture code, used by the batched (array) functions
+mixture_codes: Dict[str, int] = {name: code for code, name in enumerate(mixture_names)}
 
 # mixture name : Isp (seconds)
 Isp_values: Dict[str, int] = {
@@ -14,7 +26,6 @@ Isp_values: Dict[str, int] = {
     'LOX_LH2'    : 366,
     'LOX_RP1'    : 311,
     'Solid'      : 269,
-    'N2O4'       : 285,
     'Storables'  : 285,
 }
 
@@ -89,6 +100,15 @@ fuel_ratios: Dict[str, float] = {
 
 }
 
+# mixture name : (oxidizer, fuel) propellant names, keys of prop_densities
+mixture_propellants: Dict[str, Tuple[str, str]] = {
+    'LOX_LCH4'   : ('LOX', 'LCH4'),
+    'LOX_LH2'    : ('LOX', 'LH2'),
+    'LOX_RP1'    : ('LOX', 'RP1'),
+    'Solid'      : ('Solid', 'Solid'),
+    'Storables'  : ('N2O4', 'UDMH'),
+}
+
 # prop name : density (kg/m3)
 prop_densities: Dict[str, int] ={
     'LH2'        : 71, 
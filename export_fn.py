@@ -1,6 +1,11 @@
-import pandas as pd
+def export(masses, totals, path="results.csv"):
+    """
+    Write the mass budget table of one design to path (overwritten) and print it.
+    To stream many designs to disk use results_writer.ResultsWriter instead.
+    """
+    # pandas is only imported when a table is exported
+    import pandas as pd
 
-def export(masses, totals):
     rows = [
         "Propellant",
         "Propellant tanks/casing",
@@ -13,7 +18,12 @@ def export(masses, totals):
         "Payload fairing",
         "Inter-tank fairing",
         "Inter-stage fairing",
-        "Aft fairing"
+        "Aft fairing",
+        "Stage 1 Total",
+        "Stage 2 Total",
+        "Total Mass with mass margin to inert masses",
+        "Total Cost ($B, 2025)",
+        "Total Cost With Margin ($B, 2025)",
     ]
     
     masses_t = [m / 1000 for m in masses]
@@ -28,17 +38,8 @@ def export(masses, totals):
 
     df = pd.DataFrame({
         "Subsystem": rows,
-        "Mass (t)": masses_t,
+        "Mass (t)": masses_t + totals_t,
     })
     
-    df = pd.concat([
-        df,
-        pd.DataFrame({"Subsystem": ["Stage 1 Total"], "Mass (t)": [totals_t[0]]}),
-        pd.DataFrame({"Subsystem": ["Stage 2 Total"], "Mass (t)": [totals_t[1]]}),
-        pd.DataFrame({"Subsystem": ["Total Mass with mass margin to inert masses"], "Mass (t)": [totals_t[2]]}),
-        pd.DataFrame({"Subsystem": ["Total Cost ($B, 2025)"], "Mass (t)": [totals_t[3]]}),
-        pd.DataFrame({"Subsystem": ["Total Cost With Margin ($B, 2025)"], "Mass (t)": [totals_t[4]]})
-    ], ignore_index=True)
-    
-    df.to_csv("results.csv", index=False)
-    print(df.round(3))
\ No newline at end of file
+    df.to_csv(path, index=False)
+    print(df.round(3))
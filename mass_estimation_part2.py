@@ -2,21 +2,38 @@ import numpy as np
 
 from typing import Tuple
 from dictionaries import Isp_values
+from property_tables import stage_1_properties, stage_2_properties, to_mixture_codes
+
+#knowns
+dv_req = 12300 #m/s
+g_0 = 9.81 # m/s2
+m_pl_2 = 26000 # kg
+delta_1 = 0.08
+delta_2 = 0.08
+
+# Smallest stage payload fraction (mass ratio - inert fraction) treated as a usable design,
+# below it the gross masses grow without bound
+MIN_PAYLOAD_FRACTION = 1e-3
 
 
 def mass_estimation(
         X           : float,
         mixture_1   : str,
         mixture_2   : str,
+        verbose     : bool = False,
+        delta_1     : float = delta_1,
+        delta_2     : float = delta_2,
     )-> Tuple[float, float, float, float]:
     """
     Calculates relevant mass values for use in heuristics from stage 1 dV fraction, X
     
     Inputs:
-    X           (float) : stage 1 dV fraction percentage
+    X           (float or np.array) : stage 1 dV fraction percentage, arrays give array outputs
     mixture_1   (string): stage 1 Propellant Mixture
     mixture_2   (string): stage 2 Propellant Mixture
-
+    verbose     (bool)  : print the inert mass estimates
+    delta_1     (float or np.array) : stage 1 inert mass fraction, inert mass / LV gross mass
+    delta_2     (float or np.array) : stage 2 inert mass fraction, inert mass / stage 2 gross mass
 
     Outputs:
     m_pr_1  (float): mass of stage 1 propellant
@@ -26,13 +43,6 @@ def mass_estimation(
 
     Using the stage 1 delta V fraction, find the gross mass 
     """
-    #knowns
-    dv_req = 12300 #m/s
-    g_0 = 9.81 # m/s2
-    m_pl_2 = 26000 # kg
-    delta_1 = 0.08
-    delta_2 = 0.08
-
     stage_1_dv = dv_req * (X / 100)
     stage_2_dv = dv_req * (1 - X/100)
 
@@ -75,16 +85,20 @@ def mass_estimation(
     m_in_1 = delta_1 * m_0
     m_pr_1 = m_0 - m_in_1 - m_pl_1
 
-    print(f'Stage 1 Inert Mass Estimate: {m_in_1:.3f} (kg)')
-    print(f'Stage 2 Inert Mass Estimate: {m_in_2:.3f} (kg)')
+    if verbose:
+        print(f'Stage 1 Inert Mass Estimate: {m_in_1:.3f} (kg)')
+        print(f'Stage 2 Inert Mass Estimate: {m_in_2:.3f} (kg)')
 
     #Overwrite edge case if there is a negative mass (non-physical)
-    if m_0 < 0:
-        m_in_1 = np.nan
-        m_pr_1 = np.nan
-        m_in_2 = np.nan
-        m_pr_2 = np.nan
-        m_0 = np.nan
+    # with both payload fractions negative m_0 comes out positive, so stage 2 is checked as well
+    stage_2_non_physical = m_0_2 <= 0
+    non_physical = (m_0 < 0) | stage_2_non_physical
+    m_in_1 = np.where(non_physical, np.nan, m_in_1)[()]
+    m_pr_1 = np.where(non_physical, np.nan, m_pr_1)[()]
+    m_in_2 = np.where(non_physical, np.nan, m_in_2)[()]
+    m_pr_2 = np.where(non_physical, np.nan, m_pr_2)[()]
+    m_0 = np.where(non_physical, np.nan, m_0)[()]
+    m_0_2 = np.where(stage_2_non_physical, np.nan, m_0_2)[()]
 
     # print(f"Debug - m_pr_1: {m_pr_1}")
     # print(f"Debug - m_pr_2: {m_pr_2}")
@@ -93,6 +107,42 @@ def mass_estimation(
 
     return m_pr_1, m_pr_2, m_0, m_0_2
 
+def feasible_X_window(
+        mixture_1               ,
+        mixture_2               ,
+        min_payload_fraction    : float = 0.0,
+    )-> Tuple[float, float]:
+    """
+    Range of stage 1 dV fraction X for which both stages of mass_estimation are physical
+
+    Inputs:
+    mixture_1               (str, int or array) : stage 1 mixture names or integer mixture codes
+    mixture_2               (str, int or array) : stage 2 mixture names or integer mixture codes
+    min_payload_fraction    (float)             : payload fraction exp(-dv/(g_0*Isp)) - delta each
+                                                  stage must exceed, 0 for the physical limit,
+                                                  MIN_PAYLOAD_FRACTION to also drop degenerate designs
+
+    Outputs:
+    X_min   (float or np.array): lower bound of X (%), set by stage 2
+    X_max   (float or np.array): upper bound of X (%), set by stage 1
+
+    The open interval (X_min, X_max) is clipped to [0, 100]. X_min >= X_max means no split works.
+
+    Each stage needs exp(-dv/(g_0*Isp)) - delta > min_payload_fraction, i.e.
+        stage 1: X < 100 * g_0*Isp_1*ln(1/(delta_1 + min_payload_fraction)) / dv_req
+        stage 2: X > 100 * (1 - g_0*Isp_2*ln(1/(delta_2 + min_payload_fraction)) / dv_req)
+    """
+    stage_1_Isp = stage_1_properties['Isp'][to_mixture_codes(mixture_1)]
+    stage_2_Isp = stage_2_properties['Isp'][to_mixture_codes(mixture_2)]
+
+    stage_1_max_dv = g_0 * stage_1_Isp * np.log(1 / (delta_1 + min_payload_fraction))
+    stage_2_max_dv = g_0 * stage_2_Isp * np.log(1 / (delta_2 + min_payload_fraction))
+
+    X_min = np.clip(100 * (1 - stage_2_max_dv / dv_req), 0, 100)[()]
+    X_max = np.clip(100 * stage_1_max_dv / dv_req, 0, 100)[()]
+
+    return X_min, X_max
+
 def stage_nre_cost(m_in):
     """
     Estimate the total non-recurring engineering (NRE) cost of a launch vehicle stage
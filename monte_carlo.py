@@ -0,0 +1,250 @@
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Dict, Optional, Sequence, Tuple
+
+import checkpoint
+import design_pipeline as dp
+
+from Mass_functions import MER_COEFFICIENTS
+
+
+'''
+Monte Carlo uncertainty propagation of the mass estimating relationships (MERs).
+
+The coefficients of Mass_functions and the inert mass margin are empirical. Every sample
+draws one set of them and the whole design chain (sizing, thrust iteration, mass budget
+and cost) is evaluated for all samples of a chunk at once by design_pipeline.evaluate_designs,
+the coefficients being passed as arrays with one entry per sample.
+
+Uncertain parameters are named '<Mass_functions function>.<keyword>' (see MER_COEFFICIENTS)
+or 'mass_margin', each is drawn from a normal distribution around its nominal value with
+the given relative standard deviation. Parameters that are not listed keep their nominal value.
+
+Chunks are seeded from one SeedSequence, so the samples only depend on seed and
+chunk_size, not on the number of worker processes, and a checkpointed run resumed after
+an interruption draws the same samples.
+
+Usage Examples:
+    result = monte_carlo(44, 'LOX_RP1', 'LOX_LH2', n_samples=1000000)
+    print(result.summary())
+
+    # exponents uncertain as well, 4 processes
+    uncertainty = dict(DEFAULT_UNCERTAINTY, **{'M_fairing.exponent': 0.02})
+    result = monte_carlo(44, 'LOX_RP1', 'LOX_LH2', n_samples=1000000, uncertainty=uncertainty, workers=4)
+    result.percentiles['total_mass'][95]
+'''
+
+# Relative standard deviation of every uncertain parameter
+DEFAULT_UNCERTAINTY: Dict[str, float] = {
+    'Rocket_Engine.thrust_coefficient'      : 0.1,
+    'Rocket_Engine.expansion_coefficient'   : 0.1,
+    'Rocket_Engine.fixed_mass'              : 0.1,
+    'Motor_Casing.coefficient'              : 0.1,
+    'Struct_Mass.coefficient'               : 0.1,
+    'M_fairing.coefficient'                 : 0.1,
+    'M_avionic.coefficient'                 : 0.1,
+    'M_wiring.coefficient'                  : 0.1,
+    'M_gimbals.coefficient'                 : 0.1,
+    'mass_margin'                           : 0.05,
+}
+
+# Design outputs summarised over the samples
+REPORTED_COLUMNS = [
+    's1_inert_mass',
+    's2_inert_mass',
+    'stage_1_totals',
+    'stage_2_totals',
+    'total_mass',
+    's1_cost_with_margin',
+    's2_cost_with_margin',
+    'total_cost_with_margin',
+    's1_engine_count',
+    's2_engine_count',
+]
+
+
+@dataclass(slots=True)
+class MonteCarloResult:
+    n_samples   : int
+    n_failed    : int                           # samples without a converged design
+    percentiles : Dict[str, Dict[float, float]] # column -> percentile -> value
+    mean        : Dict[str, float]
+    std         : Dict[str, float]
+    samples     : Optional[Dict[str, np.ndarray]] = None
+
+    def summary(self)-> str:
+        """
+        Output:
+            table (str): mean, standard deviation and percentiles of every reported column
+        """
+        levels = list(next(iter(self.percentiles.values())))
+        header = f"{'column':<24} {'mean':>14} {'std':>12}" + ''.join(f'{f"P{p:g}":>14}' for p in levels)
+        lines = [header]
+        for column, values in self.percentiles.items():
+            lines.append(
+                f'{column:<24} {self.mean[column]:>14.3f} {self.std[column]:>12.3f}'
+                + ''.join(f'{values[p]:>14.3f}' for p in levels)
+            )
+        lines.append(f'{self.n_samples} samples, {self.n_failed} failed')
+        return '\n'.join(lines)
+
+
+def sample_coefficients(
+        n_samples   : int,
+        rng         : np.random.Generator,
+        uncertainty : Dict[str, float],
+    )-> Tuple[Dict[str, Dict[str, np.ndarray]], np.ndarray]:
+    """
+    Inputs:
+        n_samples   (int)               : number of coefficient sets
+        rng         (np.random.Generator): random number generator
+        uncertainty (Dict[str, float])  : relative standard deviation per parameter
+
+    Outputs:
+        coefficients (Dict[str, Dict[str, np.ndarray]]) : MER coefficient arrays for evaluate_designs
+        mass_margin  (np.ndarray)                       : inert mass margin of every sample
+
+    Draws are clipped at zero, a negative coefficient has no physical meaning.
+    """
+    coefficients = {}
+    mass_margin = np.full(n_samples, dp.MASS_MARGIN)
+
+    for name, relative_std in uncertainty.items():
+        if name == 'mass_margin':
+            mass_margin = np.maximum(rng.normal(dp.MASS_MARGIN, relative_std * dp.MASS_MARGIN, n_samples), 0)
+            continue
+
+        function, _, keyword = name.partition('.')
+        if keyword not in MER_COEFFICIENTS.get(function, {}):
+            raise ValueError(f'Unknown MER coefficient {name}, see Mass_functions.MER_COEFFICIENTS')
+
+        nominal = MER_COEFFICIENTS[function][keyword]
+        coefficients.setdefault(function, {})[keyword] = np.maximum(
+            rng.normal(nominal, relative_std * abs(nominal), n_samples), 0)
+
+    return coefficients, mass_margin
+
+
+def _run_chunk(task)-> Dict[str, np.ndarray]:
+    # one chunk of samples, module level so it can run in a worker process
+    design, n_samples, seed, uncertainty = task
+    coefficients, mass_margin = sample_coefficients(n_samples, np.random.default_rng(seed), uncertainty)
+
+    results = dp.evaluate_designs(
+        np.full(n_samples, design['X'], dtype=float),
+        coefficients=coefficients,
+        mass_margin=mass_margin,
+        **{key: value for key, value in design.items() if key != 'X'},
+    )
+    failed = ~(results['feasible'] & results['thrust_converged'])
+    return {column: np.where(failed, np.nan, results[column]) for column in REPORTED_COLUMNS}
+
+
+def monte_carlo(
+        X               : float,
+        s1_prop_mix     : str,
+        s2_prop_mix     : str,
+        stage_1_radius  : float = 2.6 * 3,
+        stage_2_radius  : float = 2.6,
+        nose_h          : float = 6,
+        nose_r          : float = 2.6,
+        m_pl            : float = 26000,
+        n_samples       : int = 100000,
+        uncertainty     : Optional[Dict[str, float]] = None,
+        percentiles     : Sequence[float] = (5, 50, 95),
+        chunk_size      : int = 100000,
+        workers         : int = 1,
+        seed            : Optional[int] = 0,
+        keep_samples    : bool = False,
+        checkpoint_dir  : Optional[str] = None,
+    )-> MonteCarloResult:
+    """
+    Inputs:
+        X, s1_prop_mix, ..., m_pl : the design, see design_pipeline.evaluate_design
+        n_samples       (int)               : number of coefficient sets
+        uncertainty     (Dict[str, float])  : relative standard deviation per parameter,
+                                              defaults to DEFAULT_UNCERTAINTY
+        percentiles     (Sequence[float])   : percentiles reported for every column
+        chunk_size      (int)               : samples evaluated per batch
+        workers         (int)               : worker processes, 1 runs in this process
+        seed            (int)               : random seed
+        keep_samples    (bool)              : also return the sampled outputs
+        checkpoint_dir  (str)               : save every chunk there and resume from it (see
+                                              checkpoint.Checkpoint), needs a seed
+
+    Output:
+        result (MonteCarloResult): percentiles, mean and standard deviation of REPORTED_COLUMNS.
+            Samples without a physical, converged design are counted as failed and left out.
+    """
+    if uncertainty is None:
+        uncertainty = DEFAULT_UNCERTAINTY
+
+    design = {
+        'X'             : X,
+        's1_prop_mix'   : s1_prop_mix,
+        's2_prop_mix'   : s2_prop_mix,
+        'stage_1_radius': stage_1_radius,
+        'stage_2_radius': stage_2_radius,
+        'nose_h'        : nose_h,
+        'nose_r'        : nose_r,
+        'm_pl'          : m_pl,
+    }
+
+    sizes = [min(chunk_size, n_samples - start) for start in range(0, n_samples, chunk_size)]
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    tasks = [(design, size, chunk_seed, uncertainty) for size, chunk_seed in zip(sizes, seeds)]
+
+    run = None
+    if checkpoint_dir is not None:
+        if seed is None:
+            raise ValueError('A checkpointed run needs a seed to resume')
+        run = checkpoint.Checkpoint(
+            checkpoint_dir,
+            dict(design, n_samples=n_samples, uncertainty=uncertainty, chunk_size=chunk_size, seed=seed),
+            n_chunks=len(tasks),
+        )
+    todo = list(range(len(tasks))) if run is None else run.unfinished()
+
+    chunks = {}
+
+    def finish(i, chunk):
+        # saved as soon as it is done, an interrupted run loses at most the chunks in flight
+        if run is not None:
+            run.save(i, chunk)
+        chunks[i] = chunk
+
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            for i, chunk in zip(todo, executor.map(_run_chunk, [tasks[i] for i in todo])):
+                finish(i, chunk)
+    else:
+        for i in todo:
+            finish(i, _run_chunk(tasks[i]))
+
+    chunks = [chunks[i] if i in chunks else run.load(i) for i in range(len(tasks))]
+
+    samples = {column: np.concatenate([chunk[column] for chunk in chunks]) for column in REPORTED_COLUMNS}
+    failed = np.isnan(samples['total_mass'])
+    valid = {column: values[~failed] for column, values in samples.items()}
+
+    return MonteCarloResult(
+        n_samples=n_samples,
+        n_failed=int(failed.sum()),
+        percentiles={
+            column: dict(zip(percentiles, np.percentile(values, percentiles).tolist() if values.size else [np.nan] * len(percentiles)))
+            for column, values in valid.items()
+        },
+        mean={column: float(values.mean()) if values.size else np.nan for column, values in valid.items()},
+        std={column: float(values.std()) if values.size else np.nan for column, values in valid.items()},
+        samples=samples if keep_samples else None,
+    )
+
+
+if __name__ == '__main__':
+    import sys
+
+    n_samples = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    workers = int(sys.argv[2]) if len(sys.argv) > 2 else 1
+
+    print(monte_carlo(44, 'LOX_RP1', 'LOX_LH2', n_samples=n_samples, workers=workers).summary())
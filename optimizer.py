@@ -0,0 +1,238 @@
+import math
+import numpy as np
+from dataclasses import dataclass
+from typing import Callable, Dict, Optional, Tuple
+
+import design_pipeline as dp
+import mass_estimation_part2 as me2
+
+from design_pipeline import OUTPUT_COLUMNS
+
+
+'''
+Optimal stage 1 dV split (X) of a mixture pair over the full design chain.
+
+X is treated as continuous and limited to the analytic feasible window of the mixture
+pair (mass_estimation_part2.feasible_X_window). A coarse scan brackets the best split, Brent's
+method (golden-section steps with parabolic interpolation) then refines it inside the
+bracket. Every design is evaluated with design_pipeline.evaluate_design, non-physical
+splits count as infinitely bad.
+
+Usage Examples:
+    result = optimize_split('LOX_RP1', 'LOX_LH2')
+    print(result.X, result.value, result.evaluations)
+
+    # cheapest design instead of the lightest, X to 0.001 %
+    result = optimize_split('LOX_LCH4', 'LOX_LCH4', objective='total_cost_with_margin', xtol=1e-3)
+
+    python optimizer.py LOX_RP1 LOX_LH2 --objective total_cost_with_margin
+'''
+
+# 0.381966..., golden-section step as a fraction of the bracket
+_GOLDEN = 0.5 * (3 - math.sqrt(5))
+
+
+@dataclass(slots=True)
+class OptimizationResult:
+    X           : float             # optimal stage 1 dV fraction percentage
+    value       : float             # objective at X
+    objective   : str               # DesignResult field that was minimised
+    design      : dp.DesignResult   # design at X
+    evaluations : int               # designs evaluated, coarse scan included
+    iterations  : int               # Brent iterations
+    converged   : bool              # X is known to xtol
+    bracket     : Tuple[float, float]
+
+
+def brent_minimize(
+        f               : Callable[[float], float],
+        a               : float,
+        b               : float,
+        x0              : Optional[float] = None,
+        xtol            : float = 1e-2,
+        max_iterations  : int = 100,
+    )-> Tuple[float, float, int, bool]:
+    """
+    Inputs:
+        f               (Callable)  : function to minimise, may return inf where it is undefined
+        a, b            (float)     : bracket of the minimum, a < b
+        x0              (float)     : starting point inside (a, b), defaults to the golden-section point
+        xtol            (float)     : absolute tolerance on x
+        max_iterations  (int)       : iteration limit
+
+    Outputs:
+        x           (float) : location of the minimum
+        fx          (float) : f(x)
+        iterations  (int)   : iterations used
+        converged   (bool)  : bracket shrunk below xtol around x
+    """
+    if not a < b:
+        raise ValueError('Bracket must satisfy a < b')
+
+    x = a + _GOLDEN * (b - a) if x0 is None or not a < x0 < b else x0
+    w = v = x
+    fx = fw = fv = f(x)
+    d = e = 0.0
+    tol1 = 0.5 * xtol
+    tol2 = xtol
+
+    for iteration in range(max_iterations):
+        m = 0.5 * (a + b)
+        if abs(x - m) <= tol2 - 0.5 * (b - a):
+            return x, fx, iteration, True
+
+        golden_step = True
+        # parabola through x, w, v, only with finite values and after a large enough step
+        if abs(e) > tol1 and math.isfinite(fx + fw + fv):
+            r = (x - w) * (fx - fv)
+            q = (x - v) * (fx - fw)
+            p = (x - v) * q - (x - w) * r
+            q = 2 * (q - r)
+            if q > 0:
+                p = -p
+            q = abs(q)
+            e_previous = e
+            e = d
+            if abs(p) < abs(0.5 * q * e_previous) and q * (a - x) < p < q * (b - x):
+                d = p / q
+                if (x + d) - a < tol2 or b - (x + d) < tol2:
+                    d = math.copysign(tol1, m - x)
+                golden_step = False
+
+        if golden_step:
+            e = (a - x) if x >= m else (b - x)
+            d = _GOLDEN * e
+
+        u = x + d if abs(d) >= tol1 else x + math.copysign(tol1, d)
+        fu = f(u)
+
+        if fu <= fx:
+            if u >= x:
+                a = x
+            else:
+                b = x
+            v, fv = w, fw
+            w, fw = x, fx
+            x, fx = u, fu
+        else:
+            if u < x:
+                a = u
+            else:
+                b = u
+            if fu <= fw or w == x:
+                v, fv = w, fw
+                w, fw = u, fu
+            elif fu <= fv or v == x or v == w:
+                v, fv = u, fu
+
+    return x, fx, max_iterations, False
+
+
+def optimize_split(
+        s1_prop_mix     : str,
+        s2_prop_mix     : str,
+        objective       : str = 'total_mass',
+        stage_1_radius  : float = 2.6 * 3,
+        stage_2_radius  : float = 2.6,
+        nose_h          : float = 6,
+        nose_r          : float = 2.6,
+        m_pl            : float = 26000,
+        X_bounds        : Optional[Tuple[float, float]] = None,
+        coarse_points   : int = 9,
+        xtol            : float = 1e-2,
+        max_iterations  : int = 100,
+    )-> OptimizationResult:
+    """
+    Inputs:
+        s1_prop_mix     (str)   : stage 1 propellant name
+        s2_prop_mix     (str)   : stage 2 propellant name
+        objective       (str)   : output column to minimise, e.g. 'total_mass' (includes the
+                                  mass margin), 'total_cost' or 'total_cost_with_margin'
+        stage_1_radius, stage_2_radius, nose_h, nose_r, m_pl : see design_pipeline.evaluate_design
+        X_bounds        (Tuple[float, float]) : range of X searched (%), intersected with the
+                                                feasible window of the mixture pair, None for the window
+        coarse_points   (int)   : evenly spaced X evaluated to bracket the optimum
+        xtol            (float) : absolute tolerance on X (%)
+        max_iterations  (int)   : Brent iteration limit
+
+    Output:
+        result (OptimizationResult): optimum X, objective value, design and evaluation count
+
+    Raises ValueError if no X in X_bounds gives a physical design.
+    """
+    if objective not in OUTPUT_COLUMNS:
+        raise ValueError(f'Unknown objective {objective}, use one of the design output columns')
+    if coarse_points < 3:
+        raise ValueError('coarse_points must be at least 3')
+
+    designs: Dict[float, Optional[dp.DesignResult]] = {}
+
+    def evaluate(X: float)-> float:
+        if X not in designs:
+            try:
+                designs[X] = dp.evaluate_design(
+                    X,
+                    s1_prop_mix,
+                    s2_prop_mix,
+                    stage_1_radius=stage_1_radius,
+                    stage_2_radius=stage_2_radius,
+                    nose_h=nose_h,
+                    nose_r=nose_r,
+                    m_pl=m_pl,
+                )
+            except ValueError:
+                # non-physical dV split
+                designs[X] = None
+
+        design = designs[X]
+        value = math.inf if design is None else float(getattr(design, objective))
+        return value if math.isfinite(value) else math.inf
+
+    X_min, X_max = me2.feasible_X_window(s1_prop_mix, s2_prop_mix, me2.MIN_PAYLOAD_FRACTION)
+    if X_bounds is not None:
+        X_min, X_max = max(X_min, X_bounds[0]), min(X_max, X_bounds[1])
+    if not X_min < X_max:
+        raise ValueError('No physical dV split in X_bounds')
+
+    grid = np.linspace(X_min, X_max, coarse_points).tolist()
+    values = [evaluate(X) for X in grid]
+
+    best = int(np.argmin(values))
+    if not math.isfinite(values[best]):
+        raise ValueError('No physical dV split in X_bounds')
+
+    bracket = (grid[max(best - 1, 0)], grid[min(best + 1, coarse_points - 1)])
+    X, value, iterations, converged = brent_minimize(
+        evaluate,
+        bracket[0],
+        bracket[1],
+        x0=grid[best],
+        xtol=xtol,
+        max_iterations=max_iterations,
+    )
+
+    return OptimizationResult(
+        X=X,
+        value=value,
+        objective=objective,
+        design=designs[X],
+        evaluations=len(designs),
+        iterations=iterations,
+        converged=converged,
+        bracket=bracket,
+    )
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Optimal stage 1 dV split of a mixture pair')
+    parser.add_argument('s1_prop_mix')
+    parser.add_argument('s2_prop_mix')
+    parser.add_argument('--objective', default='total_mass')
+    parser.add_argument('--xtol', type=float, default=1e-2)
+    args = parser.parse_args()
+
+    result = optimize_split(args.s1_prop_mix, args.s2_prop_mix, objective=args.objective, xtol=args.xtol)
+    print(f'X = {result.X:.4f} %, {result.objective} = {result.value:.3f}')
+    print(f'{result.evaluations} evaluations, {result.iterations} Brent iterations, converged: {result.converged}')
@@ -0,0 +1,200 @@
+import itertools
+import numpy as np
+from typing import Dict, Iterable, Iterator, Optional, Sequence, Tuple
+
+import design_pipeline as dp
+import mass_estimation_part2 as me2
+
+from design_pipeline import INPUT_COLUMNS, OUTPUT_COLUMNS, STATUS_COLUMNS
+from dictionaries import mixture_codes, mixture_names
+
+
+'''
+Mass vs cost Pareto front of the design space.
+
+Designs are sampled at random over mixture pairs, stage 1 dV split, stage radii and
+nose cone dimensions and evaluated chunk by chunk with design_pipeline.evaluate_designs.
+After every chunk only the non-dominated designs are kept, so memory holds one chunk
+plus the current front whatever the number of samples.
+
+Both objectives are minimised:
+    total_mass              : stage_1_totals + stage_2_totals (inert masses with margin)
+    total_cost_with_margin  : s1_cost_with_margin + s2_cost_with_margin
+
+Usage Examples:
+    front = pareto_sweep(n_samples = 1000000)
+    print(front['total_mass'], front['total_cost_with_margin'])
+
+    # LOX first stages only, front streamed to a file
+    with ResultsWriter('front.csv') as writer:
+        pareto_sweep(n_samples = 100000, s1_mixtures = ['LOX_LH2', 'LOX_LCH4', 'LOX_RP1'], writer = writer)
+
+    python pareto.py 1000000 front.csv
+'''
+
+RESULT_COLUMNS = INPUT_COLUMNS + OUTPUT_COLUMNS + STATUS_COLUMNS
+
+
+def pareto_front(objective_1: np.ndarray, objective_2: np.ndarray)-> np.ndarray:
+    """
+    Inputs:
+        objective_1 (np.ndarray): first objective of every point, minimised
+        objective_2 (np.ndarray): second objective of every point, minimised
+
+    Output:
+        front (np.ndarray): indices of the non-dominated points, sorted by increasing
+            objective_1 (and so decreasing objective_2). Of identical points only one is kept.
+
+    Sorts by objective_1 then objective_2 and keeps every point that improves on the best
+    objective_2 seen so far, O(n log n).
+    """
+    objective_1 = np.asarray(objective_1, dtype=float)
+    objective_2 = np.asarray(objective_2, dtype=float)
+
+    order = np.lexsort((objective_2, objective_1))
+    sorted_2 = objective_2[order]
+
+    # best objective_2 of every point before this one in the sorted order
+    best_before = np.minimum.accumulate(np.concatenate(([np.inf], sorted_2[:-1])))
+    return order[sorted_2 < best_before]
+
+
+def sample_designs(
+        n_samples               : int,
+        rng                     : np.random.Generator,
+        s1_mixtures             : Optional[Iterable[str]] = None,
+        s2_mixtures             : Optional[Iterable[str]] = None,
+        X_range                 : Tuple[float, float] = (1, 99),
+        stage_1_radius_range    : Tuple[float, float] = (2.6, 2.6 * 3),
+        stage_2_radius_range    : Tuple[float, float] = (1.3, 2.6 * 1.5),
+        nose_h_range            : Tuple[float, float] = (4, 9),
+        nose_r_range            : Tuple[float, float] = (1.3, 2.6 * 1.5),
+    )-> Dict[str, np.ndarray]:
+    """
+    Inputs:
+        n_samples   (int)               : number of designs
+        rng         (np.random.Generator): random number generator
+        s1_mixtures (Iterable[str])     : stage 1 mixture names, defaults to every mixture
+        s2_mixtures (Iterable[str])     : stage 2 mixture names, defaults to every mixture
+        *_range     (Tuple[float, float]): uniform sampling range of each continuous input,
+                                          the nose cone is an ellipsoid and needs nose_h > nose_r.
+                                          X is only drawn inside the feasible window of its mixture
+                                          pair (mass_estimation_part2.feasible_X_window)
+
+    Output:
+        designs (Dict[str, np.ndarray]): evaluate_designs inputs, mixtures as integer codes.
+            Mixture pairs are drawn uniformly from s1_mixtures x s2_mixtures.
+    """
+    s1_mixtures = mixture_names if s1_mixtures is None else list(s1_mixtures)
+    s2_mixtures = mixture_names if s2_mixtures is None else list(s2_mixtures)
+    for mixture in s1_mixtures + s2_mixtures:
+        if mixture not in mixture_codes:
+            raise ValueError('Invalid mixture name, check naming convention in dictionary')
+
+    pairs = np.array([
+        (mixture_codes[s1], mixture_codes[s2]) for s1, s2 in itertools.product(s1_mixtures, s2_mixtures)
+    ])
+
+    # keep the pairs with physical splits in X_range
+    X_min, X_max = me2.feasible_X_window(pairs[:, 0], pairs[:, 1], me2.MIN_PAYLOAD_FRACTION)
+    X_min = np.maximum(X_min, X_range[0])
+    X_max = np.minimum(X_max, X_range[1])
+    usable = X_min < X_max
+    if not usable.any():
+        raise ValueError('No mixture pair has a physical dV split in X_range')
+    pairs, X_min, X_max = pairs[usable], X_min[usable], X_max[usable]
+
+    pair = rng.integers(0, len(pairs), n_samples)
+
+    return {
+        'X'             : X_min[pair] + rng.random(n_samples) * (X_max[pair] - X_min[pair]),
+        's1_prop_mix'   : pairs[pair, 0],
+        's2_prop_mix'   : pairs[pair, 1],
+        'stage_1_radius': rng.uniform(*stage_1_radius_range, n_samples),
+        'stage_2_radius': rng.uniform(*stage_2_radius_range, n_samples),
+        'nose_h'        : rng.uniform(*nose_h_range, n_samples),
+        'nose_r'        : rng.uniform(*nose_r_range, n_samples),
+    }
+
+
+def pareto_chunks(
+        n_samples   : int,
+        objectives  : Sequence[str] = ('total_mass', 'total_cost_with_margin'),
+        m_pl        : float = 26000,
+        chunk_size  : int = 100000,
+        seed        : Optional[int] = 0,
+        **sampling,
+    )-> Iterator[Dict[str, np.ndarray]]:
+    """
+    Inputs:
+        n_samples   (int)           : number of designs sampled in total
+        objectives  (Sequence[str]) : the two output columns minimised
+        m_pl        (float)         : payload mass (kg)
+        chunk_size  (int)           : designs sampled and evaluated per batch
+        seed        (int)           : random seed, the same seed gives the same samples
+        sampling                    : sample_designs() keyword arguments
+
+    Output:
+        Iterator of the running front after each chunk, RESULT_COLUMNS arrays sorted by the
+        first objective. Non-physical designs are never part of the front.
+    """
+    if len(objectives) != 2:
+        raise ValueError('Exactly two objectives are needed')
+    for objective in objectives:
+        if objective not in OUTPUT_COLUMNS:
+            raise ValueError(f'Unknown objective {objective}, use one of the design output columns')
+
+    rng = np.random.default_rng(seed)
+    front = None
+
+    for start in range(0, n_samples, chunk_size):
+        inputs = sample_designs(min(chunk_size, n_samples - start), rng, **sampling)
+        designs = dp.evaluate_designs(m_pl=m_pl, **inputs)
+
+        keep = designs['feasible'] & np.isfinite(designs[objectives[0]]) & np.isfinite(designs[objectives[1]])
+        candidates = {column: np.asarray(designs[column])[keep] for column in RESULT_COLUMNS}
+        if front is not None:
+            candidates = {column: np.concatenate((front[column], candidates[column])) for column in RESULT_COLUMNS}
+
+        idx = pareto_front(candidates[objectives[0]], candidates[objectives[1]])
+        front = {column: values[idx] for column, values in candidates.items()}
+        yield front
+
+
+def pareto_sweep(
+        n_samples   : int,
+        objectives  : Sequence[str] = ('total_mass', 'total_cost_with_margin'),
+        m_pl        : float = 26000,
+        chunk_size  : int = 100000,
+        seed        : Optional[int] = 0,
+        writer      = None,
+        **sampling,
+    )-> Dict[str, np.ndarray]:
+    """
+    Inputs:
+        writer (results_writer.ResultsWriter): optional, the final front is written to it
+        see pareto_chunks() for the other arguments
+
+    Output:
+        front (Dict[str, np.ndarray]): RESULT_COLUMNS arrays of the non-dominated designs,
+            sorted by the first objective
+    """
+    front = {column: np.empty(0) for column in RESULT_COLUMNS}
+    for front in pareto_chunks(n_samples, objectives, m_pl=m_pl, chunk_size=chunk_size, seed=seed, **sampling):
+        pass
+
+    if writer is not None:
+        writer.write_batch(front)
+    return front
+
+
+if __name__ == '__main__':
+    import sys
+    from results_writer import ResultsWriter
+
+    n_samples = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    path = sys.argv[2] if len(sys.argv) > 2 else 'pareto_front.csv'
+
+    with ResultsWriter(path) as writer:
+        front = pareto_sweep(n_samples, writer=writer)
+    print(f'{len(front["X"])} non-dominated designs of {n_samples} written to {path}')
@@ -1,50 +1,60 @@
-#Requires numpy and matplotlib
+#Requires numpy and matplotlib (matplotlib is only imported by the plotting functions)
 import numpy as np
-import matplotlib.pyplot as plt
 
-def delta_V_split(stage_1_Isp, stage_2_Isp):
+def delta_V_split(stage_1_Isp, stage_2_Isp, N=100, X=None):
     """
     Create a matrix of delta V splits (0, 1) identified by X,
     Where the first stage delta_V fraction X plus the second stage delta_V fraction 1-X
     equals the total required delta_V of 12.3.
 
     Call stage_mass() to asign each split its corresponding mass properties.
+    All splits are evaluated in a single broadcast pass, so N can be made as
+    dense as needed (e.g. N = 1e6 split points).
 
     Input:
-    stage_1_Isp (float): Isp of the first stage engine (sec)
-    stage_2_Isp (float): Isp of the second stage engine (sec)
+    stage_1_Isp (float or np.array): Isp of the first stage engine (sec)
+    stage_2_Isp (float or np.array): Isp of the second stage engine (sec)
+    N           (int)              : number of evenly spaced splits over [0, 100) %
+    X           (np.array)         : explicit stage 1 dV fractions (percent), overrides N
 
     Output:
     delta_V_data (np.array): [X, stage_1_dV, stage_1_dV, m_in_1, m_pr_1, m_in_2, m_pr_2, m0, stage_1_no_pl, stage_1_no_pl], all floats
 
+    The Isp inputs and X broadcast against each other, the 10 data columns are
+    always the last axis. For example an Isp x Isp x X cube is obtained with:
+        delta_V_split(isp_1[:, None, None], isp_2[None, :, None], N=1000)
+    which returns an array of shape (len(isp_1), len(isp_2), 1000, 10)
+
     """
     #Requirements
     dv_req = 12300 # m/s
 
-    #Initialize loop parameters
-    N = 100
-    delta_V_data = np.zeros((N, 10))
-
-    #Iterate X across range of 0.01 to 1
-    for X in range(N):
-        #Calculate the dV % for each stage at given value of X
-        stage_1_dv = dv_req * (X / 100)
-        stage_2_dv = dv_req * (1 - X/100)
-
-        #Call stage_mass() to calculate the mass parameters of that stage
-        m_in_1, m_pr_1, m_in_2, m_pr_2, m_0, stage_1_no_pl, stage_2_no_pl = stage_mass(stage_1_dv, stage_2_dv, stage_1_Isp, stage_2_Isp)
-
-        #fill out the numpy array with relevant data for each iteration
-        delta_V_data[X, 0] = X
-        delta_V_data[X, 1] = stage_1_dv
-        delta_V_data[X, 2] = stage_2_dv
-        delta_V_data[X, 3] = m_in_1
-        delta_V_data[X, 4] = m_pr_1
-        delta_V_data[X, 5] = m_in_2
-        delta_V_data[X, 6] = m_pr_2
-        delta_V_data[X, 7] = m_0
-        delta_V_data[X, 8] = stage_1_no_pl
-        delta_V_data[X, 9] = stage_2_no_pl
+    #Split points X across range of 0 to 1
+    if X is None:
+        X = np.arange(int(N)) * (100 / int(N))
+    X = np.asarray(X, dtype=float)
+
+    #Calculate the dV % for each stage at every value of X
+    stage_1_dv = dv_req * (X / 100)
+    stage_2_dv = dv_req * (1 - X/100)
+
+    #Call stage_mass() to calculate the mass parameters of every split at once
+    m_in_1, m_pr_1, m_in_2, m_pr_2, m_0, stage_1_no_pl, stage_2_no_pl = stage_mass(stage_1_dv, stage_2_dv, stage_1_Isp, stage_2_Isp)
+
+    #Stack the relevant data, one column per quantity
+    columns = np.broadcast_arrays(
+        X,
+        stage_1_dv,
+        stage_2_dv,
+        m_in_1,
+        m_pr_1,
+        m_in_2,
+        m_pr_2,
+        m_0,
+        stage_1_no_pl,
+        stage_2_no_pl,
+    )
+    delta_V_data = np.stack(columns, axis=-1)
 
     return delta_V_data
 
@@ -52,11 +62,13 @@ def stage_mass(stage_1_delta_V, stage_2_delta_V, stage_1_Isp, stage_2_Isp):
     """
     Calculate the masses of each stage based of allocated delta V.
 
+    Works on floats or on NumPy arrays, all inputs broadcast against each other.
+
     Input:
-    stage_1_delta_V (float): Delta V allocated to stage 1
-    stage_2_delta_V (float): Delta V allocated to stage 2
-    stage_1_Isp (int): Isp of stage 1 propellant
-    stage_2_Isp (int): Isp of stage 2 propellant
+    stage_1_delta_V (float or np.array): Delta V allocated to stage 1
+    stage_2_delta_V (float or np.array): Delta V allocated to stage 2
+    stage_1_Isp (int or np.array): Isp of stage 1 propellant
+    stage_2_Isp (int or np.array): Isp of stage 2 propellant
 
     Return:
     m_in_1 (float): inert mass of stage 1 (kg)
@@ -110,14 +122,15 @@ def stage_mass(stage_1_delta_V, stage_2_delta_V, stage_1_Isp, stage_2_Isp):
     stage_2_no_pl = m_in_2 + m_pr_2
 
     #Overwrite edge case if there is a negative mass (non-physical)
-    if m_0 < 0:
-        m_in_1 = np.nan
-        m_pr_1 = np.nan
-        m_in_2 = np.nan
-        m_pr_2 = np.nan
-        m_0 = np.nan
-        stage_1_no_pl = np.nan
-        stage_2_no_pl = np.nan
+    # with both payload fractions negative m_0 comes out positive, so stage 2 is checked as well
+    non_physical = (m_0 < 0) | (m_0_2 <= 0)
+    m_in_1 = np.where(non_physical, np.nan, m_in_1)[()]
+    m_pr_1 = np.where(non_physical, np.nan, m_pr_1)[()]
+    m_in_2 = np.where(non_physical, np.nan, m_in_2)[()]
+    m_pr_2 = np.where(non_physical, np.nan, m_pr_2)[()]
+    m_0 = np.where(non_physical, np.nan, m_0)[()]
+    stage_1_no_pl = np.where(non_physical, np.nan, stage_1_no_pl)[()]
+    stage_2_no_pl = np.where(non_physical, np.nan, stage_2_no_pl)[()]
 
     return m_in_1, m_pr_1, m_in_2, m_pr_2, m_0, stage_1_no_pl, stage_2_no_pl
 
@@ -146,6 +159,7 @@ def plot_delta_V_split(delta_V_split):
     X_min = X[i_min]
 
     #Plot total mass vs dV split
+    import matplotlib.pyplot as plt
     plt.plot(X, m_0,label='Gross Mass')
     plt.plot(X,stage_1_no_pl, label='Stage 1 Mass (no pl)')
     plt.plot(X,stage_2_no_pl,label='Stage 2 Mass (no pl)')
@@ -213,6 +227,7 @@ def plot_cost(stage_1_cost, stage_2_cost, total_cost, X, m_0):
     print(" ")
 
     # Plot stage costs, total cost, and highlight the minimum
+    import matplotlib.pyplot as plt
     plt.plot(X, stage_1_cost, label="Stage 1 cost")
     plt.plot(X, stage_2_cost, label="Stage 2 cost")
     plt.plot(X, total_cost,   label="Total cost")
@@ -0,0 +1,195 @@
+import functools
+import time
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Tuple
+
+import Check_Solid_and_Storables as css
+import design_pipeline as dp
+import Fairing_area as fa
+import mass_estimation_part2 as me2
+import Mass_functions as Mfunc
+import propellant_tank_calculations as Calcs
+import thrust_convergance as tc
+
+
+'''
+Opt-in per stage timing of the design pipeline.
+
+While a StageProfiler is enabled the pipeline functions are swapped, on their modules,
+for wrappers that record wall time and call counts. Disabled, the original functions
+are put back, so the pipeline runs exactly as without the profiler.
+
+Times are inclusive: Check_Solid_and_Storables includes its find_cyl_tank_dim call,
+thrust_convergance includes its M_* calls.
+
+Usage Examples:
+    import main
+    with StageProfiler() as profiler:
+        main.main()
+    print(profiler.summary())
+
+    # live hook, called after every profiled call
+    def hook(stage, seconds, info):
+        if seconds > 0.01:
+            print(stage, seconds, info)
+
+    with StageProfiler(callback=hook):
+        sweep.sweep(X_values = range(20, 80))
+'''
+
+
+@dataclass(slots=True)
+class StageTiming:
+    calls       : int = 0
+    seconds     : float = 0.0
+    iterations  : int = 0       # thrust evaluations, thrust stages only
+
+
+# (module, function name) pairs that are timed under the function name
+_PROFILED_FUNCTIONS: List[Tuple[object, str]] = [
+    (me2, 'mass_estimation'),
+    (fa, 'fairing_area'),
+    (Calcs, 'find_prop_mass_volume'),
+    (Calcs, 'find_cyl_tank_dim'),
+    (Mfunc, 'Rocket_Engine'),
+    (Mfunc, 'Motor_Casing'),
+    (Mfunc, 'Struct_Mass'),
+    (Mfunc, 'M_fairing'),
+    (Mfunc, 'M_avionic'),
+    (Mfunc, 'M_wiring'),
+    (Mfunc, 'M_gimbals'),
+    (tc, 'thrust_mass_calculations'),
+    (tc, 'thrust_mass_calculations_batch'),
+    (dp, 'evaluate_design'),
+    (dp, 'evaluate_designs'),
+]
+
+
+class StageProfiler:
+    """
+    Input:
+        callback (Callable[[str, float, Dict], None]): optional hook called after every profiled
+            call with the stage name, the wall time (s) and extra info (thrust iterations)
+
+    Stages are named after the functions, Check_Solid_and_Storables is split into
+    Check_Solid_and_Storables[stage 1] and [stage 2] and export is the CSV export.
+    """
+
+    def __init__(self, callback: Optional[Callable[[str, float, Dict], None]] = None):
+        self.callback = callback
+        self.timings: Dict[str, StageTiming] = {}
+        self._originals: List[Tuple[object, str, Callable]] = []
+        self._tank_calls = 0
+
+    @property
+    def enabled(self)-> bool:
+        return bool(self._originals)
+
+    def enable(self)-> None:
+        if self.enabled:
+            return
+
+        # imported here so the profiler does not load the export module unless it is enabled
+        import export_fn
+
+        for module, name in _PROFILED_FUNCTIONS:
+            self._patch(module, name, self._timed(name, getattr(module, name)))
+
+        self._patch(dp, 'size_design', self._sizing(dp.size_design))
+        self._patch(css, 'Check_Solid_and_Storables', self._per_stage(css.Check_Solid_and_Storables))
+        self._patch(tc, 'thrust_convergance', self._thrust(tc.thrust_convergance))
+        self._patch(tc, 'thrust_convergance_batch', self._thrust_batch(tc.thrust_convergance_batch))
+        self._patch(export_fn, 'export', self._timed('export', export_fn.export))
+
+    def disable(self)-> None:
+        for module, name, original in reversed(self._originals):
+            setattr(module, name, original)
+        self._originals = []
+
+    def reset(self)-> None:
+        self.timings = {}
+
+    def summary(self)-> str:
+        """
+        Output:
+            table (str): calls, total and mean wall time and thrust iterations per stage,
+                slowest stage first
+        """
+        lines = [f"{'stage':<40} {'calls':>8} {'total [ms]':>12} {'mean [us]':>12} {'iterations':>11}"]
+        for stage, timing in sorted(self.timings.items(), key=lambda item: -item[1].seconds):
+            lines.append(
+                f'{stage:<40} {timing.calls:>8} {timing.seconds * 1e3:>12.3f} '
+                f'{timing.seconds / timing.calls * 1e6:>12.1f} {timing.iterations or "":>11}'
+            )
+        return '\n'.join(lines)
+
+    def __enter__(self):
+        self.enable()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.disable()
+
+    def _patch(self, module: object, name: str, wrapper: Callable)-> None:
+        self._originals.append((module, name, getattr(module, name)))
+        setattr(module, name, wrapper)
+
+    def _record(self, stage: str, seconds: float, iterations: int = 0)-> None:
+        timing = self.timings.get(stage)
+        if timing is None:
+            timing = self.timings[stage] = StageTiming()
+        timing.calls += 1
+        timing.seconds += seconds
+        timing.iterations += iterations
+        if self.callback is not None:
+            self.callback(stage, seconds, {'iterations': iterations} if iterations else {})
+
+    def _timed(self, stage: str, function: Callable)-> Callable:
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                self._record(stage, time.perf_counter() - start)
+        return wrapper
+
+    def _sizing(self, function: Callable)-> Callable:
+        # every sizing call checks stage 1 then stage 2, restart the count for each design
+        timed = self._timed('size_design', function)
+
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            self._tank_calls = 0
+            return timed(*args, **kwargs)
+        return wrapper
+
+    def _per_stage(self, function: Callable)-> Callable:
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            self._tank_calls += 1
+            stage = 1 if self._tank_calls % 2 else 2
+            start = time.perf_counter()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                self._record(f'Check_Solid_and_Storables[stage {stage}]', time.perf_counter() - start)
+        return wrapper
+
+    def _thrust(self, function: Callable)-> Callable:
+        @functools.wraps(function)
+        def wrapper(*args, full_output=False, **kwargs):
+            start = time.perf_counter()
+            t_req1, t_req2, info = function(*args, full_output=True, **kwargs)
+            self._record('thrust_convergance', time.perf_counter() - start, int(info['evaluations']))
+            return (t_req1, t_req2, info) if full_output else (t_req1, t_req2)
+        return wrapper
+
+    def _thrust_batch(self, function: Callable)-> Callable:
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            t_req1, t_req2, iterations, converged = function(*args, **kwargs)
+            self._record('thrust_convergance_batch', time.perf_counter() - start, int(iterations.sum()))
+            return t_req1, t_req2, iterations, converged
+        return wrapper
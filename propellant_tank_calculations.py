@@ -1,7 +1,6 @@
 from typing import Tuple, Dict
 import numpy as np
-from scipy.optimize import fsolve
-from dictionaries import fuel_ratios, prop_densities
+from dictionaries import fuel_ratios, mixture_propellants, prop_densities
 
 def find_prop_mass_volume(
         propellant_mass: float, 
@@ -53,8 +52,7 @@ def find_prop_mass_volume(
     """
     # Manage Storables naming
     if mixture == 'Storables':
-        oxidizer = 'N2O4'
-        fuel = 'UDMH'
+        oxidizer, fuel = mixture_propellants[mixture]
 
     total_parts = fuel_ratios[mixture] + 1
 
@@ -76,10 +74,10 @@ def find_cyl_tank_dim(
     ) -> Tuple[float, float, float]:
     """
     Input:
-    volume      (float): volume of the propellant   (m3)
-    radius      (float): radius of the tank         (m)
-    height      (float): height of the tank         (m)
-    tank_amount (int)  : number of tanks
+    volume      (float or np.array): volume of the propellant   (m3)
+    radius      (float or np.array): radius of the tank         (m)
+    height      (float or np.array): height of the tank         (m)
+    tank_amount (int)              : number of tanks
 
     Return:
     tank_surface_area   (float): surface area of the tank (m2)
@@ -109,8 +107,18 @@ def find_cyl_tank_dim(
         The function will attempt to find the required radius of the prop tank
         with a height of 100m
 
+        The capsule volume V = pi*r^2*(h - 2r) + (4/3)*pi*r^3 is a cubic in r and is
+        solved in closed form (trigonometric root). A tank of height h holds at most
+        a sphere of diameter h (V = pi*h^3/6), larger volumes have no tank with a
+        non-negative cylinder section and return a NaN radius.
+
+
+    3) Arrays of tanks
+        volume, radius and height can be NumPy arrays that broadcast against each
+        other, every element is solved in the same call. Elements with a NaN height
+        use mode 1, the others mode 2.
 
-    3) Variable number of tanks
+    4) Variable number of tanks
         You can also vary the number of tanks being used, ie 3 tanks for oxidizer
         The function assumes every tank has the same dimensions and will provide
         the dimensions of one tank.
@@ -138,28 +146,28 @@ def find_cyl_tank_dim(
     volume = volume / tank_amount
 
     # find height
-    if np.isnan(height):
-        a_sphere = 4 * np.pi * radius**2
-        v_sphere = (4/3) * np.pi * radius**3
-        v_cyl = volume - v_sphere
-        tank_height = v_cyl / (np.pi * radius**2) + 2 * radius
-        tank_radius = radius
-    else:
-        # find radius
-        def volume_eqn(r):
-            cyl_height = height - 2 * r
-            return np.pi * r**2 * cyl_height + (4/3) * np.pi * r**3 - volume
-        
-        radius_guess = 1
-        tank_radius = fsolve(volume_eqn, radius_guess)[0]
-        tank_height = height
-        
+    height_given = ~np.isnan(height)
+    a_sphere = 4 * np.pi * radius**2
+    v_sphere = (4/3) * np.pi * radius**3
+    v_cyl = volume - v_sphere
+    tank_height = np.where(height_given, height, v_cyl / (np.pi * radius**2) + 2 * radius)
+
+    # find radius
+    # with r = u*h and v = V/(pi*h^3) the volume equation becomes u^3 - 1.5u^2 + 1.5v = 0,
+    # its root with 0 <= u <= 0.5 is u = 0.5 + cos(arccos(1 - 6v)/3 - 2pi/3)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        v = volume / (np.pi * height**3)
+    # v = 1/6 is the sphere, allowed a few ulp over it for the rounding of volume / (pi*h^3)
+    solvable = height_given & (v >= 0) & (v <= 1/6 * (1 + 1e-12))
+    u = 0.5 + np.cos(np.arccos(1 - 6 * np.minimum(np.where(solvable, v, 0), 1/6)) / 3 - 2 * np.pi / 3)
+    tank_radius = np.where(height_given, np.where(solvable, u * height, np.nan), radius)
+
     # find surface area
 
     tank_surface_area = 4 * np.pi * tank_radius**2 + 2 * np.pi * tank_radius * (tank_height - tank_radius)
 
 
-    return tank_surface_area, tank_radius, tank_height
+    return tank_surface_area[()], tank_radius[()], tank_height[()]
 
 def find_tank_mass(
         tank_volume: float,
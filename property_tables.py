@@ -0,0 +1,146 @@
+import numpy as np
+from typing import Dict, List
+
+from dictionaries import (
+    mixture_names,
+    mixture_codes,
+    Isp_values,
+    Thrust_stage1,
+    Thrust_stage2,
+    Expansion_ratio_stage1,
+    Expansion_ratio_stage2,
+    Chamber_pressure_stage1,
+    Chamber_pressure_stage2,
+    exhaust_diameter_stage1,
+    exhaust_diameter_stage2,
+    fuel_ratios,
+    mixture_propellants,
+    prop_densities,
+)
+
+
+'''
+Propellant and engine properties compiled into one structured array per stage.
+
+Row i of a table holds every property of mixture code i (see dictionaries.mixture_codes),
+so the properties of any number of designs are gathered with a single fancy index:
+
+    props = stage_1_properties[codes]       # codes: integer mixture codes of the designs
+    props['thrust'], props['Isp'], ...
+
+The tables are built from the dictionaries in dictionaries.py when the module is imported
+and the build fails if a mixture is missing a property, or a property table has an entry
+that is not a mixture.
+
+Usage Examples:
+    from property_tables import stage_1_properties, stage_properties
+
+    engine_count = np.ceil(thrust / stage_1_properties['thrust'][codes])
+    props = stage_properties(codes, stage=2)
+'''
+
+PROPERTY_DTYPE = np.dtype([
+    ('Isp',                 np.float64),    # s
+    ('thrust',              np.float64),    # N, one engine
+    ('expansion_ratio',     np.float64),    # Ae/At
+    ('chamber_pressure',    np.float64),    # Pa
+    ('exhaust_diameter',    np.float64),    # m
+    ('fuel_ratio',          np.float64),    # oxidizer : fuel mass ratio
+    ('oxidizer_density',    np.float64),    # kg/m3
+    ('fuel_density',        np.float64),    # kg/m3
+])
+
+
+def _stage_sources(stage: int)-> Dict[str, Dict[str, float]]:
+    # property name : mixture name -> value
+    return {
+        'Isp'               : Isp_values,
+        'thrust'            : Thrust_stage1 if stage == 1 else Thrust_stage2,
+        'expansion_ratio'   : Expansion_ratio_stage1 if stage == 1 else Expansion_ratio_stage2,
+        'chamber_pressure'  : Chamber_pressure_stage1 if stage == 1 else Chamber_pressure_stage2,
+        'exhaust_diameter'  : exhaust_diameter_stage1 if stage == 1 else exhaust_diameter_stage2,
+        'fuel_ratio'        : fuel_ratios,
+        'oxidizer_density'  : {
+            name: prop_densities[oxidizer] for name, (oxidizer, _) in mixture_propellants.items() if oxidizer in prop_densities
+        },
+        'fuel_density'      : {
+            name: prop_densities[fuel] for name, (_, fuel) in mixture_propellants.items() if fuel in prop_densities
+        },
+    }
+
+
+def build_stage_table(stage: int)-> np.ndarray:
+    """
+    Input:
+        stage (int): 1 or 2
+
+    Output:
+        table (np.ndarray[PROPERTY_DTYPE]): one row per mixture code
+
+    Raises ValueError listing every missing or unknown entry of the property dictionaries.
+    """
+    if stage not in (1, 2):
+        raise ValueError('Stage must be 1 or 2')
+
+    problems: List[str] = []
+    for name, values in _stage_sources(stage).items():
+        missing = [mixture for mixture in mixture_names if mixture not in values]
+        unknown = [key for key in values if key not in mixture_names]
+        if missing:
+            problems.append(f'{name} has no value for {", ".join(missing)}')
+        if unknown:
+            problems.append(f'{name} has entries for unknown mixtures {", ".join(unknown)}')
+    if problems:
+        raise ValueError(f'Invalid stage {stage} property tables: ' + '; '.join(problems))
+
+    table = np.zeros(len(mixture_names), dtype=PROPERTY_DTYPE)
+    for name, values in _stage_sources(stage).items():
+        table[name] = [values[mixture] for mixture in mixture_names]
+
+    table.flags.writeable = False
+    return table
+
+
+stage_1_properties = build_stage_table(1)
+stage_2_properties = build_stage_table(2)
+
+
+def stage_properties(codes, stage: int)-> np.ndarray:
+    """
+    Inputs:
+        codes (int or np.ndarray): integer mixture codes
+        stage (int)             : 1 or 2
+
+    Output:
+        properties (np.ndarray[PROPERTY_DTYPE]): the table rows of the codes, same shape as codes
+    """
+    if stage not in (1, 2):
+        raise ValueError('Stage must be 1 or 2')
+    table = stage_1_properties if stage == 1 else stage_2_properties
+    return table[np.asarray(codes, dtype=np.intp)]
+
+
+def to_mixture_codes(mixtures)-> np.ndarray:
+    """
+    Input:
+        mixtures (str, int or array): mixture names or integer mixture codes
+
+    Output:
+        codes (np.ndarray[int]): integer mixture codes, see dictionaries.mixture_codes
+
+    Raises ValueError for unknown names and for codes outside range(len(mixture_names)).
+    """
+    mixtures = np.asarray(mixtures)
+    if mixtures.dtype.kind in 'iu':
+        # a negative code would silently index from the end of the tables
+        if mixtures.size and (mixtures.min() < 0 or mixtures.max() >= len(mixture_names)):
+            raise ValueError(f'Invalid mixture code, use 0 to {len(mixture_names) - 1} (see dictionaries.mixture_codes)')
+        return mixtures.astype(np.intp)
+
+    # look every distinct name up once
+    names, inverse = np.unique(mixtures, return_inverse=True)
+    try:
+        codes = np.array([mixture_codes[name] for name in names.tolist()], dtype=np.intp)
+    except KeyError as err:
+        raise ValueError(f'Invalid mixture name {err}, check naming convention in dictionary') from None
+    return codes[inverse].reshape(mixtures.shape)
@@ -0,0 +1,233 @@
+import operator
+import os
+import uuid
+import numpy as np
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from design_pipeline import INPUT_COLUMNS, OUTPUT_COLUMNS, STATUS_COLUMNS
+from dictionaries import mixture_names
+from results_writer import design_key
+
+
+'''
+Partitioned columnar store for sweep results.
+
+Each (s1_prop_mix, s2_prop_mix) pair is a partition directory, every append adds one
+part directory holding one .npy file per column:
+
+    root/
+        s1_prop_mix=LOX_RP1/
+            s2_prop_mix=LOX_LH2/
+                part-<id>/
+                    X.npy
+                    total_mass.npy
+                    ...
+
+Queries only open the partitions that match the mixture filters and only the columns
+they use, memory-mapped, so millions of rows can be searched without loading them.
+
+Usage Examples:
+    store = ResultStore('sweep_store')
+    for designs in sweep.sweep_chunks(X_values = np.arange(1, 100, 0.01)):
+        store.append(designs)
+
+    # minimum total mass with margin for LOX_LCH4 first stages with L/D < 15
+    best = store.min_by(
+        'total_mass',
+        s1_prop_mix = 'LOX_LCH4',
+        where = [('s1_L_D', '<', 15)],
+        )
+'''
+
+# Stored columns, the mixtures are the partition keys and are not stored per row
+STORED_COLUMNS = ['design_key'] + [
+    column for column in INPUT_COLUMNS + OUTPUT_COLUMNS + STATUS_COLUMNS
+    if column not in ('s1_prop_mix', 's2_prop_mix')
+]
+
+_OPERATORS: Dict[str, Callable] = {
+    '<'  : operator.lt,
+    '<=' : operator.le,
+    '>'  : operator.gt,
+    '>=' : operator.ge,
+    '==' : operator.eq,
+    '!=' : operator.ne,
+}
+
+
+class ResultStore:
+    """
+    Input:
+        root (str): directory of the store, created if missing
+    """
+
+    def __init__(self, root: str):
+        self.root = root
+        os.makedirs(root, exist_ok=True)
+
+    def append(self, designs: Dict[str, np.ndarray])-> int:
+        """
+        Input:
+            designs (Dict[str, np.ndarray]): arrays of designs, e.g. design_pipeline.evaluate_designs output
+
+        Output:
+            n_rows (int): number of rows appended
+
+        Every mixture pair in the batch becomes one new part in its partition. Parts are
+        written to a temporary directory and renamed into place, so readers never see
+        a half written part.
+        """
+        s1_prop_mix = np.asarray(designs['s1_prop_mix'])
+        s2_prop_mix = np.asarray(designs['s2_prop_mix'])
+
+        keys = np.array([
+            design_key({column: designs[column][i] for column in INPUT_COLUMNS})
+            for i in range(len(s1_prop_mix))
+        ], dtype='S16')
+
+        for s1, s2 in sorted(set(zip(s1_prop_mix.tolist(), s2_prop_mix.tolist()))):
+            rows = np.flatnonzero((s1_prop_mix == s1) & (s2_prop_mix == s2))
+
+            partition = self._partition_path(s1, s2)
+            part_id = 'part-' + uuid.uuid4().hex
+            tmp_path = os.path.join(partition, '.' + part_id)
+            os.makedirs(tmp_path)
+
+            for column in STORED_COLUMNS:
+                values = keys[rows] if column == 'design_key' else np.asarray(designs[column])[rows]
+                np.save(os.path.join(tmp_path, column + '.npy'), values)
+
+            os.rename(tmp_path, os.path.join(partition, part_id))
+
+        return len(s1_prop_mix)
+
+    def partitions(
+            self,
+            s1_prop_mix : Optional[str] = None,
+            s2_prop_mix : Optional[str] = None,
+        )-> List[Tuple[str, str]]:
+        """
+        Inputs:
+            s1_prop_mix (str): only partitions with this stage 1 mixture, None for all
+            s2_prop_mix (str): only partitions with this stage 2 mixture, None for all
+
+        Output:
+            pairs (List[Tuple[str, str]]): (s1_prop_mix, s2_prop_mix) of the stored partitions
+        """
+        pairs = []
+        for s1 in mixture_names:
+            for s2 in mixture_names:
+                if s1_prop_mix not in (None, s1) or s2_prop_mix not in (None, s2):
+                    continue
+                if os.path.isdir(os.path.join(self.root, f's1_prop_mix={s1}', f's2_prop_mix={s2}')):
+                    pairs.append((s1, s2))
+        return pairs
+
+    def query(
+            self,
+            columns     : Sequence[str] = ('design_key',),
+            s1_prop_mix : Optional[str] = None,
+            s2_prop_mix : Optional[str] = None,
+            where       : Iterable[Tuple[str, str, float]] = (),
+        )-> Dict[str, np.ndarray]:
+        """
+        Inputs:
+            columns     (Sequence[str]) : columns to return, 's1_prop_mix' / 's2_prop_mix' are allowed
+            s1_prop_mix (str)           : stage 1 mixture filter, None for all
+            s2_prop_mix (str)           : stage 2 mixture filter, None for all
+            where       (Iterable)      : (column, operator, value) filters, all must hold,
+                                          operators are <, <=, >, >=, ==, !=
+
+        Output:
+            results (Dict[str, np.ndarray]): the requested columns of every matching row
+        """
+        # filters are applied once per part, a generator would only filter the first
+        where = list(where)
+        results = {column: [] for column in columns}
+        for s1, s2, part in self._parts(s1_prop_mix, s2_prop_mix):
+            mask = self._mask(part, where)
+            if mask is not None and not mask.any():
+                continue
+            for column in columns:
+                if column in ('s1_prop_mix', 's2_prop_mix'):
+                    n = len(self._load(part, 'X')) if mask is None else int(mask.sum())
+                    values = np.full(n, s1 if column == 's1_prop_mix' else s2, dtype=object)
+                else:
+                    values = self._load(part, column)
+                    values = np.array(values if mask is None else values[mask])
+                results[column].append(values)
+
+        return {
+            column: np.concatenate(values) if values else np.empty(0)
+            for column, values in results.items()
+        }
+
+    def min_by(
+            self,
+            column      : str,
+            s1_prop_mix : Optional[str] = None,
+            s2_prop_mix : Optional[str] = None,
+            where       : Iterable[Tuple[str, str, float]] = (),
+        )-> Optional[Dict[str, object]]:
+        """
+        Inputs:
+            column (str): column to minimise, NaN rows are ignored
+            see query() for the filters
+
+        Output:
+            row (Dict[str, object]): every stored column of the minimum row plus its mixtures,
+                None if no row matches
+        """
+        where = list(where)
+        best = None
+        for s1, s2, part in self._parts(s1_prop_mix, s2_prop_mix):
+            values = self._load(part, column)
+            mask = self._mask(part, where)
+            valid = ~np.isnan(values) if mask is None else mask & ~np.isnan(values)
+            if not valid.any():
+                continue
+            candidates = np.flatnonzero(valid)
+            i = candidates[np.argmin(values[candidates])]
+            if best is None or values[i] < best[0]:
+                best = (values[i], s1, s2, part, i)
+
+        if best is None:
+            return None
+
+        _, s1, s2, part, i = best
+        row = {'s1_prop_mix': s1, 's2_prop_mix': s2}
+        for stored_column in STORED_COLUMNS:
+            value = self._load(part, stored_column)[i]
+            row[stored_column] = value.decode() if isinstance(value, bytes) else value.item()
+        return row
+
+    def _partition_path(self, s1_prop_mix: str, s2_prop_mix: str)-> str:
+        if s1_prop_mix not in mixture_names or s2_prop_mix not in mixture_names:
+            raise ValueError('Invalid mixture name, check naming convention in dictionary')
+        path = os.path.join(self.root, f's1_prop_mix={s1_prop_mix}', f's2_prop_mix={s2_prop_mix}')
+        os.makedirs(path, exist_ok=True)
+        return path
+
+    def _parts(self, s1_prop_mix: Optional[str], s2_prop_mix: Optional[str]):
+        # (s1, s2, part directory) of every finished part in the matching partitions
+        for s1, s2 in self.partitions(s1_prop_mix, s2_prop_mix):
+            partition = os.path.join(self.root, f's1_prop_mix={s1}', f's2_prop_mix={s2}')
+            for name in sorted(os.listdir(partition)):
+                if name.startswith('part-'):
+                    yield s1, s2, os.path.join(partition, name)
+
+    @staticmethod
+    def _load(part: str, column: str)-> np.ndarray:
+        if column not in STORED_COLUMNS:
+            raise ValueError(f'Unknown result column {column}')
+        return np.load(os.path.join(part, column + '.npy'), mmap_mode='r')
+
+    def _mask(self, part: str, where: Iterable[Tuple[str, str, float]])-> Optional[np.ndarray]:
+        # boolean row mask of the where filters, None when there are no filters
+        mask = None
+        for column, op, value in where:
+            if op not in _OPERATORS:
+                raise ValueError(f'Unsupported operator {op}')
+            condition = _OPERATORS[op](self._load(part, column), value)
+            mask = condition if mask is None else mask & condition
+        return None if mask is None else np.asarray(mask)
@@ -0,0 +1,184 @@
+import csv
+import hashlib
+import json
+import math
+import os
+import time
+import uuid
+import numpy as np
+from typing import Dict, Iterable, List, Optional
+
+from design_pipeline import INPUT_COLUMNS, OUTPUT_COLUMNS, STATUS_COLUMNS
+
+
+'''
+Streaming, append-only writer for design results.
+
+Rows are buffered and appended to a CSV or JSONL file every flush_every rows, so a
+sweep of any size only keeps one buffer of rows in memory. Existing files are appended
+to, never overwritten. Every row carries
+    design_key : stable hash of the design inputs (INPUT_COLUMNS), identical across runs
+    run_id     : identifier of the run that produced the row
+so results of different runs can share a file and still be told apart.
+
+Usage Examples:
+    # one design at a time
+    with ResultsWriter('designs.jsonl') as writer:
+        writer.write(design_pipeline.evaluate_design(44, 'LOX_RP1', 'LOX_LH2'))
+
+    # a whole sweep, one batch per chunk
+    with ResultsWriter('sweep.csv') as writer:
+        sweep.sweep_to_writer(writer, X_values = np.arange(1, 100, 0.1))
+'''
+
+KEY_COLUMNS = [
+    'design_key',
+    'run_id',
+]
+
+RESULT_COLUMNS = INPUT_COLUMNS + OUTPUT_COLUMNS + STATUS_COLUMNS
+
+
+def new_run_id()-> str:
+    """
+    Output:
+        run_id (str): UTC timestamp plus a random suffix, e.g. 20251018T142501-3f9a1c2e
+    """
+    return time.strftime('%Y%m%dT%H%M%S', time.gmtime()) + '-' + uuid.uuid4().hex[:8]
+
+
+def design_key(inputs: Dict[str, object])-> str:
+    """
+    Input:
+        inputs (Dict[str, object]): design inputs, at least the INPUT_COLUMNS keys
+
+    Output:
+        key (str): 16 hex characters, the same for the same inputs in every run
+    """
+    canonical = []
+    for column in INPUT_COLUMNS:
+        value = inputs[column]
+        if isinstance(value, (str, np.str_)):
+            canonical.append(str(value))
+        else:
+            canonical.append(repr(float(value)))
+
+    return hashlib.sha1('|'.join(canonical).encode()).hexdigest()[:16]
+
+
+def _to_builtin(value):
+    # numpy scalars -> python scalars, NaN -> None
+    if isinstance(value, (np.bool_, bool)):
+        return bool(value)
+    if isinstance(value, (np.integer, int)):
+        return int(value)
+    if isinstance(value, (np.floating, float)):
+        value = float(value)
+        return None if math.isnan(value) else value
+    return str(value)
+
+
+class ResultsWriter:
+    """
+    Inputs:
+        path        (str)       : output file, '.csv' or '.jsonl' (format taken from the extension)
+        columns     (List[str]) : result columns to write, defaults to RESULT_COLUMNS
+        flush_every (int)       : rows buffered in memory before they are written out
+        run_id      (str)       : identifier of this run, defaults to new_run_id()
+
+    Appending to an existing CSV requires the same columns as its header.
+    """
+
+    def __init__(
+            self,
+            path        : str,
+            columns     : Optional[List[str]] = None,
+            flush_every : int = 1000,
+            run_id      : Optional[str] = None,
+        ):
+        extension = os.path.splitext(path)[1].lower()
+        if extension not in ('.csv', '.jsonl'):
+            raise ValueError('Unsupported results file type, use .csv or .jsonl')
+        if flush_every < 1:
+            raise ValueError('flush_every must be a positive integer')
+
+        self.path = path
+        self.format = extension[1:]
+        self.columns = KEY_COLUMNS + list(RESULT_COLUMNS if columns is None else columns)
+        self.flush_every = flush_every
+        self.run_id = new_run_id() if run_id is None else run_id
+        self.rows_written = 0
+
+        self._buffer = []
+
+        new_file = not os.path.exists(path) or os.path.getsize(path) == 0
+        if self.format == 'csv' and not new_file:
+            with open(path, newline='') as file:
+                header = next(csv.reader(file), [])
+            if header != self.columns:
+                raise ValueError(f'Existing results file {path} has different columns')
+
+        self._file = open(path, 'a', newline='')
+        if self.format == 'csv':
+            self._csv = csv.writer(self._file)
+            if new_file:
+                self._csv.writerow(self.columns)
+                self._file.flush()
+
+    def write(self, design)-> None:
+        """
+        Input:
+            design (DesignResult or Dict[str, object]): one design, scalar values.
+                Columns missing from the design are written empty.
+        """
+        if not isinstance(design, dict):
+            design = design.as_dict()
+
+        row = {
+            'design_key': design_key(design),
+            'run_id': self.run_id,
+        }
+        for column in self.columns[len(KEY_COLUMNS):]:
+            value = design.get(column)
+            row[column] = None if value is None else _to_builtin(value)
+
+        self._buffer.append(row)
+        if len(self._buffer) >= self.flush_every:
+            self.flush()
+
+    def write_batch(self, designs: Dict[str, Iterable])-> None:
+        """
+        Input:
+            designs (Dict[str, np.ndarray]): arrays of designs, e.g. design_pipeline.evaluate_designs
+                output, one entry per design in every array
+        """
+        n = len(designs[INPUT_COLUMNS[0]])
+        for i in range(n):
+            self.write({column: value[i] for column, value in designs.items() if np.ndim(value) == 1})
+
+    def flush(self)-> None:
+        """
+        Append the buffered rows to the file and flush it to disk.
+        """
+        if self.format == 'csv':
+            self._csv.writerows(
+                ['' if row[column] is None else row[column] for column in self.columns]
+                for row in self._buffer
+            )
+        else:
+            self._file.writelines(json.dumps(row) + '\n' for row in self._buffer)
+
+        self.rows_written += len(self._buffer)
+        self._buffer = []
+        self._file.flush()
+
+    def close(self)-> None:
+        if not self._file.closed:
+            self.flush()
+            self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
@@ -0,0 +1,173 @@
+import numpy as np
+from multiprocessing import shared_memory
+from typing import Dict, Optional, Tuple
+
+from dictionaries import mixture_names
+from property_tables import to_mixture_codes
+
+
+'''
+Design result arrays in one shared memory block, for sweeps spread over processes.
+
+The parent lays out every column of the design_pipeline.evaluate_designs output for all
+n designs of a sweep in a single multiprocessing.shared_memory segment. Worker processes
+attach to the segment by name and write the designs of their slice in place, so nothing
+but the slice bounds is pickled, and the parent reads the finished columns as numpy views
+of the segment without copying or gathering.
+
+Layout, from a schema of (dtype, rows) per column:
+    rows = 0  -> one (n,) array, e.g. total_mass, feasible, s1_engine_count
+    rows = k  -> one (k, n) array for the list outputs (masses, masses_for_output, totals),
+                 read back as a list of k (n,) arrays like evaluate_designs returns them
+Mixture columns are held as integer codes (dictionaries.mixture_codes) and decoded to
+names when read. Every column starts on a 64 byte boundary.
+
+Usage Examples:
+    # parent
+    schema = design_schema(design_pipeline.evaluate_designs(44, 'LOX_RP1', 'LOX_LH2'))
+    shared = SharedDesigns(schema, n)
+
+    # worker process, designs start to stop
+    worker = SharedDesigns(schema, n, name = shared.name)
+    worker.write(start, design_pipeline.evaluate_designs(...))
+    worker.close()
+
+    # parent, once the workers are done
+    designs = shared.designs()
+    shared.close()
+
+    sweep.sweep_shared(X_values = np.arange(1, 100, 0.001), workers = 64)
+'''
+
+# Columns held as integer mixture codes
+MIXTURE_COLUMNS = ['s1_prop_mix', 's2_prop_mix']
+
+_ALIGNMENT = 64
+
+
+def design_schema(designs: Dict[str, object])-> Dict[str, Tuple[str, int]]:
+    """
+    Input:
+        designs (Dict[str, object]): evaluate_designs (or closure.close_designs) output of
+            at least one design, only its keys, dtypes and list lengths are used
+
+    Output:
+        schema (Dict[str, Tuple[str, int]]): (numpy dtype string, rows) of every column,
+            rows = 0 for array columns and the list length for list columns
+    """
+    schema = {}
+    for column, values in designs.items():
+        if column in MIXTURE_COLUMNS:
+            schema[column] = (np.dtype(np.intp).str, 0)
+        elif isinstance(values, list):
+            schema[column] = (np.result_type(*values).str, len(values))
+        else:
+            schema[column] = (np.asarray(values).dtype.str, 0)
+    return schema
+
+
+class SharedDesigns:
+    """
+    Inputs:
+        schema  (Dict[str, Tuple[str, int]]): column layout, see design_schema
+        n       (int)                       : number of designs
+        name    (str)                       : name of an existing segment to attach to,
+                                              None to create a new one (the owner)
+
+    The owner unlinks the segment on close, attached instances only close their mapping.
+    Arrays returned by column() and designs() are views of the segment, they have to be
+    released (or copied) before close, which raises BufferError otherwise.
+    """
+
+    def __init__(
+            self,
+            schema  : Dict[str, Tuple[str, int]],
+            n       : int,
+            name    : Optional[str] = None,
+        ):
+        self.schema = schema
+        self.n = n
+        self.owner = name is None
+
+        offsets = {}
+        size = 0
+        for column, (dtype, rows) in schema.items():
+            offsets[column] = size
+            nbytes = np.dtype(dtype).itemsize * max(rows, 1) * n
+            size += -(-nbytes // _ALIGNMENT) * _ALIGNMENT
+
+        self._shm = shared_memory.SharedMemory(name=name, create=self.owner, size=max(size, 1))
+        self._columns = {}
+        for column, (dtype, rows) in schema.items():
+            shape = (rows, n) if rows else (n,)
+            self._columns[column] = np.ndarray(shape, dtype=dtype, buffer=self._shm.buf, offset=offsets[column])
+
+    @property
+    def name(self)-> str:
+        return self._shm.name
+
+    def write(self, start: int, designs: Dict[str, object])-> None:
+        """
+        Inputs:
+            start   (int)               : index of the first design of the slice
+            designs (Dict[str, object]) : evaluate_designs output of the designs start, start + 1, ...
+                                          keys outside the schema are ignored
+        """
+        for column, values in designs.items():
+            if column not in self._columns:
+                continue
+            target = self._columns[column]
+            if column in MIXTURE_COLUMNS:
+                values = to_mixture_codes(values)
+            if isinstance(values, list):
+                for row, row_values in zip(target, values):
+                    row[start:start + len(row_values)] = row_values
+            else:
+                target[start:start + len(values)] = values
+
+    def column(self, column: str)-> np.ndarray:
+        """
+        Input:
+            column (str): column name
+
+        Output:
+            values (np.ndarray): the (n,) or (rows, n) array of the column, a view of the segment,
+                mixtures as integer codes
+        """
+        return self._columns[column]
+
+    def designs(self, start: int = 0, stop: Optional[int] = None)-> Dict[str, object]:
+        """
+        Inputs:
+            start, stop (int): slice of designs, every design by default
+
+        Output:
+            designs (Dict[str, object]): the columns in the evaluate_designs format, views of the
+                segment except the mixture columns, which are decoded to names
+        """
+        names = np.array(mixture_names, dtype=object)
+        designs = {}
+        for column, values in self._columns.items():
+            if column in MIXTURE_COLUMNS:
+                designs[column] = names[values[start:stop]]
+            elif values.ndim == 2:
+                designs[column] = list(values[:, start:stop])
+            else:
+                designs[column] = values[start:stop]
+        return designs
+
+    def close(self)-> None:
+        """
+        Releases the mapping, and the segment itself for the owner.
+        """
+        self._columns = {}
+        # unlinked first, the segment is gone even if close fails on views still in use
+        if self.owner:
+            self._shm.unlink()
+        self._shm.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,600 @@
+import itertools
+import os
+import numpy as np
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, as_completed, wait
+from typing import Dict, Iterable, Iterator, Optional
+
+import checkpoint
+import closure
+import design_pipeline as dp
+import mass_estimation_part2 as me2
+
+from design_pipeline import INPUT_COLUMNS, OUTPUT_COLUMNS, STATUS_COLUMNS
+from dictionaries import mixture_names
+from shared_results import SharedDesigns, design_schema
+
+
+'''
+Design-space sweep over the full design chain.
+
+Every combination of mixture pair x stage 1 dV split x stage 1 radius x stage 2 radius
+is run through design_pipeline.evaluate_designs in a single process, so the interpreter
+and module imports are only paid for once and the thrust iteration runs once for the
+whole batch. sweep_shared spreads the chunks over worker processes that write their
+results straight into one shared memory block (shared_results.SharedDesigns).
+
+Usage Examples:
+    # every mixture pair, X = 20..80 %, default radii
+    results = sweep(X_values = np.arange(20, 81))
+
+    # only the physical dV splits of every pair, 0.01 % steps
+    results = sweep(X_values = np.arange(1, 100, 0.01), feasible_only = True)
+
+    # dense X (below 0.1 % steps), thrust iteration warm started from the neighbouring splits
+    results = sweep(X_values = np.arange(1, 100, 0.01), warm_start = True)
+
+    # closed designs, inert mass fractions consistent with the mass budget
+    results = sweep(X_values = np.arange(20, 81), closed = True)
+
+    # one mixture pair, radius trade
+    results = sweep(
+        s1_mixtures = ['LOX_RP1'],
+        s2_mixtures = ['LOX_LH2'],
+        X_values = [40, 44, 48],
+        stage_1_radii = [2.6, 5.2, 7.8],
+        stage_2_radii = [2.6, 3.0],
+        )
+
+    # resumable, rerun the same call after an interruption to continue
+    results = sweep(X_values = np.arange(1, 100, 0.001), checkpoint_dir = 'sweep_checkpoint')
+
+    # every core, results read in place from shared memory
+    with sweep_shared(X_values = np.arange(1, 100, 0.001), workers = 64) as shared:
+        designs = shared.designs()
+        i = np.nanargmin(designs['total_mass'])
+'''
+
+# Grid inputs that vary from design to design
+GRID_COLUMNS = ['X', 's1_prop_mix', 's2_prop_mix', 'stage_1_radius', 'stage_2_radius']
+
+# Designs per evaluate_designs call, the default of every sweep entry point
+CHUNK_SIZE = 100000
+
+# result segment and evaluation settings of a sweep_shared worker process
+_worker_shared: Optional[SharedDesigns] = None
+_worker_settings: Dict[str, object] = {}
+
+def design_grid(
+        s1_mixtures     : Optional[Iterable[str]] = None,
+        s2_mixtures     : Optional[Iterable[str]] = None,
+        X_values        : Iterable[float] = range(1, 100),
+        stage_1_radii   : Iterable[float] = (2.6 * 3,),
+        stage_2_radii   : Iterable[float] = (2.6,),
+        feasible_only   : bool = False,
+    ):
+    """
+    Inputs:
+        s1_mixtures     (Iterable[str])  : stage 1 mixture names, defaults to every mixture
+        s2_mixtures     (Iterable[str])  : stage 2 mixture names, defaults to every mixture
+        X_values        (Iterable[float]): stage 1 dV fraction percentages
+        stage_1_radii   (Iterable[float]): stage 1 tank radii (m)
+        stage_2_radii   (Iterable[float]): stage 2 tank radii (m)
+        feasible_only   (bool)           : skip the X outside mass_estimation_part2.feasible_X_window
+                                           of the mixture pair, they are non-physical or degenerate
+
+    Output:
+        Iterator of (s1_prop_mix, s2_prop_mix, X, stage_1_radius, stage_2_radius) tuples
+        covering the full grid, X varies fastest within a mixture pair and radii.
+    """
+    s1_mixtures = mixture_names if s1_mixtures is None else list(s1_mixtures)
+    s2_mixtures = mixture_names if s2_mixtures is None else list(s2_mixtures)
+    X_values = [float(X) for X in X_values]
+
+    for s1_prop_mix, s2_prop_mix, stage_1_radius, stage_2_radius in itertools.product(
+            s1_mixtures, s2_mixtures, list(stage_1_radii), list(stage_2_radii)):
+        pair_X_values = X_values
+        if feasible_only:
+            X_min, X_max = me2.feasible_X_window(s1_prop_mix, s2_prop_mix, me2.MIN_PAYLOAD_FRACTION)
+            pair_X_values = [X for X in X_values if X_min < X < X_max]
+        for X in pair_X_values:
+            yield s1_prop_mix, s2_prop_mix, X, float(stage_1_radius), float(stage_2_radius)
+
+
+def grid_chunks(grid, chunk_size: int, whole_runs: bool = False)-> Iterator[list]:
+    """
+    Inputs:
+        grid        (Iterator)  : design_grid() tuples
+        chunk_size  (int)       : designs per chunk
+        whole_runs  (bool)      : never split a run of X at fixed mixtures and radii, runs are
+                                  packed into chunks of at most chunk_size designs and a longer
+                                  run is a chunk of its own
+
+    Output:
+        Iterator of lists of design_grid() tuples, in grid order
+
+    Warm started sweeps chunk by whole runs: the anchors of a run then do not depend on
+    where the chunks start, and neither do the results.
+    """
+    if not whole_runs:
+        while True:
+            chunk = list(itertools.islice(grid, chunk_size))
+            if not chunk:
+                return
+            yield chunk
+
+    chunk = []
+    for _, run in itertools.groupby(grid, key=lambda design: (design[0], design[1], design[3], design[4])):
+        run = list(run)
+        if chunk and len(chunk) + len(run) > chunk_size:
+            yield chunk
+            chunk = []
+        chunk += run
+    if chunk:
+        yield chunk
+
+
+def sweep_chunks(
+        s1_mixtures     : Optional[Iterable[str]] = None,
+        s2_mixtures     : Optional[Iterable[str]] = None,
+        X_values        : Iterable[float] = range(1, 100),
+        stage_1_radii   : Iterable[float] = (2.6 * 3,),
+        stage_2_radii   : Iterable[float] = (2.6,),
+        nose_h          : float = 6,
+        nose_r          : float = 2.6,
+        m_pl            : float = 26000,
+        chunk_size      : int = CHUNK_SIZE,
+        feasible_only   : bool = False,
+        warm_start      : bool = False,
+        anchor_stride   : int = 8,
+        closed          : bool = False,
+    )-> Iterator[Dict[str, np.ndarray]]:
+    """
+    Inputs:
+        see sweep()
+        chunk_size      (int)   : number of designs evaluated per batch
+        warm_start      (bool)  : start the thrust iteration of each design from its neighbours
+        anchor_stride   (int)   : with warm_start, one design in anchor_stride along X is solved
+                                  from the cold start
+        closed          (bool)  : close the inert mass fractions of every design (closure.close_designs),
+                                  the chunks then also hold the closure.CLOSURE_COLUMNS
+
+    Output:
+        Iterator of design_pipeline.evaluate_designs outputs, one per chunk of the design grid
+        in grid order (see grid_chunks(), with warm_start a chunk holds whole runs of X).
+        Only one chunk is held in memory at a time.
+
+    With warm_start, every run of X at fixed mixtures and radii is solved in two passes:
+    the anchors (every anchor_stride-th X and the last one) from the cold start, then the
+    designs in between starting from the anchor thrusts interpolated in X. The results agree
+    with the cold start to the iteration tolerance, not bit for bit (total mass within
+    about 3e-5 relative).
+
+    warm_start only pays off on dense grids, below about 0.1 % steps in X. Per feasible
+    design over X = 1..99 the cold start takes 2.27 thrust evaluations at any spacing, the
+    warm start 2.74 at 1 % steps, 2.47 at 0.5 %, 1.92 at 0.1 % and 1.24 at 0.01 %. On
+    coarser grids the interpolated thrusts are off by more than the tolerance, often by an
+    engine, and failed warm starts are solved again from the cold start.
+    """
+    grid = design_grid(s1_mixtures, s2_mixtures, X_values, stage_1_radii, stage_2_radii, feasible_only)
+
+    for chunk in grid_chunks(grid, chunk_size, whole_runs=warm_start):
+        yield _evaluate_chunk(_grid_inputs(chunk), nose_h, nose_r, m_pl, warm_start, anchor_stride, closed)
+
+
+def _grid_inputs(chunk)-> Dict[str, np.ndarray]:
+    # design_grid tuples -> evaluate_designs input arrays
+    s1_prop_mix, s2_prop_mix, X, stage_1_radius, stage_2_radius = zip(*chunk)
+    return {
+        'X'             : np.array(X),
+        's1_prop_mix'   : np.array(s1_prop_mix),
+        's2_prop_mix'   : np.array(s2_prop_mix),
+        'stage_1_radius': np.array(stage_1_radius),
+        'stage_2_radius': np.array(stage_2_radius),
+    }
+
+
+def _evaluate_chunk(
+        inputs          : Dict[str, np.ndarray],
+        nose_h          : float,
+        nose_r          : float,
+        m_pl            : float,
+        warm_start      : bool,
+        anchor_stride   : int,
+        closed          : bool,
+    )-> Dict[str, np.ndarray]:
+    evaluate = closure.close_designs if closed else dp.evaluate_designs
+    if warm_start:
+        return _evaluate_continuation(evaluate, inputs, nose_h, nose_r, m_pl, anchor_stride)
+    return evaluate(nose_h=nose_h, nose_r=nose_r, m_pl=m_pl, **inputs)
+
+
+def _evaluate_continuation(
+        evaluate        ,
+        inputs          : Dict[str, np.ndarray],
+        nose_h          : float,
+        nose_r          : float,
+        m_pl            : float,
+        anchor_stride   : int,
+    )-> Dict[str, np.ndarray]:
+    # runs of consecutive designs sharing mixtures and radii, X varies along a run
+    n = len(inputs['X'])
+    same = np.ones(n, dtype=bool)
+    same[0] = False
+    for key in ('s1_prop_mix', 's2_prop_mix', 'stage_1_radius', 'stage_2_radius'):
+        same[1:] &= inputs[key][1:] == inputs[key][:-1]
+    run_starts = np.flatnonzero(~same)
+    run_ends = np.append(run_starts[1:], n)
+    position = np.arange(n) - np.repeat(run_starts, run_ends - run_starts)
+
+    is_anchor = position % max(anchor_stride, 1) == 0
+    is_anchor[run_ends - 1] = True
+    anchors = np.flatnonzero(is_anchor)
+    rest = np.flatnonzero(~is_anchor)
+
+    anchor_designs = evaluate(
+        nose_h=nose_h, nose_r=nose_r, m_pl=m_pl,
+        **{key: value[anchors] for key, value in inputs.items()},
+    )
+    if not rest.size:
+        return anchor_designs
+
+    # anchor thrust interpolated in X within each run, NaN next to a non-physical anchor
+    initial_thrust_1 = np.full(n, np.nan)
+    initial_thrust_2 = np.full(n, np.nan)
+    for start, end in zip(run_starts, run_ends):
+        run_anchors = np.flatnonzero(is_anchor[start:end]) + start
+        run_rest = np.flatnonzero(~is_anchor[start:end]) + start
+        if not run_rest.size:
+            continue
+        k = np.searchsorted(anchors, run_anchors)
+        for initial, column in ((initial_thrust_1, 's1_thrust'), (initial_thrust_2, 's2_thrust')):
+            initial[run_rest] = np.interp(inputs['X'][run_rest], inputs['X'][run_anchors], anchor_designs[column][k])
+
+    rest_designs = evaluate(
+        nose_h=nose_h, nose_r=nose_r, m_pl=m_pl,
+        initial_thrust_1=initial_thrust_1[rest],
+        initial_thrust_2=initial_thrust_2[rest],
+        **{key: value[rest] for key, value in inputs.items()},
+    )
+
+    return {
+        key: _merge(anchor_designs[key], rest_designs[key], anchors, rest, n)
+        for key in anchor_designs
+    }
+
+
+def _merge(anchor_values, rest_values, anchors, rest, n):
+    # scatter the two passes back into grid order, the export lists column by column
+    if isinstance(anchor_values, list):
+        return [_merge(a, b, anchors, rest, n) for a, b in zip(anchor_values, rest_values)]
+    anchor_values = np.asarray(anchor_values)
+    merged = np.empty(n, dtype=np.result_type(anchor_values, np.asarray(rest_values)))
+    merged[anchors] = anchor_values
+    merged[rest] = rest_values
+    return merged
+
+
+def sweep(
+        s1_mixtures     : Optional[Iterable[str]] = None,
+        s2_mixtures     : Optional[Iterable[str]] = None,
+        X_values        : Iterable[float] = range(1, 100),
+        stage_1_radii   : Iterable[float] = (2.6 * 3,),
+        stage_2_radii   : Iterable[float] = (2.6,),
+        nose_h          : float = 6,
+        nose_r          : float = 2.6,
+        m_pl            : float = 26000,
+        feasible_only   : bool = False,
+        warm_start      : bool = False,
+        closed          : bool = False,
+        workers         : int = 1,
+        checkpoint_dir  : Optional[str] = None,
+        chunk_size      : int = CHUNK_SIZE,
+    )-> 'pd.DataFrame':
+    """
+    Inputs:
+        see design_grid() for the design space arguments
+        nose_h          (float) : nose cone height (m)
+        nose_r          (float) : nose cone radius (m)
+        m_pl            (float) : payload mass (kg)
+        feasible_only   (bool)  : only evaluate the X inside the feasible window of each mixture pair
+        warm_start      (bool)  : warm start the thrust iteration from neighbouring X, only faster
+                                  below about 0.1 % steps in X, see sweep_chunks()
+        closed          (bool)  : close the inert mass fractions of every design, adds closure.CLOSURE_COLUMNS
+        workers         (int)   : worker processes, more than 1 evaluates through sweep_shared()
+        checkpoint_dir  (str)   : save every chunk there and resume from it, see sweep_checkpointed()
+        chunk_size      (int)   : designs per evaluate_designs call, whichever path evaluates them
+
+    Output:
+        results (pd.DataFrame): one row per design, INPUT_COLUMNS + OUTPUT_COLUMNS + STATUS_COLUMNS.
+            Non-physical designs (dV split the stages can not deliver) are kept with NaN outputs
+            and feasible = False.
+    """
+    # pandas is only imported when a table is built
+    import pandas as pd
+
+    columns = INPUT_COLUMNS + OUTPUT_COLUMNS + STATUS_COLUMNS + (closure.CLOSURE_COLUMNS if closed else [])
+
+    if checkpoint_dir is not None:
+        chunks = list(sweep_checkpointed(
+            checkpoint_dir,
+            s1_mixtures,
+            s2_mixtures,
+            X_values,
+            stage_1_radii,
+            stage_2_radii,
+            nose_h=nose_h,
+            nose_r=nose_r,
+            m_pl=m_pl,
+            feasible_only=feasible_only,
+            warm_start=warm_start,
+            closed=closed,
+            workers=workers,
+            chunk_size=chunk_size,
+        ))
+    elif workers > 1:
+        with sweep_shared(
+                s1_mixtures,
+                s2_mixtures,
+                X_values,
+                stage_1_radii,
+                stage_2_radii,
+                nose_h=nose_h,
+                nose_r=nose_r,
+                m_pl=m_pl,
+                feasible_only=feasible_only,
+                warm_start=warm_start,
+                closed=closed,
+                workers=workers,
+                chunk_size=chunk_size) as shared:
+            designs = shared.designs()
+            results = pd.DataFrame({column: designs[column] for column in columns}, copy=True)
+            del designs
+        return results
+    else:
+        chunks = list(sweep_chunks(
+            s1_mixtures,
+            s2_mixtures,
+            X_values,
+            stage_1_radii,
+            stage_2_radii,
+            nose_h=nose_h,
+            nose_r=nose_r,
+            m_pl=m_pl,
+            feasible_only=feasible_only,
+            warm_start=warm_start,
+            closed=closed,
+            chunk_size=chunk_size,
+        ))
+    if not chunks:
+        return pd.DataFrame(columns=columns)
+
+    return pd.DataFrame({column: np.concatenate([chunk[column] for chunk in chunks]) for column in columns})
+
+
+def sweep_to_writer(
+        writer,
+        s1_mixtures     : Optional[Iterable[str]] = None,
+        s2_mixtures     : Optional[Iterable[str]] = None,
+        X_values        : Iterable[float] = range(1, 100),
+        stage_1_radii   : Iterable[float] = (2.6 * 3,),
+        stage_2_radii   : Iterable[float] = (2.6,),
+        nose_h          : float = 6,
+        nose_r          : float = 2.6,
+        m_pl            : float = 26000,
+        chunk_size      : int = CHUNK_SIZE,
+        feasible_only   : bool = False,
+        warm_start      : bool = False,
+        closed          : bool = False,
+    )-> int:
+    """
+    Inputs:
+        writer          (results_writer.ResultsWriter): where every design row is streamed to
+        see sweep_chunks() for the other arguments
+
+    Output:
+        n_designs (int): number of designs written
+
+    Streams the sweep to disk chunk by chunk instead of building one table in memory.
+    """
+    n_designs = 0
+    for designs in sweep_chunks(
+            s1_mixtures,
+            s2_mixtures,
+            X_values,
+            stage_1_radii,
+            stage_2_radii,
+            nose_h=nose_h,
+            nose_r=nose_r,
+            m_pl=m_pl,
+            chunk_size=chunk_size,
+            feasible_only=feasible_only,
+            warm_start=warm_start,
+            closed=closed):
+        writer.write_batch(designs)
+        n_designs += len(designs['X'])
+
+    return n_designs
+
+def _worker_init(name, schema, n, settings):
+    # attach the sweep_shared worker process to the result segment once
+    global _worker_shared, _worker_settings
+    _worker_shared = SharedDesigns(schema, n, name=name)
+    _worker_settings = settings
+
+
+def _worker_slice(bounds):
+    return _fill_slice(_worker_shared, _worker_settings, *bounds)
+
+
+def _fill_slice(shared, settings, start, stop)-> int:
+    # evaluate designs start to stop from the input columns and write the outputs in place
+    inputs = {column: shared.column(column)[start:stop] for column in GRID_COLUMNS}
+    designs = _evaluate_chunk(inputs, **settings)
+    shared.write(start, {column: values for column, values in designs.items() if column not in INPUT_COLUMNS})
+    return stop - start
+
+
+def sweep_shared(
+        s1_mixtures     : Optional[Iterable[str]] = None,
+        s2_mixtures     : Optional[Iterable[str]] = None,
+        X_values        : Iterable[float] = range(1, 100),
+        stage_1_radii   : Iterable[float] = (2.6 * 3,),
+        stage_2_radii   : Iterable[float] = (2.6,),
+        nose_h          : float = 6,
+        nose_r          : float = 2.6,
+        m_pl            : float = 26000,
+        chunk_size      : int = CHUNK_SIZE,
+        feasible_only   : bool = False,
+        warm_start      : bool = False,
+        anchor_stride   : int = 8,
+        closed          : bool = False,
+        workers         : Optional[int] = None,
+    )-> SharedDesigns:
+    """
+    Inputs:
+        see sweep_chunks()
+        chunk_size  (int)   : designs per task (see grid_chunks()), a task is one evaluate_designs call in a worker.
+                              A sweep of at most chunk_size designs is one task evaluated in this process,
+                              a smaller chunk_size spreads it over the workers
+        workers     (int)   : worker processes, defaults to os.cpu_count(), 1 runs in this process
+
+    Output:
+        shared (shared_results.SharedDesigns): every column of the sweep in grid order, in one
+            shared memory segment. shared.designs() gives them in the evaluate_designs format as
+            views of the segment, close the result (or use it as a context manager) to free it.
+
+    The grid inputs are written to the segment by this process, every worker attaches to the
+    segment once and writes the outputs of its tasks in place: only the task bounds are sent
+    to the workers and only the design count comes back.
+    """
+    settings = dict(nose_h=nose_h, nose_r=nose_r, m_pl=m_pl,
+                    warm_start=warm_start, anchor_stride=anchor_stride, closed=closed)
+    grid_arguments = (s1_mixtures, s2_mixtures, list(X_values), list(stage_1_radii), list(stage_2_radii), feasible_only)
+
+    # layout from one probe design, the number of designs from a first pass over the grid
+    schema = design_schema(_evaluate_chunk(_grid_inputs([('LOX_RP1', 'LOX_LH2', 44.0, 2.6 * 3, 2.6)]), **settings))
+    n = sum(1 for _ in design_grid(*grid_arguments))
+
+    shared = SharedDesigns(schema, n)
+    try:
+        # one task per chunk, the same chunks as sweep_chunks
+        bounds = []
+        start = 0
+        for chunk in grid_chunks(design_grid(*grid_arguments), chunk_size, whole_runs=warm_start):
+            shared.write(start, _grid_inputs(chunk))
+            bounds.append((start, start + len(chunk)))
+            start += len(chunk)
+        for column, value in (('nose_h', nose_h), ('nose_r', nose_r), ('m_pl', m_pl)):
+            shared.column(column)[:] = value
+
+        workers = (os.cpu_count() or 1) if workers is None else workers
+        if workers > 1 and len(bounds) > 1:
+            with ProcessPoolExecutor(
+                    max_workers=min(workers, len(bounds)),
+                    initializer=_worker_init,
+                    initargs=(shared.name, schema, n, settings)) as executor:
+                for _ in executor.map(_worker_slice, bounds):
+                    pass
+        else:
+            for start, stop in bounds:
+                _fill_slice(shared, settings, start, stop)
+    except BaseException:
+        shared.close()
+        raise
+
+    return shared
+
+
+def _checkpoint_chunk(directory, chunk, inputs, settings)-> int:
+    # evaluate one chunk of sweep_checkpointed in a worker process and write its file
+    checkpoint.write_chunk(directory, chunk, _evaluate_chunk(inputs, **settings))
+    return chunk
+
+
+def sweep_checkpointed(
+        directory       : str,
+        s1_mixtures     : Optional[Iterable[str]] = None,
+        s2_mixtures     : Optional[Iterable[str]] = None,
+        X_values        : Iterable[float] = range(1, 100),
+        stage_1_radii   : Iterable[float] = (2.6 * 3,),
+        stage_2_radii   : Iterable[float] = (2.6,),
+        nose_h          : float = 6,
+        nose_r          : float = 2.6,
+        m_pl            : float = 26000,
+        chunk_size      : int = CHUNK_SIZE,
+        feasible_only   : bool = False,
+        warm_start      : bool = False,
+        anchor_stride   : int = 8,
+        closed          : bool = False,
+        workers         : int = 1,
+    )-> Iterator[Dict[str, np.ndarray]]:
+    """
+    Inputs:
+        directory   (str)   : checkpoint directory (see checkpoint.Checkpoint), created if missing
+        workers     (int)   : worker processes evaluating the unfinished chunks, 1 runs in this process
+        see sweep_chunks() for the other arguments
+
+    Output:
+        Iterator of the chunks of sweep_chunks(), in grid order
+
+    Chunk i is always the i-th chunk of grid_chunks(), the same on every call. Finished
+    chunks are read back from the directory, the others are evaluated and saved before they
+    are used, so a sweep killed at any point resumes from its unfinished chunks when called
+    again with the same arguments and gives the same results. A directory holding a sweep
+    with other arguments raises ValueError.
+    """
+    s1_mixtures = mixture_names if s1_mixtures is None else list(s1_mixtures)
+    s2_mixtures = mixture_names if s2_mixtures is None else list(s2_mixtures)
+    X_values = [float(X) for X in X_values]
+    stage_1_radii = [float(radius) for radius in stage_1_radii]
+    stage_2_radii = [float(radius) for radius in stage_2_radii]
+    grid_arguments = (s1_mixtures, s2_mixtures, X_values, stage_1_radii, stage_2_radii, feasible_only)
+    settings = dict(nose_h=float(nose_h), nose_r=float(nose_r), m_pl=float(m_pl),
+                    warm_start=warm_start, anchor_stride=anchor_stride, closed=closed)
+
+    parameters = dict(settings, s1_mixtures=s1_mixtures, s2_mixtures=s2_mixtures, X_values=X_values,
+                      stage_1_radii=stage_1_radii, stage_2_radii=stage_2_radii, feasible_only=feasible_only,
+                      chunk_size=chunk_size)
+    if warm_start:
+        # chunked by whole runs, see grid_chunks()
+        parameters['whole_runs'] = True
+    run = checkpoint.Checkpoint(
+        directory,
+        parameters,
+        n_chunks=sum(1 for _ in grid_chunks(design_grid(*grid_arguments), chunk_size, whole_runs=warm_start)),
+    )
+
+    def unfinished_chunks():
+        grid = grid_chunks(design_grid(*grid_arguments), chunk_size, whole_runs=warm_start)
+        for chunk, designs in enumerate(grid):
+            if not run.is_finished(chunk):
+                yield chunk, _grid_inputs(designs)
+
+    if workers > 1 and not run.complete:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            # two chunks per worker in flight, the manifest records them as they finish
+            pending = set()
+            for chunk, inputs in unfinished_chunks():
+                if len(pending) >= 2 * workers:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        run.mark_finished(future.result())
+                pending.add(executor.submit(_checkpoint_chunk, directory, chunk, inputs, settings))
+            for future in as_completed(pending):
+                run.mark_finished(future.result())
+
+    unfinished = unfinished_chunks()
+    for chunk in range(run.n_chunks):
+        if run.is_finished(chunk):
+            yield run.load(chunk)
+            continue
+        _, inputs = next(unfinished)
+        designs = _evaluate_chunk(inputs, **settings)
+        run.save(chunk, designs)
+        yield designs
+
+
+if __name__ == '__main__':
+    results = sweep()
+    results.to_csv('sweep_results.csv', index=False)
+    print(results[results.feasible].sort_values('total_mass').head(10))
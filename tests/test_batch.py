@@ -0,0 +1,72 @@
+import io
+import json
+
+import pytest
+
+import batch
+
+
+'''
+batch.run_batch: one output line per input line in input order, invalid lines as
+{"line", "error"} rows, strict JSON only, the same output in this process and on a
+process pool.
+'''
+
+LINES = [
+    '{"X": 44, "s1_prop_mix": "LOX_RP1", "s2_prop_mix": "LOX_LH2"}',
+    '{"X": 44, "s1_prop_mix": ["LOX_RP1"], "s2_prop_mix": "LOX_LH2"}',
+    'not json',
+    '',
+    '{"X": 30, "s1_prop_mix": "LOX_LCH4", "s2_prop_mix": "LOX_LCH4", "stage_1_radius": 5.2}',
+    '5',
+    '{"X": 44, "s1_prop_mix": "LOX_RP1", "s2_prop_mix": "LOX_LH2", "nose_h": null}',
+    '{"X": 99, "s1_prop_mix": "Solid", "s2_prop_mix": "Solid"}',
+    '{"X": 44, "s1_prop_mix": "LOX_RP1", "s2_prop_mix": "LOX_LH2", "stage_1_radius": 0}',
+]
+
+
+def _reject_constant(constant):
+    raise ValueError(f'{constant} is not valid JSON')
+
+
+def _run(workers, chunk_size):
+    sink = io.StringIO()
+    report = batch.run_batch(
+        (line + '\n' for line in LINES),
+        sink,
+        workers=workers,
+        chunk_size=chunk_size,
+        columns=['X', 'total_mass', 'feasible'],
+    )
+    # strict parsing, NaN and Infinity are not JSON
+    return report, [json.loads(line, parse_constant=_reject_constant) for line in sink.getvalue().splitlines()]
+
+
+def test_invalid_lines_give_error_rows():
+    report, rows = _run(workers=1, chunk_size=3)
+
+    assert report.designs == 8
+    assert report.rejected == 5
+    assert [row.get('line') for row in rows] == [None, 2, 3, None, 6, 7, None, 9]
+    assert all('error' in row for row in rows if 'line' in row)
+    assert [row['X'] for row in rows if 'line' not in row] == [44, 30, 99]
+    assert rows[0]['feasible'] is True
+    assert rows[6]['feasible'] is False
+
+
+def test_degenerate_geometry_is_an_error_row():
+    text, rejected = batch.evaluate_lines([(1, LINES[-1])])
+    assert rejected == 1
+    assert json.loads(text, parse_constant=_reject_constant) == {'line': 1, 'error': 'stage_1_radius must be positive'}
+
+
+def test_all_columns_are_strict_json():
+    text, rejected = batch.evaluate_lines([(number, line) for number, line in enumerate(LINES, 1) if line])
+    rows = [json.loads(line, parse_constant=_reject_constant) for line in text.splitlines()]
+    assert rejected == 5
+    assert rows[0]['s1_L_D'] > 0
+
+
+@pytest.mark.parametrize('chunk_size', [1, 2, 100])
+def test_pool_matches_single_process(chunk_size):
+    assert _run(workers=2, chunk_size=chunk_size)[1] == _run(workers=1, chunk_size=chunk_size)[1]
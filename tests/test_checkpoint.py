@@ -0,0 +1,96 @@
+import itertools
+import json
+import os
+
+import numpy as np
+import pytest
+
+import checkpoint
+import monte_carlo
+import sweep
+
+
+'''
+Checkpointed runs interrupted part-way resume from the finished chunks and give the same
+results as an uninterrupted run.
+'''
+
+# six runs of X, with warm_start every chunk holds whole runs
+GRID = dict(X_values=np.arange(1, 100, 2), s1_mixtures=['LOX_RP1', 'LOX_LCH4', 'LOX_LH2'], s2_mixtures=['LOX_LH2', 'Storables'])
+CHUNK_SIZE = 50
+DESIGN = (44, 'LOX_RP1', 'LOX_LH2')
+
+
+def _finished(directory):
+    with open(os.path.join(directory, checkpoint.MANIFEST)) as file:
+        return json.load(file)['finished']
+
+
+def _assert_chunks_equal(chunks, expected):
+    assert len(chunks) == len(expected)
+    for chunk, expected_chunk in zip(chunks, expected):
+        for column in ('X', 's1_prop_mix', 'total_mass', 's1_engine_count', 'thrust_evaluations', 'feasible'):
+            np.testing.assert_array_equal(chunk[column], expected_chunk[column])
+
+
+@pytest.mark.parametrize('warm_start', [False, True], ids=['cold', 'warm_start'])
+@pytest.mark.parametrize('workers', [1, 2])
+def test_interrupted_sweep_resumes(tmp_path, warm_start, workers):
+    expected = list(sweep.sweep_chunks(chunk_size=CHUNK_SIZE, warm_start=warm_start, **GRID))
+    assert len(expected) > 4
+
+    # stopped after three chunks, the generator is closed like an interrupted loop
+    chunks = sweep.sweep_checkpointed(str(tmp_path), chunk_size=CHUNK_SIZE, warm_start=warm_start, **GRID)
+    first = list(itertools.islice(chunks, 3))
+    chunks.close()
+    assert _finished(str(tmp_path)) == [0, 1, 2]
+
+    # a chunk file the manifest does not record is evaluated again
+    with open(checkpoint.chunk_path(str(tmp_path), 3), 'wb') as file:
+        file.write(b'partial')
+
+    resumed = list(sweep.sweep_checkpointed(str(tmp_path), chunk_size=CHUNK_SIZE, warm_start=warm_start, workers=workers, **GRID))
+    _assert_chunks_equal(first, expected[:3])
+    _assert_chunks_equal(resumed, expected)
+    assert _finished(str(tmp_path)) == list(range(len(expected)))
+
+
+def test_sweep_checkpoint_of_other_run_is_refused(tmp_path):
+    list(sweep.sweep_checkpointed(str(tmp_path), chunk_size=CHUNK_SIZE, **GRID))
+    with pytest.raises(ValueError):
+        next(sweep.sweep_checkpointed(str(tmp_path), chunk_size=CHUNK_SIZE, m_pl=20000, **GRID))
+
+
+class _Interrupted(Exception):
+    pass
+
+
+def test_interrupted_monte_carlo_resumes(tmp_path, monkeypatch):
+    arguments = dict(n_samples=1000, chunk_size=200, seed=3, keep_samples=True)
+    expected = monte_carlo.monte_carlo(*DESIGN, **arguments)
+
+    # the third chunk fails, the first two are saved
+    run_chunk = monte_carlo._run_chunk
+    calls = []
+
+    def interrupted(task):
+        if len(calls) == 2:
+            raise _Interrupted
+        calls.append(task)
+        return run_chunk(task)
+
+    monkeypatch.setattr(monte_carlo, '_run_chunk', interrupted)
+    with pytest.raises(_Interrupted):
+        monte_carlo.monte_carlo(*DESIGN, checkpoint_dir=str(tmp_path), **arguments)
+    assert _finished(str(tmp_path)) == [0, 1]
+
+    # only the three unfinished chunks are evaluated on resume
+    calls.clear()
+    monkeypatch.setattr(monte_carlo, '_run_chunk', lambda task: calls.append(task) or run_chunk(task))
+    resumed = monte_carlo.monte_carlo(*DESIGN, checkpoint_dir=str(tmp_path), **arguments)
+    assert len(calls) == 3
+
+    for column in monte_carlo.REPORTED_COLUMNS:
+        np.testing.assert_array_equal(resumed.samples[column], expected.samples[column])
+    assert resumed.percentiles == expected.percentiles
+    assert resumed.n_failed == expected.n_failed
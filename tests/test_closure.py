@@ -0,0 +1,71 @@
+import numpy as np
+import pytest
+
+import closure
+import design_pipeline as dp
+
+
+'''
+closure.close_designs: the returned inert mass fractions reproduce themselves through the
+design chain, the accelerated and plain iterations close on the same fractions, and
+non-physical designs are reported instead of closed.
+'''
+
+X_VALUES = np.arange(20, 70, 2.0)
+TOLERANCE = 1e-6
+
+
+@pytest.fixture(scope='module')
+def closed():
+    return closure.close_designs(X_VALUES, 'LOX_RP1', 'LOX_LH2', tolerance=TOLERANCE)
+
+
+def test_designs_close(closed):
+    converged = closed['closure_converged']
+    assert converged.sum() > 10
+    assert (closed['closure_residual'][converged] < TOLERANCE).all()
+    # only non-physical designs are left open
+    np.testing.assert_array_equal(converged, closed['feasible'])
+
+
+def test_closed_fractions_are_a_fixed_point(closed):
+    converged = closed['closure_converged']
+    delta_1 = closed['delta_1'][converged]
+    delta_2 = closed['delta_2'][converged]
+
+    # one more pass through the design chain from a cold thrust start
+    designs = dp.evaluate_designs(
+        X=X_VALUES[converged],
+        s1_prop_mix='LOX_RP1',
+        s2_prop_mix='LOX_LH2',
+        delta_1=delta_1,
+        delta_2=delta_2,
+    )
+    np.testing.assert_allclose(designs['s1_inert_m_frac'], delta_1, atol=10 * TOLERANCE)
+    np.testing.assert_allclose(designs['s2_inert_m_frac'], delta_2, atol=10 * TOLERANCE)
+
+
+def test_plain_iteration_closes_on_the_same_fractions(closed):
+    plain = closure.close_designs(X_VALUES, 'LOX_RP1', 'LOX_LH2', tolerance=TOLERANCE, accelerate=False)
+    converged = closed['closure_converged']
+
+    np.testing.assert_array_equal(plain['closure_converged'], converged)
+
+    # engine counts are whole, next to a count change both counts can close
+    same = converged & (plain['s1_engine_count'] == closed['s1_engine_count']) & (plain['s2_engine_count'] == closed['s2_engine_count'])
+    assert same.sum() >= converged.sum() - 1
+    np.testing.assert_allclose(plain['delta_1'][same], closed['delta_1'][same], atol=10 * TOLERANCE)
+    np.testing.assert_allclose(plain['delta_2'][same], closed['delta_2'][same], atol=10 * TOLERANCE)
+    assert closed['closure_iterations'][converged].sum() <= plain['closure_iterations'][converged].sum()
+
+
+def test_close_design_matches_close_designs(closed):
+    i = int(np.flatnonzero(X_VALUES == 44)[0])
+    design, info = closure.close_design(44, 'LOX_RP1', 'LOX_LH2', tolerance=TOLERANCE)
+    assert info['delta_1'] == closed['delta_1'][i]
+    assert design.total_mass == closed['total_mass'][i]
+
+
+def test_non_physical_design_is_refused():
+    with pytest.raises(ValueError):
+        closure.close_design(5, 'LOX_RP1', 'LOX_LH2')
@@ -0,0 +1,89 @@
+import json
+import threading
+
+import numpy as np
+import pytest
+
+import design_server as ds
+
+
+'''
+Request validation of design_server: malformed designs, degenerate geometry and column
+lists are rejected with ValueError, and with status 400 over HTTP, instead of killing the
+handler thread or answering with invalid JSON.
+'''
+
+DESIGN = {'X': 44, 's1_prop_mix': 'LOX_RP1', 's2_prop_mix': 'LOX_LH2'}
+
+
+@pytest.fixture(scope='module')
+def client():
+    server = ds.make_server(port=0)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    with ds.DesignClient(port=server.server_address[1]) as client:
+        yield client
+    server.shutdown()
+    server.server_close()
+    server.batcher.stop()
+
+
+@pytest.mark.parametrize('design', [
+    dict(DESIGN, s1_prop_mix=['LOX_RP1']),
+    dict(DESIGN, s2_prop_mix={'name': 'LOX_LH2'}),
+    dict(DESIGN, s1_prop_mix=3),
+    dict(DESIGN, s1_prop_mix='LOX'),
+    dict(DESIGN, X='44'),
+    dict(DESIGN, X=True),
+    dict(DESIGN, radius=2.6),
+    dict(DESIGN, stage_1_radius=0),
+    dict(DESIGN, stage_2_radius=-2.6),
+    dict(DESIGN, nose_h=0),
+    dict(DESIGN, nose_r=-1),
+    dict(DESIGN, m_pl=-1),
+    {'X': 44, 's1_prop_mix': 'LOX_RP1'},
+    ['LOX_RP1'],
+])
+def test_parse_design_rejects(design):
+    with pytest.raises(ValueError):
+        ds.parse_design(design)
+
+
+def test_parse_design_defaults():
+    design = ds.parse_design(DESIGN)
+    assert design['X'] == 44.0
+    assert design['m_pl'] == ds.DESIGN_DEFAULTS['m_pl']
+
+
+@pytest.mark.parametrize('body', [
+    dict(DESIGN, s1_prop_mix=['LOX_RP1']),
+    {'designs': [DESIGN], 'columns': 5},
+    {'designs': [DESIGN], 'columns': 'total_mass'},
+    {'designs': [DESIGN], 'columns': [['total_mass']]},
+    {'designs': [DESIGN], 'columns': ['mass']},
+    dict(DESIGN, stage_1_radius=0),
+])
+def test_invalid_request_is_400(client, body):
+    with pytest.raises(ValueError):
+        client.evaluate(body)
+    # the connection is still served
+    assert client.evaluate(DESIGN)['feasible'] is True
+
+
+def test_columns(client):
+    rows = client.evaluate([DESIGN, DESIGN], columns=['total_mass', 'feasible'])
+    assert [sorted(row) for row in rows] == [['feasible', 'total_mass']] * 2
+
+
+def test_parse_design_accepts_no_payload():
+    assert ds.parse_design(dict(DESIGN, m_pl=0))['m_pl'] == 0.0
+
+
+def test_result_rows_have_no_infinities():
+    designs = ds.evaluate_parsed([ds.parse_design(DESIGN)] * 2)
+    designs['s1_L_D'] = np.array([np.inf, 10.0])
+    designs['s1_engine_count'] = np.array([-np.inf, 9.0])
+    rows = ds.result_rows(designs)
+    assert [row['s1_L_D'] for row in rows] == [None, 10.0]
+    assert [row['s1_engine_count'] for row in rows] == [None, 9]
+    json.dumps(rows, allow_nan=False)
@@ -0,0 +1,88 @@
+import itertools
+
+import numpy as np
+import pytest
+
+import mass_estimation_part2 as me2
+import part1
+
+from dictionaries import mixture_codes, mixture_names
+
+
+'''
+mass_estimation and part1.stage_mass: non-physical dV splits come back as NaN,
+whichever stage can not deliver its dV. feasible_X_window: the window is exactly where
+mass_estimation is physical, or where both payload fractions are above the minimum.
+'''
+
+
+def test_both_stages_non_physical():
+    # large inert fractions, neither stage can deliver half of the dV: both payload fractions are
+    # negative and their quotient m_0 would come out positive
+    m_pr_1, m_pr_2, m_0, m_0_2 = me2.mass_estimation(np.array([40.0, 50.0, 60.0]), 'LOX_RP1', 'LOX_LH2', delta_1=0.5, delta_2=0.5)
+    for values in (m_pr_1, m_pr_2, m_0, m_0_2):
+        assert np.all(np.isnan(values))
+
+    assert np.isnan(me2.mass_estimation(50.0, 'LOX_RP1', 'LOX_LH2', delta_1=0.5, delta_2=0.5)[2])
+    # Isp of 200 s leaves a mass ratio below the 0.08 inert fraction on both stages
+    assert all(np.isnan(part1.stage_mass(6150.0, 6150.0, 200, 200)))
+
+
+@pytest.mark.parametrize('X', [5.0, 95.0])
+def test_one_stage_non_physical(X):
+    m_pr_1, m_pr_2, m_0, m_0_2 = me2.mass_estimation(X, 'LOX_RP1', 'LOX_LH2')
+    assert np.isnan(m_0) and np.isnan(m_pr_1) and np.isnan(m_pr_2)
+    # stage 2 alone is physical for a small stage 2 dV
+    assert np.isnan(m_0_2) == (X < 50)
+
+
+def test_physical_design():
+    m_pr_1, m_pr_2, m_0, m_0_2 = me2.mass_estimation(44.0, 'LOX_RP1', 'LOX_LH2')
+    assert 0 < m_0_2 < m_0
+    assert m_pr_1 > 0 and m_pr_2 > 0
+
+
+PAIRS = list(itertools.product(mixture_names, repeat=2))
+X_GRID = np.arange(0, 100.001, 0.01)
+
+
+def _inside(X, X_min, X_max):
+    # inside the open window, points within 1e-6 of a bound are left out of the comparison
+    far = (np.abs(X - X_min) > 1e-6) & (np.abs(X - X_max) > 1e-6)
+    return (X > X_min) & (X < X_max), far
+
+
+@pytest.mark.parametrize('s1_prop_mix, s2_prop_mix', PAIRS)
+def test_feasible_window_is_the_nan_boundary(s1_prop_mix, s2_prop_mix):
+    X_min, X_max = me2.feasible_X_window(s1_prop_mix, s2_prop_mix)
+    assert 0 < X_min < X_max < 100
+
+    m_pr_1, m_pr_2, m_0, m_0_2 = me2.mass_estimation(X_GRID, s1_prop_mix, s2_prop_mix)
+    physical = np.isfinite(m_pr_1) & np.isfinite(m_pr_2) & np.isfinite(m_0) & np.isfinite(m_0_2)
+    inside, far = _inside(X_GRID, X_min, X_max)
+    np.testing.assert_array_equal(physical[far], inside[far])
+
+
+@pytest.mark.parametrize('s1_prop_mix, s2_prop_mix', PAIRS)
+def test_feasible_window_with_min_payload_fraction(s1_prop_mix, s2_prop_mix):
+    X_min, X_max = me2.feasible_X_window(s1_prop_mix, s2_prop_mix, me2.MIN_PAYLOAD_FRACTION)
+    physical_min, physical_max = me2.feasible_X_window(s1_prop_mix, s2_prop_mix)
+    assert physical_min < X_min < X_max < physical_max
+
+    # payload fraction of each stage, payload mass / stage gross mass
+    _, _, m_0, m_0_2 = me2.mass_estimation(X_GRID, s1_prop_mix, s2_prop_mix)
+    with np.errstate(invalid='ignore'):
+        usable = (me2.m_pl_2 / m_0_2 > me2.MIN_PAYLOAD_FRACTION) & (m_0_2 / m_0 > me2.MIN_PAYLOAD_FRACTION)
+    inside, far = _inside(X_GRID, X_min, X_max)
+    np.testing.assert_array_equal(usable[far], inside[far])
+
+
+def test_feasible_window_of_codes():
+    s1_prop_mix, s2_prop_mix = zip(*PAIRS)
+    X_min, X_max = me2.feasible_X_window(
+        np.array([mixture_codes[mixture] for mixture in s1_prop_mix]),
+        np.array([mixture_codes[mixture] for mixture in s2_prop_mix]),
+    )
+    expected = [me2.feasible_X_window(*pair) for pair in PAIRS]
+    np.testing.assert_array_equal(X_min, [window[0] for window in expected])
+    np.testing.assert_array_equal(X_max, [window[1] for window in expected])
@@ -0,0 +1,130 @@
+import numpy as np
+import pytest
+
+import Mass_functions as Mfunc
+from dictionaries import (
+    mixture_codes,
+    mixture_names,
+    Expansion_ratio_stage1,
+    Expansion_ratio_stage2,
+    Chamber_pressure_stage1,
+    Chamber_pressure_stage2,
+)
+from Mass_functions import MER_COEFFICIENTS
+from property_tables import stage_1_properties, stage_2_properties
+
+
+'''
+Batched Mass_functions estimators against per-element scalar calls.
+
+Every estimator is called once on arrays and once per element on python scalars, the
+results must agree. The mixture dependent estimators are checked for every mixture with
+both forms of the per-mixture table (dict keyed by mixture name, property_tables column
+indexed by mixture code), with mixtures given as names and as integer codes.
+'''
+
+RTOL = 1e-14
+
+# every mixture, three designs each
+MIXTURES = np.repeat(np.array(mixture_names, dtype=object), 3)
+CODES = np.array([mixture_codes[name] for name in MIXTURES])
+N = len(MIXTURES)
+
+RNG = np.random.default_rng(0)
+THRUST = RNG.uniform(1e5, 1e7, N)
+MASS = RNG.uniform(1e3, 1e6, N)
+AREA = RNG.uniform(10, 500, N)
+LENGTH = RNG.uniform(5, 80, N)
+
+
+def _scale(function):
+    # per-design coefficient arrays around the nominal MER coefficients
+    return {
+        keyword: nominal * RNG.uniform(0.8, 1.2, N)
+        for keyword, nominal in MER_COEFFICIENTS[function].items()
+    }
+
+
+def _element(kwargs, i):
+    # element i of array keyword arguments as python scalars
+    return {keyword: float(value[i]) for keyword, value in kwargs.items()}
+
+
+def _assert_matches_scalar(function, batched, arrays, scalar_arguments, kwargs):
+    # batched: result of function(*arrays, **kwargs), checked against one call per element
+    expected = [
+        function(*[float(values[i]) for values in arrays], *scalar_arguments(i), **_element(kwargs, i))
+        for i in range(N)
+    ]
+    assert np.shape(batched) == (N,)
+    np.testing.assert_allclose(batched, expected, rtol=RTOL, atol=0)
+
+
+# (stage table as dict, as property_tables column)
+EXPANSION_TABLES = [
+    (Expansion_ratio_stage1, stage_1_properties['expansion_ratio']),
+    (Expansion_ratio_stage2, stage_2_properties['expansion_ratio']),
+]
+PRESSURE_TABLES = [
+    (Chamber_pressure_stage1, stage_1_properties['chamber_pressure']),
+    (Chamber_pressure_stage2, stage_2_properties['chamber_pressure']),
+]
+
+
+@pytest.mark.parametrize('stage', [1, 2])
+@pytest.mark.parametrize('table_form', ['dict', 'codes'])
+@pytest.mark.parametrize('mixture_form', ['names', 'codes'])
+@pytest.mark.parametrize('coefficients', [False, True])
+def test_rocket_engine(stage, table_form, mixture_form, coefficients):
+    dict_table, code_table = EXPANSION_TABLES[stage - 1]
+    table = dict_table if table_form == 'dict' else code_table
+    mixtures = MIXTURES if mixture_form == 'names' else CODES
+    kwargs = _scale('Rocket_Engine') if coefficients else {}
+
+    batched = Mfunc.Rocket_Engine(THRUST, mixtures, table, **kwargs)
+    _assert_matches_scalar(
+        Mfunc.Rocket_Engine, batched, [THRUST], lambda i: (MIXTURES[i], dict_table), kwargs)
+
+
+@pytest.mark.parametrize('stage', [1, 2])
+@pytest.mark.parametrize('table_form', ['dict', 'codes'])
+@pytest.mark.parametrize('mixture_form', ['names', 'codes'])
+@pytest.mark.parametrize('coefficients', [False, True])
+def test_gimbals(stage, table_form, mixture_form, coefficients):
+    dict_table, code_table = PRESSURE_TABLES[stage - 1]
+    table = dict_table if table_form == 'dict' else code_table
+    mixtures = MIXTURES if mixture_form == 'names' else CODES
+    kwargs = _scale('M_gimbals') if coefficients else {}
+
+    batched = Mfunc.M_gimbals(THRUST, mixtures, table, **kwargs)
+    _assert_matches_scalar(
+        Mfunc.M_gimbals, batched, [THRUST], lambda i: (MIXTURES[i], dict_table), kwargs)
+
+
+@pytest.mark.parametrize('mixture', mixture_names)
+@pytest.mark.parametrize('table_form', ['dict', 'codes'])
+def test_scalar_mixture_gives_scalar(mixture, table_form):
+    # one mixture, name or code, gives the same value from either table form
+    for (dict_table, code_table), function in ((EXPANSION_TABLES[0], Mfunc.Rocket_Engine), (PRESSURE_TABLES[0], Mfunc.M_gimbals)):
+        table = dict_table if table_form == 'dict' else code_table
+        expected = function(5e6, mixture, dict_table)
+        assert np.ndim(expected) == 0
+        for value in (function(5e6, mixture, table), function(5e6, mixture_codes[mixture], table)):
+            assert np.ndim(value) == 0
+            np.testing.assert_allclose(value, expected, rtol=RTOL, atol=0)
+
+
+@pytest.mark.parametrize('function, arrays', [
+    ('Motor_Casing', [MASS]),
+    ('Struct_Mass',  [THRUST]),
+    ('M_fairing',    [AREA]),
+    ('M_avionic',    [MASS]),
+    ('M_wiring',     [MASS, LENGTH]),
+])
+@pytest.mark.parametrize('coefficients', [False, True])
+def test_mixture_free_estimators(function, arrays, coefficients):
+    kwargs = _scale(function) if coefficients else {}
+    estimator = getattr(Mfunc, function)
+
+    batched = estimator(*arrays, **kwargs)
+    _assert_matches_scalar(estimator, batched, arrays, lambda i: (), kwargs)
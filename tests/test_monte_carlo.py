@@ -0,0 +1,49 @@
+import numpy as np
+import pytest
+
+import design_pipeline as dp
+import monte_carlo as mc
+
+
+'''
+monte_carlo: without uncertainty every sample is the nominal design, the samples depend on
+seed and chunk_size only and not on the number of worker processes, and unknown MER
+coefficients are refused.
+'''
+
+DESIGN = (44, 'LOX_RP1', 'LOX_LH2')
+
+
+@pytest.mark.parametrize('uncertainty', [{}, dict.fromkeys(mc.DEFAULT_UNCERTAINTY, 0.0)], ids=['none', 'zero'])
+def test_no_uncertainty_is_the_nominal_design(uncertainty):
+    design = dp.evaluate_design(*DESIGN)
+    result = mc.monte_carlo(*DESIGN, n_samples=50, chunk_size=20, uncertainty=uncertainty, keep_samples=True)
+
+    assert result.n_failed == 0
+    for column in mc.REPORTED_COLUMNS:
+        np.testing.assert_allclose(result.samples[column], getattr(design, column), rtol=1e-12)
+        assert result.std[column] == pytest.approx(0, abs=1e-9 * abs(getattr(design, column)))
+        assert result.percentiles[column][50] == pytest.approx(getattr(design, column), rel=1e-12)
+
+
+def test_pool_matches_single_process():
+    arguments = dict(n_samples=600, chunk_size=150, seed=7, keep_samples=True)
+    single = mc.monte_carlo(*DESIGN, workers=1, **arguments)
+    pool = mc.monte_carlo(*DESIGN, workers=2, **arguments)
+
+    for column in mc.REPORTED_COLUMNS:
+        np.testing.assert_array_equal(pool.samples[column], single.samples[column])
+    assert pool.percentiles == single.percentiles
+    assert pool.n_failed == single.n_failed
+
+
+def test_uncertainty_spreads_the_samples():
+    result = mc.monte_carlo(*DESIGN, n_samples=500, chunk_size=500)
+    percentiles = result.percentiles['total_mass']
+    assert percentiles[5] < dp.evaluate_design(*DESIGN).total_mass < percentiles[95]
+    assert len(result.summary().splitlines()) == len(mc.REPORTED_COLUMNS) + 2
+
+
+def test_unknown_coefficient_is_refused():
+    with pytest.raises(ValueError):
+        mc.sample_coefficients(10, np.random.default_rng(0), {'Rocket_Engine.mass': 0.1})
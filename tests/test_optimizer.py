@@ -0,0 +1,55 @@
+import math
+
+import numpy as np
+import pytest
+
+import design_pipeline as dp
+import mass_estimation_part2 as me2
+import optimizer
+
+
+'''
+optimizer: brent_minimize finds the minimum of smooth functions to xtol, also next to
+undefined (inf) regions, and optimize_split is as good as a 0.01 % grid over the feasible
+window of the mixture pair.
+'''
+
+PAIRS = [('LOX_RP1', 'LOX_LH2'), ('LOX_LCH4', 'LOX_LCH4'), ('Storables', 'LOX_RP1')]
+
+
+@pytest.mark.parametrize('f, a, b, expected', [
+    (lambda x: (x - 1.3)**2, -4.0, 10.0, 1.3),
+    (lambda x: math.cosh(x - 7.25) + 0.1 * x, 0.0, 20.0, 7.25 - math.asinh(0.1)),
+    (lambda x: math.inf if x < 2 else (x - 2.5)**4, 0.0, 5.0, 2.5),
+])
+def test_brent_minimize(f, a, b, expected):
+    x, fx, iterations, converged = optimizer.brent_minimize(f, a, b, xtol=1e-6)
+    assert converged
+    assert x == pytest.approx(expected, abs=1e-3)
+    assert fx == f(x)
+
+
+def test_brent_minimize_rejects_bracket():
+    with pytest.raises(ValueError):
+        optimizer.brent_minimize(abs, 1.0, 1.0)
+
+
+@pytest.mark.parametrize('objective', ['total_mass', 'total_cost_with_margin'])
+@pytest.mark.parametrize('s1_prop_mix, s2_prop_mix', PAIRS)
+def test_split_matches_grid_optimum(s1_prop_mix, s2_prop_mix, objective):
+    result = optimizer.optimize_split(s1_prop_mix, s2_prop_mix, objective=objective, xtol=1e-3)
+    assert result.converged
+
+    X_min, X_max = me2.feasible_X_window(s1_prop_mix, s2_prop_mix, me2.MIN_PAYLOAD_FRACTION)
+    designs = dp.evaluate_designs(X=np.arange(X_min, X_max, 0.01), s1_prop_mix=s1_prop_mix, s2_prop_mix=s2_prop_mix)
+    grid_optimum = np.where(designs['feasible'], designs[objective], np.inf).min()
+
+    # engine counts are whole, the objective has small steps between grid points
+    assert result.value <= grid_optimum * (1 + 1e-4)
+    assert result.value == getattr(result.design, objective)
+    assert X_min <= result.X <= X_max
+
+
+def test_unknown_objective_is_refused():
+    with pytest.raises(ValueError):
+        optimizer.optimize_split('LOX_RP1', 'LOX_LH2', objective='mass')
@@ -0,0 +1,69 @@
+import numpy as np
+import pytest
+
+import design_pipeline as dp
+import pareto
+
+
+'''
+pareto: pareto_front against a brute force O(n^2) front, with ties and duplicate points,
+and the front kept chunk by chunk by pareto_sweep against the brute force front of all
+sampled designs at once.
+'''
+
+OBJECTIVES = ('total_mass', 'total_cost_with_margin')
+
+
+def _brute_force_front(objective_1, objective_2):
+    # (objective_1, objective_2) of the points no other point is at least as good as in both and better in one
+    points = set()
+    for a, b in zip(objective_1, objective_2):
+        dominated = ((objective_1 <= a) & (objective_2 <= b) & ((objective_1 < a) | (objective_2 < b))).any()
+        if not dominated:
+            points.add((a, b))
+    return points
+
+
+@pytest.mark.parametrize('seed', range(5))
+def test_front_matches_brute_force(seed):
+    rng = np.random.default_rng(seed)
+    # small integers, so that ties and duplicates are common
+    objective_1 = rng.integers(0, 30, 400).astype(float)
+    objective_2 = rng.integers(0, 30, 400).astype(float)
+
+    front = pareto.pareto_front(objective_1, objective_2)
+    points = list(zip(objective_1[front], objective_2[front]))
+
+    assert set(points) == _brute_force_front(objective_1, objective_2)
+    # one point per position, sorted by the first objective
+    assert len(points) == len(set(points))
+    assert np.all(np.diff(objective_1[front]) > 0)
+    assert np.all(np.diff(objective_2[front]) < 0)
+
+
+def test_sweep_front_matches_brute_force():
+    n_samples, chunk_size, seed = 5000, 700, 4
+    front = pareto.pareto_sweep(n_samples, chunk_size=chunk_size, seed=seed)
+
+    # the same samples, drawn chunk by chunk from the same generator, evaluated at once
+    rng = np.random.default_rng(seed)
+    chunks = [pareto.sample_designs(min(chunk_size, n_samples - start), rng) for start in range(0, n_samples, chunk_size)]
+    inputs = {column: np.concatenate([chunk[column] for chunk in chunks]) for column in chunks[0]}
+    designs = dp.evaluate_designs(**inputs)
+    keep = designs['feasible'] & np.isfinite(designs[OBJECTIVES[0]]) & np.isfinite(designs[OBJECTIVES[1]])
+
+    expected = _brute_force_front(designs[OBJECTIVES[0]][keep], designs[OBJECTIVES[1]][keep])
+    assert set(zip(front[OBJECTIVES[0]], front[OBJECTIVES[1]])) == expected
+    assert front['feasible'].all()
+    assert sorted(front) == sorted(pareto.RESULT_COLUMNS)
+
+
+def test_samples_stay_in_the_feasible_window():
+    designs = pareto.sample_designs(2000, np.random.default_rng(0), s1_mixtures=['LOX_RP1'], s2_mixtures=['LOX_LH2', 'Storables'])
+    evaluated = dp.evaluate_designs(**designs)
+    assert evaluated['feasible'].mean() > 0.9
+
+
+def test_two_objectives_are_needed():
+    with pytest.raises(ValueError):
+        next(pareto.pareto_chunks(10, objectives=('total_mass',)))
@@ -0,0 +1,55 @@
+import numpy as np
+import pytest
+
+import propellant_tank_calculations as ptc
+
+from dictionaries import fuel_ratios, prop_densities
+
+
+'''
+find_cyl_tank_dim with a given height: closed form radius against the volume equation,
+up to and including the sphere limit. find_prop_mass_volume: mixture ratio split and the
+Storables propellant names.
+'''
+
+
+@pytest.mark.parametrize('height', [1.0, 7.3, 40.0, 123.4])
+def test_sphere_limit(height):
+    _, radius, tank_height = ptc.find_cyl_tank_dim(np.pi * height**3 / 6, height=height)
+    assert tank_height == height
+    np.testing.assert_allclose(radius, height / 2, rtol=1e-12)
+
+
+def test_radius_solves_volume():
+    height = np.array([10.0, 20.0, 40.0])
+    volume = np.array([50.0, 2000.0, 30000.0])
+    _, radius, _ = ptc.find_cyl_tank_dim(volume, height=height)
+    # two hemispheres and a cylinder of height - 2 r
+    np.testing.assert_allclose(4 / 3 * np.pi * radius**3 + np.pi * radius**2 * (height - 2 * radius), volume, rtol=1e-12)
+
+
+def test_more_than_a_sphere_is_not_solvable():
+    _, radius, _ = ptc.find_cyl_tank_dim(np.pi * 40**3 / 6 * 1.001, height=40)
+    assert np.isnan(radius)
+
+
+def test_storables_use_their_propellants():
+    # whatever oxidizer and fuel are given, Storables are N2O4 / UDMH
+    expected = ptc.find_prop_mass_volume(10000, 'N2O4', 'UDMH', 'Storables')
+    assert ptc.find_prop_mass_volume(10000, 'Storables', 'Storables', 'Storables') == expected
+    assert ptc.find_prop_mass_volume(10000, 'LOX', 'RP1', 'Storables') == expected
+
+    oxidizer_mass, oxidizer_volume, fuel_mass, fuel_volume = expected
+    assert oxidizer_mass + fuel_mass == pytest.approx(10000)
+    assert oxidizer_volume == pytest.approx(oxidizer_mass / prop_densities['N2O4'])
+    assert fuel_volume == pytest.approx(fuel_mass / prop_densities['UDMH'])
+
+
+def test_other_mixtures_use_the_given_propellants():
+    oxidizer_mass, oxidizer_volume, fuel_mass, fuel_volume = ptc.find_prop_mass_volume(10000, 'LOX', 'LH2', 'LOX_RP1')
+    assert oxidizer_mass / fuel_mass == pytest.approx(fuel_ratios['LOX_RP1'])
+    assert fuel_volume == pytest.approx(fuel_mass / prop_densities['LH2'])
+
+    # only Storables are remapped, an unknown propellant is an error
+    with pytest.raises(KeyError):
+        ptc.find_prop_mass_volume(10000, 'LOX_LH2', 'LOX_LH2', 'LOX_LH2')
@@ -0,0 +1,29 @@
+import numpy as np
+import pytest
+
+from dictionaries import mixture_codes, mixture_names
+from property_tables import stage_1_properties, stage_properties, to_mixture_codes
+
+
+'''
+Mixture code conversion and the per-stage property tables.
+'''
+
+
+def test_names_and_codes():
+    codes = to_mixture_codes(np.array([['LOX_RP1', 'Storables'], ['LOX_LH2', 'LOX_RP1']]))
+    assert codes.shape == (2, 2)
+    assert codes.tolist() == [[mixture_codes['LOX_RP1'], mixture_codes['Storables']], [mixture_codes['LOX_LH2'], mixture_codes['LOX_RP1']]]
+    np.testing.assert_array_equal(to_mixture_codes(codes), codes)
+    assert to_mixture_codes(np.array([], dtype=int)).size == 0
+
+
+@pytest.mark.parametrize('mixtures', ['LOX', ['LOX_RP1', 'N2O4'], -1, [0, len(mixture_names)], np.array([2, -3])])
+def test_invalid_mixtures(mixtures):
+    with pytest.raises(ValueError):
+        to_mixture_codes(mixtures)
+
+
+def test_stage_properties_rows():
+    codes = to_mixture_codes(mixture_names)
+    np.testing.assert_array_equal(stage_properties(codes, stage=1), stage_1_properties)
@@ -0,0 +1,63 @@
+import numpy as np
+import pytest
+
+import design_pipeline
+from result_store import ResultStore
+
+
+'''
+ResultStore queries over several parts and partitions against a brute force filter of
+the appended designs.
+'''
+
+PAIRS = [('LOX_RP1', 'LOX_LH2'), ('LOX_LCH4', 'LOX_LH2'), ('LOX_RP1', 'LOX_RP1')]
+
+
+@pytest.fixture(scope='module')
+def stored(tmp_path_factory):
+    store = ResultStore(str(tmp_path_factory.mktemp('store')))
+    X = np.arange(20, 80, 0.5)
+    batches = []
+    # two appends, each adds one part to every partition
+    for X_part in (X[::2], X[1::2]):
+        s1 = np.repeat([s1 for s1, _ in PAIRS], X_part.size)
+        s2 = np.repeat([s2 for _, s2 in PAIRS], X_part.size)
+        designs = design_pipeline.evaluate_designs(np.tile(X_part, len(PAIRS)), s1, s2)
+        store.append(designs)
+        batches.append(designs)
+    everything = {column: np.concatenate([designs[column] for designs in batches]) for column in ('X', 's1_prop_mix', 's2_prop_mix', 's1_L_D', 'total_mass')}
+    return store, everything
+
+
+def test_query_where_generator_filters_every_part(stored):
+    store, everything = stored
+    result = store.query(columns=['X', 's1_L_D'], s2_prop_mix='LOX_LH2', where=(w for w in [('s1_L_D', '<', 15)]))
+
+    expected = (everything['s2_prop_mix'] == 'LOX_LH2') & (everything['s1_L_D'] < 15)
+    assert 0 < expected.sum() < (everything['s2_prop_mix'] == 'LOX_LH2').sum()
+    assert np.all(result['s1_L_D'] < 15)
+    np.testing.assert_array_equal(np.sort(result['X']), np.sort(everything['X'][expected]))
+
+
+def test_query_mixture_columns(stored):
+    store, everything = stored
+    result = store.query(columns=['s1_prop_mix', 'X'], s1_prop_mix='LOX_RP1', where=[('X', '>=', 50)])
+    expected = (everything['s1_prop_mix'] == 'LOX_RP1') & (everything['X'] >= 50)
+    assert len(result['X']) == expected.sum()
+    assert set(result['s1_prop_mix']) == {'LOX_RP1'}
+
+
+def test_min_by_matches_brute_force(stored):
+    store, everything = stored
+    row = store.min_by('total_mass', s1_prop_mix='LOX_RP1', where=(w for w in [('s1_L_D', '<', 15)]))
+
+    candidates = (everything['s1_prop_mix'] == 'LOX_RP1') & (everything['s1_L_D'] < 15) & ~np.isnan(everything['total_mass'])
+    i = np.flatnonzero(candidates)[np.argmin(everything['total_mass'][candidates])]
+    assert row['total_mass'] == everything['total_mass'][i]
+    assert row['X'] == everything['X'][i]
+    assert (row['s1_prop_mix'], row['s2_prop_mix']) == (everything['s1_prop_mix'][i], everything['s2_prop_mix'][i])
+
+
+def test_min_by_without_match(stored):
+    store, _ = stored
+    assert store.min_by('total_mass', where=[('X', '>', 1000)]) is None
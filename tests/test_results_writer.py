@@ -0,0 +1,118 @@
+import csv
+import json
+
+import numpy as np
+import pytest
+
+import design_pipeline as dp
+import results_writer as rw
+
+
+'''
+results_writer.ResultsWriter: rows appended by several runs read back with their values,
+design keys and run ids, in CSV and JSONL, NaN written as empty / null, and appending to
+a CSV with a different header refused.
+'''
+
+COLUMNS = ['X', 's1_prop_mix', 's2_prop_mix', 'total_mass', 's1_engine_count', 'feasible']
+
+
+@pytest.fixture(scope='module')
+def designs():
+    # X = 5 is non-physical, its outputs are NaN
+    return dp.evaluate_designs(X=np.array([5.0, 44.0, 50.0]), s1_prop_mix='LOX_RP1', s2_prop_mix='LOX_LH2')
+
+
+def _write_twice(path, designs, **kwargs):
+    run_ids = []
+    for _ in range(2):
+        with rw.ResultsWriter(str(path), columns=COLUMNS, flush_every=2, **kwargs) as writer:
+            writer.write_batch(designs)
+            run_ids.append(writer.run_id)
+        assert writer.rows_written == 3
+    return run_ids
+
+
+def _check_rows(rows, designs, run_ids):
+    assert len(rows) == 6
+    assert [row['run_id'] for row in rows] == [run_ids[0]] * 3 + [run_ids[1]] * 3
+    # the same inputs give the same key in both runs
+    assert [row['design_key'] for row in rows[:3]] == [row['design_key'] for row in rows[3:]]
+    assert len(set(row['design_key'] for row in rows)) == 3
+
+    for i, row in enumerate(rows[:3]):
+        assert row['X'] == designs['X'][i]
+        assert row['s1_prop_mix'] == 'LOX_RP1'
+        assert row['feasible'] == bool(designs['feasible'][i])
+        if designs['feasible'][i]:
+            assert row['total_mass'] == designs['total_mass'][i]
+            assert row['s1_engine_count'] == designs['s1_engine_count'][i]
+        else:
+            assert row['total_mass'] is None
+
+
+def test_csv_round_trip(tmp_path, designs):
+    path = tmp_path / 'results.csv'
+    run_ids = _write_twice(path, designs)
+
+    with open(path, newline='') as file:
+        lines = list(csv.reader(file))
+    # one header for both runs
+    assert lines[0] == rw.KEY_COLUMNS + COLUMNS
+    assert rw.KEY_COLUMNS + COLUMNS not in lines[1:]
+
+    parse = {'X': float, 'total_mass': float, 's1_engine_count': float, 'feasible': lambda value: value == 'True'}
+    rows = [
+        {column: None if value == '' else parse.get(column, str)(value) for column, value in zip(lines[0], line)}
+        for line in lines[1:]
+    ]
+    _check_rows(rows, designs, run_ids)
+
+
+def test_jsonl_round_trip(tmp_path, designs):
+    path = tmp_path / 'results.jsonl'
+    run_ids = _write_twice(path, designs)
+
+    with open(path) as file:
+        rows = [json.loads(line) for line in file]
+    assert all(list(row) == rw.KEY_COLUMNS + COLUMNS for row in rows)
+    _check_rows(rows, designs, run_ids)
+
+
+def test_single_design_has_the_batch_key(tmp_path, designs):
+    path = tmp_path / 'results.jsonl'
+    with rw.ResultsWriter(str(path), columns=COLUMNS) as writer:
+        writer.write(dp.evaluate_design(44, 'LOX_RP1', 'LOX_LH2'))
+        writer.write_batch(designs)
+    with open(path) as file:
+        rows = [json.loads(line) for line in file]
+    assert rows[0]['design_key'] == rows[2]['design_key']
+    assert rows[0]['total_mass'] == rows[2]['total_mass']
+
+
+def test_rows_are_buffered(tmp_path, designs):
+    path = tmp_path / 'results.jsonl'
+    writer = rw.ResultsWriter(str(path), columns=COLUMNS, flush_every=4)
+    writer.write_batch(designs)
+    assert path.read_text() == ''
+    writer.close()
+    assert len(path.read_text().splitlines()) == 3
+
+
+def test_csv_with_other_header_is_refused(tmp_path, designs):
+    path = tmp_path / 'results.csv'
+    with rw.ResultsWriter(str(path), columns=COLUMNS) as writer:
+        writer.write_batch(designs)
+    contents = path.read_text()
+
+    with pytest.raises(ValueError):
+        rw.ResultsWriter(str(path), columns=COLUMNS[:-1])
+    with pytest.raises(ValueError):
+        rw.ResultsWriter(str(path))
+    assert path.read_text() == contents
+
+
+@pytest.mark.parametrize('path, flush_every', [('results.txt', 1000), ('results.csv', 0)])
+def test_invalid_arguments_are_refused(tmp_path, path, flush_every):
+    with pytest.raises(ValueError):
+        rw.ResultsWriter(str(tmp_path / path), flush_every=flush_every)
@@ -0,0 +1,70 @@
+import inspect
+
+import numpy as np
+import pytest
+
+import sweep
+
+
+'''
+The sweep paths (sweep_chunks, sweep_shared, sweep_checkpointed) give the same table
+whatever the chunk size and number of worker processes, warm started or not.
+'''
+
+X_VALUES = np.arange(1, 100, 0.5)
+MIXTURES = dict(s1_mixtures=['LOX_RP1', 'LOX_LCH4'], s2_mixtures=['LOX_LH2', 'Storables'])
+
+
+@pytest.fixture(scope='module', params=[False, True], ids=['cold', 'warm_start'])
+def reference(request):
+    warm_start = request.param
+    return warm_start, sweep.sweep(X_values=X_VALUES, warm_start=warm_start, **MIXTURES)
+
+
+def test_workers_match_single_process(reference):
+    warm_start, table = reference
+    assert sweep.sweep(X_values=X_VALUES, warm_start=warm_start, workers=2, **MIXTURES).equals(table)
+
+    # several tasks per worker, chunks smaller than a run of X
+    with sweep.sweep_shared(X_values=X_VALUES, warm_start=warm_start, chunk_size=50, workers=2, **MIXTURES) as shared:
+        for column in ('total_mass', 's1_engine_count', 's2_engine_count', 'thrust_evaluations'):
+            np.testing.assert_array_equal(shared.column(column), table[column].to_numpy())
+
+
+@pytest.mark.parametrize('chunk_size', [50, 300, 1000])
+def test_chunk_size_does_not_change_results(reference, chunk_size):
+    warm_start, table = reference
+    chunks = list(sweep.sweep_chunks(X_values=X_VALUES, warm_start=warm_start, chunk_size=chunk_size, **MIXTURES))
+    for column in ('total_mass', 's1_engine_count', 's2_engine_count', 'thrust_evaluations'):
+        np.testing.assert_array_equal(np.concatenate([chunk[column] for chunk in chunks]), table[column].to_numpy())
+
+
+def test_checkpointed_matches(reference, tmp_path):
+    warm_start, table = reference
+    assert sweep.sweep(X_values=X_VALUES, warm_start=warm_start, checkpoint_dir=str(tmp_path), **MIXTURES).equals(table)
+    # resumed from the finished checkpoint
+    assert sweep.sweep(X_values=X_VALUES, warm_start=warm_start, checkpoint_dir=str(tmp_path), **MIXTURES).equals(table)
+
+
+def test_warm_start_pays_off_on_dense_grids():
+    X_values = np.arange(30, 60, 0.01)
+    cold = list(sweep.sweep_chunks(X_values=X_values, **MIXTURES))
+    warm = list(sweep.sweep_chunks(X_values=X_values, warm_start=True, **MIXTURES))
+    cold_evaluations = sum(chunk['thrust_evaluations'].sum() for chunk in cold)
+    warm_evaluations = sum(chunk['thrust_evaluations'].sum() for chunk in warm)
+    assert warm_evaluations < 0.7 * cold_evaluations
+
+    # same designs to the thrust iteration tolerance
+    cold_mass = np.concatenate([chunk['total_mass'] for chunk in cold])
+    warm_mass = np.concatenate([chunk['total_mass'] for chunk in warm])
+    np.testing.assert_allclose(warm_mass, cold_mass, rtol=1e-3)
+
+
+def test_entry_points_share_the_chunk_size():
+    for function in (sweep.sweep, sweep.sweep_chunks, sweep.sweep_shared, sweep.sweep_checkpointed, sweep.sweep_to_writer):
+        assert inspect.signature(function).parameters['chunk_size'].default == sweep.CHUNK_SIZE
+
+
+def test_sweep_chunk_size_reaches_the_workers(reference):
+    warm_start, table = reference
+    assert sweep.sweep(X_values=X_VALUES, warm_start=warm_start, workers=2, chunk_size=100, **MIXTURES).equals(table)
@@ -0,0 +1,154 @@
+import numpy as np
+import pytest
+
+import design_pipeline
+import Mass_functions as Mfunc
+import thrust_convergance as tc
+
+from dictionaries import mixture_names
+
+
+'''
+The thrust solvers: evaluation counts of the single design and batched paths, in the
+same unit (thrust_mass_calculations calls) for every method, and the enumerate solution
+against the thrust requirement and the fixed point iteration.
+'''
+
+DESIGNS = [(44, 'LOX_RP1', 'LOX_LH2'), (50, 'LOX_LCH4', 'LOX_LCH4'), (52, 'Storables', 'LOX_RP1')]
+
+
+def sized_inputs(X, s1_prop_mix, s2_prop_mix):
+    sized = design_pipeline.size_design(X, s1_prop_mix, s2_prop_mix)
+    return (sized['m_0'], sized['m_0_2'], sized['m_pr_1'], sized['m_pr_2'], 26000,
+            sized['stage_1_other_masses'], sized['stage_2_other_masses'], s1_prop_mix, s2_prop_mix)
+
+
+@pytest.mark.parametrize('method', ['fixed_point', 'enumerate'])
+@pytest.mark.parametrize('design', DESIGNS)
+def test_scalar_and_batch_count_the_same_evaluations(design, method):
+    inputs = sized_inputs(*design)
+    t_req1, t_req2, info = tc.thrust_convergance(*inputs, method=method, full_output=True)
+    batch_t_req1, batch_t_req2, iterations, converged = tc.thrust_convergance_batch(*inputs, method=method)
+
+    assert info['converged'] and converged
+    assert info['evaluations'] == iterations
+    np.testing.assert_allclose([t_req1, t_req2], [batch_t_req1, batch_t_req2], rtol=1e-12)
+
+
+def test_enumerate_counts_equivalent_calls():
+    # two Newton steps, one per stage, make one thrust_mass_calculations call
+    assert tc._equivalent_evaluations(np.array([0, 1, 2, 7, 8])).tolist() == [0, 1, 1, 4, 4]
+
+
+@pytest.fixture(scope='module')
+def grid():
+    # sized designs of every mixture pair, X = 1..99 % in 0.25 % steps
+    X = np.arange(1, 100, 0.25)
+    columns = ('m_0', 'm_0_2', 'm_pr_1', 'm_pr_2', 'stage_1_other_masses', 'stage_2_other_masses')
+    inputs = {column: [] for column in columns + ('s1_prop_mix', 's2_prop_mix')}
+    for s1 in mixture_names:
+        for s2 in mixture_names:
+            sized = design_pipeline.size_design(X, s1, s2)
+            for column in columns:
+                inputs[column].append(sized[column])
+            inputs['s1_prop_mix'].append(np.full(X.size, s1))
+            inputs['s2_prop_mix'].append(np.full(X.size, s2))
+    inputs = {column: np.concatenate(values) for column, values in inputs.items()}
+    inputs['m_pl'] = np.full(inputs['m_0'].size, 26000.0)
+    inputs['s1_codes'] = tc.to_mixture_codes(inputs['s1_prop_mix'])
+    inputs['s2_codes'] = tc.to_mixture_codes(inputs['s2_prop_mix'])
+
+    solutions = {}
+    for method in ('fixed_point', 'enumerate'):
+        t_req1, t_req2, _, converged = tc.thrust_convergance_batch(
+            inputs['m_0'], inputs['m_0_2'], inputs['m_pr_1'], inputs['m_pr_2'], inputs['m_pl'],
+            inputs['stage_1_other_masses'], inputs['stage_2_other_masses'], inputs['s1_codes'], inputs['s2_codes'],
+            method=method,
+        )
+        s1_m_0, s2_m_0, _ = tc.thrust_mass_calculations_batch(
+            inputs['m_pr_1'], inputs['m_pr_2'], inputs['m_pl'], inputs['stage_1_other_masses'],
+            inputs['stage_2_other_masses'], t_req1, t_req2, inputs['s1_codes'], inputs['s2_codes'],
+        )
+        s1_engine_count, s2_engine_count = tc.engine_counts_batch(t_req1, t_req2, inputs['s1_codes'], inputs['s2_codes'])
+        solutions[method] = {
+            's1_thrust'         : t_req1,
+            's2_thrust'         : t_req2,
+            's1_m_0'            : s1_m_0,
+            's2_m_0'            : s2_m_0,
+            's1_engine_count'   : s1_engine_count,
+            's2_engine_count'   : s2_engine_count,
+            'converged'         : converged,
+        }
+    return inputs, solutions
+
+
+def test_enumerate_solves_every_feasible_design(grid):
+    inputs, solutions = grid
+    feasible = np.isfinite(inputs['m_0'])
+    assert feasible.sum() > 1000
+    np.testing.assert_array_equal(solutions['enumerate']['converged'], feasible)
+    np.testing.assert_array_equal(solutions['fixed_point']['converged'], feasible)
+
+
+def test_enumerate_is_self_consistent(grid):
+    _, solutions = grid
+    solution = solutions['enumerate']
+    solved = solution['converged']
+    # thrust_mass_calculations at the solution, with its own engine counts (ceil), gives the same thrust back
+    np.testing.assert_allclose(solution['s1_thrust'][solved], tc.T_W_req_stage_1 * tc.g_0 * 1.3 * solution['s1_m_0'][solved], rtol=1e-12)
+    np.testing.assert_allclose(solution['s2_thrust'][solved], tc.T_W_req_stage_2 * tc.g_0 * 1.3 * solution['s2_m_0'][solved], rtol=1e-12)
+
+
+def _forced_count_thrust(engine_count, constant_mass, mixture, engine_thrust, expansion_ratio, chamber_pressure, thrust_factor):
+    # thrust requirement of a stage with engine_count engines whatever the thrust, by substitution
+    thrust = thrust_factor * constant_mass
+    for _ in range(200):
+        thrust = thrust_factor * (
+            constant_mass
+            + engine_count * Mfunc.Rocket_Engine(thrust / engine_count, mixture, expansion_ratio)
+            + Mfunc.Struct_Mass(thrust)
+            + Mfunc.M_gimbals(thrust, mixture, chamber_pressure)
+        )
+    return thrust
+
+
+def test_enumerate_takes_the_smallest_engine_count(grid):
+    inputs, solutions = grid
+    solution = solutions['enumerate']
+    checked = 0
+    for i in np.flatnonzero(solution['converged'])[::5]:
+        s1, s2 = inputs['s1_prop_mix'][i], inputs['s2_prop_mix'][i]
+        stages = [
+            (solution['s2_engine_count'][i], inputs['m_pr_2'][i] + inputs['stage_2_other_masses'][i] + inputs['m_pl'][i],
+             s2, tc.Thrust_stage2[s2], tc.Expansion_ratio_stage2, tc.Chamber_pressure_stage2, tc.T_W_req_stage_2 * tc.g_0 * 1.3),
+            (solution['s1_engine_count'][i], inputs['m_pr_1'][i] + inputs['stage_1_other_masses'][i] + solution['s2_m_0'][i],
+             s1, tc.Thrust_stage1[s1], tc.Expansion_ratio_stage1, tc.Chamber_pressure_stage1, tc.T_W_req_stage_1 * tc.g_0 * 1.3),
+        ]
+        for engine_count, constant_mass, mixture, engine_thrust, expansion_ratio, chamber_pressure, thrust_factor in stages:
+            if engine_count == 1:
+                continue
+            # with one engine less the stage needs more thrust than those engines give
+            fewer = engine_count - 1
+            thrust = _forced_count_thrust(fewer, constant_mass, mixture, engine_thrust, expansion_ratio, chamber_pressure, thrust_factor)
+            assert thrust > fewer * engine_thrust
+            checked += 1
+    assert checked > 100
+
+
+def test_enumerate_matches_fixed_point_within_tolerance(grid):
+    _, solutions = grid
+    fixed_point, enumerate_ = solutions['fixed_point'], solutions['enumerate']
+    solved = enumerate_['converged']
+
+    engine_counts_differ = np.zeros(solved.sum(), dtype=bool)
+    for column in ('s1_engine_count', 's2_engine_count'):
+        difference = enumerate_[column][solved] - fixed_point[column][solved]
+        # the fixed point iteration can stop within tolerance on the other side of an engine count boundary
+        assert np.all(np.abs(difference) <= 1)
+        engine_counts_differ |= difference != 0
+    assert engine_counts_differ.mean() < 0.02
+
+    same = np.flatnonzero(solved)[~engine_counts_differ]
+    for column in ('s1_thrust', 's2_thrust'):
+        np.testing.assert_allclose(enumerate_[column][same], fixed_point[column][same], rtol=1e-3)
+    np.testing.assert_allclose(enumerate_['s1_m_0'][solved], fixed_point['s1_m_0'][solved], rtol=1e-3)
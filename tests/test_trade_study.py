@@ -0,0 +1,57 @@
+import numpy as np
+import pytest
+
+import sweep
+import trade_study as ts
+
+from design_pipeline import INPUT_COLUMNS, OUTPUT_COLUMNS, STATUS_COLUMNS
+
+
+'''
+trade_study.branch_and_bound: the best design and its objective equal those of a full
+sweep of the grid, the pair bounds are below every design of their pair, and pruning
+skips pairs.
+'''
+
+GRID = dict(X_values=np.arange(1, 100, 0.5), stage_1_radii=[2.6 * 2, 2.6 * 3], stage_2_radii=[2.6, 3.9])
+
+
+@pytest.fixture(scope='module')
+def full_sweep():
+    chunks = list(sweep.sweep_chunks(feasible_only=True, **GRID))
+    designs = {column: np.concatenate([chunk[column] for chunk in chunks]) for column in INPUT_COLUMNS + OUTPUT_COLUMNS + STATUS_COLUMNS}
+    feasible = designs['feasible']
+    return {column: values[feasible] for column, values in designs.items()}
+
+
+@pytest.mark.parametrize('objective', ts.OBJECTIVES)
+def test_best_matches_full_sweep(full_sweep, objective):
+    result = ts.branch_and_bound(objective=objective, **GRID)
+
+    i = int(np.argmin(full_sweep[objective]))
+    assert result.best[objective] == full_sweep[objective][i]
+    for column in ('s1_prop_mix', 's2_prop_mix', 'X', 'stage_1_radius', 'stage_2_radius'):
+        assert result.best[column] == full_sweep[column][i]
+
+    assert sorted(result.evaluated + result.pruned) == sorted(result.bounds)
+    assert result.evaluations < len(full_sweep['X']) or not result.pruned
+
+
+@pytest.mark.parametrize('objective', ts.OBJECTIVES)
+def test_bounds_are_below_every_design(full_sweep, objective):
+    result = ts.branch_and_bound(objective=objective, **GRID)
+    for (s1_prop_mix, s2_prop_mix), bound in result.bounds.items():
+        pair = (full_sweep['s1_prop_mix'] == s1_prop_mix) & (full_sweep['s2_prop_mix'] == s2_prop_mix)
+        if pair.any():
+            assert bound <= full_sweep[objective][pair].min()
+
+
+def test_mass_study_prunes():
+    result = ts.branch_and_bound(**GRID)
+    assert result.pruned
+    assert result.evaluated[0] == (result.best['s1_prop_mix'], result.best['s2_prop_mix'])
+
+
+def test_unknown_objective_is_refused():
+    with pytest.raises(ValueError):
+        ts.pair_lower_bound(np.array([44.0]), 'LOX_RP1', 'LOX_LH2', objective='s1_L_D')
@@ -1,5 +1,6 @@
-from typing import Tuple, Dict
+from typing import Dict, Optional, Tuple
 import math
+import numpy as np
 
 import Mass_functions as Mfunc
 
@@ -11,6 +12,7 @@ from dictionaries import(
      Chamber_pressure_stage1,
      Chamber_pressure_stage2
 )
+from property_tables import stage_1_properties, stage_2_properties, to_mixture_codes
 
 
 # Initial thrust to weight ratio of >= 1.3 for stage 1
@@ -25,6 +27,14 @@ g_0 = 9.81
 T_W_req_stage_1 = 1.3
 T_W_req_stage_2 = 0.76
 
+# Per-mixture values as arrays indexed by mixture code, used by the batched functions
+_Thrust_stage1 = stage_1_properties['thrust']
+_Thrust_stage2 = stage_2_properties['thrust']
+_Expansion_ratio_stage1 = stage_1_properties['expansion_ratio']
+_Expansion_ratio_stage2 = stage_2_properties['expansion_ratio']
+_Chamber_pressure_stage1 = stage_1_properties['chamber_pressure']
+_Chamber_pressure_stage2 = stage_2_properties['chamber_pressure']
+
 
 """
 Process:
@@ -50,7 +60,13 @@ def thrust_convergance(
         stage_2_other_masses    : float,
         stage_1_mixture         : str,
         stage_2_mixture         : str,
-    )-> Tuple[float, float]:
+        verbose                 : bool = False,
+        method                  : str = 'fixed_point',
+        tolerance               : float = 1e-3,
+        max_iterations          : int = 1000,
+        full_output             : bool = False,
+        initial_thrust          : Optional[Tuple[float, float]] = None,
+    ):
     """
     Inputs:
         stage_1_gross_mass    (float): gross mass calculation from part 1,
@@ -62,73 +78,144 @@ def thrust_convergance(
         stage_2_other_masses  (float): masses calculated in this section,
         stage_1_mixture       (str)  : name of mixture
         stage_2_mixture       (str)  : name of mixture
+        verbose               (bool) : print engine counts, thrust and T/W once converged
+        method                (str)  : 'fixed_point' (successive substitution) or
+                                       'enumerate' (exact, see thrust_enumeration_batch; the
+                                       gross masses, tolerance and initial thrust are not used)
+        tolerance             (float): relative change in thrust required to stop iterating
+        max_iterations        (int)  : maximum number of calls to thrust_mass_calculations
+        full_output           (bool) : also return a dictionary describing the solve
+        initial_thrust        (tuple): (stage 1, stage 2) thrust to start from, e.g. the converged
+                                       thrust of a neighbouring design (warm start). If the warm
+                                       start does not converge the solve is repeated from the
+                                       default initial thrust. None starts from the part 1 gross masses.
 
     Outputs:
         stage_1_thrust_req (float): the required thrust for stage 1
         stage_2_thrust_req (float): the required thrust for stage 2
+        info               (dict) : only if full_output, with keys
+            'method'        (str)  : solver used
+            'evaluations'   (int)  : calls to thrust_mass_calculations, for 'enumerate' the equivalent
+                                     number of calls (see thrust_enumeration_batch)
+            'converged'     (bool) : tolerance was met before max_iterations
+            'warm_start'    (bool) : the solution came from initial_thrust
 
     This function calculates the thrust required, finds mass of components required to meet the thrust,
     updates the new thrust required based off updated mass and iterates until we converge upon a required thrust
     """
+    if method not in ('fixed_point', 'enumerate'):
+        raise ValueError(f'Unknown thrust solver method {method}, use fixed_point or enumerate')
 
-    # Initial values
-    # find thrust required
-    stage_1_thrust_req = T_W_req_stage_1 * g_0 * stage_1_gross_mass * 1.3
-    stage_2_thrust_req = T_W_req_stage_2 * g_0 * stage_2_gross_mass * 1.3
-
-    tolerance = 1e-3
-    thrust_dif_1 = 100
-    thrust_dif_2 = thrust_dif_1
-
-    iterations = 0
-
-    # iterate to find convergence
-    while iterations < 1000:
-        # store/update previous values
-        stage_1_thrust_req_0 = stage_1_thrust_req
-        stage_2_thrust_req_0 = stage_2_thrust_req
-
-        # obtain new gross masses
+    def thrust_update(stage_1_thrust_req, stage_2_thrust_req):
+        # one evaluation of the fixed point map: thrust -> gross masses -> thrust
         stage_1_gross_mass, stage_2_gross_mass, _ = thrust_mass_calculations(
             m_pr_1,
             m_pr_2,
             m_pl,
             stage_1_other_masses,
             stage_2_other_masses,
-            stage_1_thrust_req, 
+            stage_1_thrust_req,
             stage_2_thrust_req,
             stage_1_mixture,
             stage_2_mixture,
         )
+        return (
+            T_W_req_stage_1 * g_0 * stage_1_gross_mass * 1.3,
+            T_W_req_stage_2 * g_0 * stage_2_gross_mass * 1.3,
+            stage_1_gross_mass,
+            stage_2_gross_mass,
+        )
 
-        # use new gross masses to calculate new thrust required
-        stage_1_thrust_req = T_W_req_stage_1 * g_0 * stage_1_gross_mass * 1.3
-        stage_2_thrust_req = T_W_req_stage_2 * g_0 * stage_2_gross_mass * 1.3
-
-        # check the difference between previous thrust required and new thrust required
-        thrust_dif_1 = abs(stage_1_thrust_req - stage_1_thrust_req_0) / stage_1_thrust_req_0
-        thrust_dif_2 = abs(stage_2_thrust_req - stage_2_thrust_req_0) / stage_2_thrust_req_0
-        # dividing by previous thrust req so we are considering percent change bc of large numbers
-
-        # if within tolerance break, we found the required thrust
-        if thrust_dif_1 < tolerance and thrust_dif_2 < tolerance:
-            # Print final engine counts after convergence
-            stage_1_engine_count = math.ceil(stage_1_thrust_req / Thrust_stage1[stage_1_mixture])
-            stage_2_engine_count = math.ceil(stage_2_thrust_req / Thrust_stage2[stage_2_mixture])
-            print(f'Stage 1 engine count: {stage_1_engine_count}')
-            print(f'Stage 2 engine count: {stage_2_engine_count}')
-            print('----------------------------------------')
-            print(f'Stage 1 thrust: {stage_1_thrust_req/1000:.3f} (Kilo-Newtons)')
-            print(f'Stage 2 thrust: {stage_2_thrust_req/1000:.3f} (Kilo-Newtons)')
-            print(f'Stage 1 thrust weight ratio: {stage_1_thrust_req/(stage_1_gross_mass*9.81):.3f} ')
-            print(f'Stage 2 thrust weight ratio: {stage_2_thrust_req/(stage_2_gross_mass*9.81):.3f} ')
-            break
-
-        iterations += 1
+    def solve(stage_1_thrust_req, stage_2_thrust_req):
+        iterations = 0
+        converged = False
+
+        # iterate to find convergence
+        while iterations < max_iterations:
+            # store/update previous values
+            stage_1_thrust_req_0 = stage_1_thrust_req
+            stage_2_thrust_req_0 = stage_2_thrust_req
 
+            # obtain new gross masses, use new gross masses to calculate new thrust required
+            stage_1_thrust_req, stage_2_thrust_req, stage_1_gross_mass, stage_2_gross_mass = thrust_update(
+                stage_1_thrust_req,
+                stage_2_thrust_req,
+            )
+            iterations += 1
+
+            # check the difference between previous thrust required and new thrust required
+            thrust_dif_1 = abs(stage_1_thrust_req - stage_1_thrust_req_0) / stage_1_thrust_req_0
+            thrust_dif_2 = abs(stage_2_thrust_req - stage_2_thrust_req_0) / stage_2_thrust_req_0
+            # dividing by previous thrust req so we are considering percent change bc of large numbers
+
+            # if within tolerance break, we found the required thrust
+            if thrust_dif_1 < tolerance and thrust_dif_2 < tolerance:
+                converged = True
+                break
+
+        return stage_1_thrust_req, stage_2_thrust_req, stage_1_gross_mass, stage_2_gross_mass, iterations, converged
+
+    # Initial values
+    # find thrust required
+    initial_thrust_1 = T_W_req_stage_1 * g_0 * stage_1_gross_mass * 1.3
+    initial_thrust_2 = T_W_req_stage_2 * g_0 * stage_2_gross_mass * 1.3
+
+    warm_start = method != 'enumerate' and initial_thrust is not None and all(math.isfinite(t) and t > 0 for t in initial_thrust)
+    evaluations = 0
+    if method == 'enumerate':
+        stage_2_thrust_req, stage_2_gross_mass, stage_2_iterations, stage_2_converged = _stage_engine_enumeration_scalar(
+            m_pr_2 + stage_2_other_masses + m_pl,
+            Thrust_stage2[stage_2_mixture],
+            Expansion_ratio_stage2[stage_2_mixture],
+            Chamber_pressure_stage2[stage_2_mixture],
+            T_W_req_stage_2 * g_0 * 1.3,
+        )
+        stage_1_thrust_req, stage_1_gross_mass, stage_1_iterations, stage_1_converged = _stage_engine_enumeration_scalar(
+            m_pr_1 + stage_1_other_masses + stage_2_gross_mass,
+            Thrust_stage1[stage_1_mixture],
+            Expansion_ratio_stage1[stage_1_mixture],
+            Chamber_pressure_stage1[stage_1_mixture],
+            T_W_req_stage_1 * g_0 * 1.3,
+        )
+        evaluations = _equivalent_evaluations(stage_1_iterations + stage_2_iterations)
+        converged = stage_1_converged and stage_2_converged
+
+    elif warm_start:
+        stage_1_thrust_req, stage_2_thrust_req, stage_1_gross_mass, stage_2_gross_mass, evaluations, converged = solve(*initial_thrust)
+        warm_start = converged
+
+    if method != 'enumerate' and not warm_start:
+        # cold start, or the warm start did not converge
+        stage_1_thrust_req, stage_2_thrust_req, stage_1_gross_mass, stage_2_gross_mass, cold_evaluations, converged = solve(
+            initial_thrust_1,
+            initial_thrust_2,
+        )
+        evaluations += cold_evaluations
+
+    # Print final engine counts after convergence
+    if converged and verbose:
+        stage_1_engine_count = math.ceil(stage_1_thrust_req / Thrust_stage1[stage_1_mixture])
+        stage_2_engine_count = math.ceil(stage_2_thrust_req / Thrust_stage2[stage_2_mixture])
+        print(f'Stage 1 engine count: {stage_1_engine_count}')
+        print(f'Stage 2 engine count: {stage_2_engine_count}')
+        print('----------------------------------------')
+        print(f'Stage 1 thrust: {stage_1_thrust_req/1000:.3f} (Kilo-Newtons)')
+        print(f'Stage 2 thrust: {stage_2_thrust_req/1000:.3f} (Kilo-Newtons)')
+        print(f'Stage 1 thrust weight ratio: {stage_1_thrust_req/(stage_1_gross_mass*9.81):.3f} ')
+        print(f'Stage 2 thrust weight ratio: {stage_2_thrust_req/(stage_2_gross_mass*9.81):.3f} ')
+
+    if full_output:
+        info = {
+            'method'        : method,
+            'evaluations'   : evaluations,
+            'converged'     : converged,
+            'warm_start'    : warm_start,
+        }
+        return stage_1_thrust_req, stage_2_thrust_req, info
 
     return stage_1_thrust_req, stage_2_thrust_req
 
+
 def thrust_mass_calculations(
         m_pr_1                  : float,
         m_pr_2                  : float,
@@ -188,4 +275,556 @@ def thrust_mass_calculations(
 
     X = [stage_1_total_engine_mass, stage_2_total_engine_mass, stage_1_thrust_struct_mass, stage_2_thrust_struct_mass, stage_1_gimbal_mass, stage_2_gimbal_mass]
 
-    return stage_1_total_mass, stage_2_total_mass, X
\ No newline at end of file
+    return stage_1_total_mass, stage_2_total_mass, X
+
+
+def engine_counts_batch(
+        stage_1_thrust_req      : np.ndarray,
+        stage_2_thrust_req      : np.ndarray,
+        stage_1_mixture         : np.ndarray,
+        stage_2_mixture         : np.ndarray,
+        )-> Tuple[np.ndarray, np.ndarray]:
+    """
+    Inputs:
+        stage_1_thrust_req  (np.ndarray): thrust for stage 1
+        stage_2_thrust_req  (np.ndarray): thrust for stage 2
+        stage_1_mixture     (np.ndarray): stage 1 integer mixture codes
+        stage_2_mixture     (np.ndarray): stage 2 integer mixture codes
+
+    Outputs:
+        stage_1_engine_count (np.ndarray): number of stage 1 engines (float, NaN for NaN thrust)
+        stage_2_engine_count (np.ndarray): number of stage 2 engines (float, NaN for NaN thrust)
+    """
+    stage_1_engine_count = np.ceil(stage_1_thrust_req / _Thrust_stage1[stage_1_mixture])
+    stage_2_engine_count = np.ceil(stage_2_thrust_req / _Thrust_stage2[stage_2_mixture])
+
+    return stage_1_engine_count, stage_2_engine_count
+
+
+def thrust_mass_calculations_batch(
+        m_pr_1                  : np.ndarray,
+        m_pr_2                  : np.ndarray,
+        m_pl                    : np.ndarray,
+        stage_1_other_masses    : np.ndarray,
+        stage_2_other_masses    : np.ndarray,
+        stage_1_thrust_req      : np.ndarray,
+        stage_2_thrust_req      : np.ndarray,
+        stage_1_mixture         : np.ndarray,
+        stage_2_mixture         : np.ndarray,
+        coefficients            : Optional[Dict] = None,
+        )-> Tuple[np.ndarray, np.ndarray, list[np.ndarray]]:
+    """
+    Array version of thrust_mass_calculations, every input broadcasts against the others.
+
+    Inputs:
+        same as thrust_mass_calculations, but stage_1_mixture / stage_2_mixture
+        are arrays of integer mixture codes (see to_mixture_codes)
+        coefficients    (Dict) : MER coefficient overrides, see Mass_functions.MER_COEFFICIENTS
+
+    Outputs:
+        stage_1_total_mass      (np.ndarray)       : total mass of stage 1
+        stage_2_total_mass      (np.ndarray)       : total mass of stage 2
+        X                       list(np.ndarray)   : list of masses from each component
+    """
+    # find number of engines required
+    stage_1_engine_count, stage_2_engine_count = engine_counts_batch(
+        stage_1_thrust_req,
+        stage_2_thrust_req,
+        stage_1_mixture,
+        stage_2_mixture,
+    )
+
+    # find thrust per engine
+    stage_1_tpe = stage_1_thrust_req / stage_1_engine_count
+    stage_2_tpe = stage_2_thrust_req / stage_2_engine_count
+
+    # find total engine mass, the code arrays index the per-mixture arrays
+    engine_kwargs = Mfunc.mer_kwargs(coefficients, 'Rocket_Engine')
+    stage_1_total_engine_mass = stage_1_engine_count * Mfunc.Rocket_Engine(stage_1_tpe, stage_1_mixture, _Expansion_ratio_stage1, **engine_kwargs)
+    stage_2_total_engine_mass = stage_2_engine_count * Mfunc.Rocket_Engine(stage_2_tpe, stage_2_mixture, _Expansion_ratio_stage2, **engine_kwargs)
+
+    # find thrust structure mass
+    struct_kwargs = Mfunc.mer_kwargs(coefficients, 'Struct_Mass')
+    stage_1_thrust_struct_mass = Mfunc.Struct_Mass(stage_1_thrust_req, **struct_kwargs)
+    stage_2_thrust_struct_mass = Mfunc.Struct_Mass(stage_2_thrust_req, **struct_kwargs)
+
+    # find gimbal mass
+    gimbal_kwargs = Mfunc.mer_kwargs(coefficients, 'M_gimbals')
+    stage_1_gimbal_mass = Mfunc.M_gimbals(stage_1_thrust_req, stage_1_mixture, _Chamber_pressure_stage1, **gimbal_kwargs)
+    stage_2_gimbal_mass = Mfunc.M_gimbals(stage_2_thrust_req, stage_2_mixture, _Chamber_pressure_stage2, **gimbal_kwargs)
+
+    # recalculate total mass of stage 1 and stage 2
+    stage_2_total_mass = m_pr_2 + stage_2_other_masses + stage_2_total_engine_mass + stage_2_gimbal_mass + stage_2_thrust_struct_mass + m_pl
+    stage_1_total_mass = m_pr_1 + stage_1_other_masses + stage_1_total_engine_mass + stage_1_gimbal_mass + stage_1_thrust_struct_mass + stage_2_total_mass
+
+    X = [stage_1_total_engine_mass, stage_2_total_engine_mass, stage_1_thrust_struct_mass, stage_2_thrust_struct_mass, stage_1_gimbal_mass, stage_2_gimbal_mass]
+
+    return stage_1_total_mass, stage_2_total_mass, X
+
+
+def thrust_convergance_batch(
+        stage_1_gross_mass      : np.ndarray,
+        stage_2_gross_mass      : np.ndarray,
+        m_pr_1                  : np.ndarray,
+        m_pr_2                  : np.ndarray,
+        m_pl                    : np.ndarray,
+        stage_1_other_masses    : np.ndarray,
+        stage_2_other_masses    : np.ndarray,
+        stage_1_mixture,
+        stage_2_mixture,
+        tolerance               : float = 1e-3,
+        max_iterations          : int = 1000,
+        coefficients            : Optional[Dict] = None,
+        initial_thrust_1        : Optional[np.ndarray] = None,
+        initial_thrust_2        : Optional[np.ndarray] = None,
+        method                  : str = 'fixed_point',
+    )-> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Inputs:
+        same as thrust_convergance, but every input can be an array of designs.
+        stage_1_mixture / stage_2_mixture are mixture names or integer mixture codes.
+        tolerance       (float): relative change in thrust required to call a design converged
+        max_iterations  (int)  : maximum number of iterations
+        coefficients    (Dict) : MER coefficient overrides, scalars or arrays with one entry per design
+        initial_thrust_1, initial_thrust_2 (np.ndarray): warm start thrusts, e.g. the converged thrust
+                                 of neighbouring designs. NaN entries start cold, warm started
+                                 designs that do not converge are solved again from a cold start.
+        method          (str)  : 'fixed_point', or 'enumerate' for the exact solution of
+                                 thrust_enumeration_batch (gross masses and warm start unused)
+
+    Outputs:
+        stage_1_thrust_req (np.ndarray)      : the required thrust for stage 1
+        stage_2_thrust_req (np.ndarray)      : the required thrust for stage 2
+        iterations         (np.ndarray[int]) : calls to thrust_mass_calculations used by each design,
+                                               including a failed warm start (equivalent calls for 'enumerate')
+        converged          (np.ndarray[bool]): True where the design met the tolerance
+
+    Same fixed-point iteration as thrust_convergance, run for all designs at once.
+    Designs that have converged are frozen under a mask and are no longer evaluated.
+    Designs with non-finite inputs (e.g. non-physical dV splits) are never iterated
+    and are returned with converged = False.
+    """
+    if method == 'enumerate':
+        return thrust_enumeration_batch(
+            m_pr_1,
+            m_pr_2,
+            m_pl,
+            stage_1_other_masses,
+            stage_2_other_masses,
+            stage_1_mixture,
+            stage_2_mixture,
+            coefficients=coefficients,
+        )
+    if method != 'fixed_point':
+        raise ValueError(f'Unknown thrust solver method {method}, use fixed_point or enumerate')
+
+    stage_1_mixture = to_mixture_codes(stage_1_mixture)
+    stage_2_mixture = to_mixture_codes(stage_2_mixture)
+
+    inputs = np.broadcast_arrays(
+        np.asarray(stage_1_gross_mass, dtype=float),
+        np.asarray(stage_2_gross_mass, dtype=float),
+        np.asarray(m_pr_1, dtype=float),
+        np.asarray(m_pr_2, dtype=float),
+        np.asarray(m_pl, dtype=float),
+        np.asarray(stage_1_other_masses, dtype=float),
+        np.asarray(stage_2_other_masses, dtype=float),
+        stage_1_mixture,
+        stage_2_mixture,
+    )
+    shape = inputs[0].shape
+    (stage_1_gross_mass, stage_2_gross_mass, m_pr_1, m_pr_2, m_pl,
+     stage_1_other_masses, stage_2_other_masses, stage_1_mixture, stage_2_mixture) = [x.ravel() for x in inputs]
+    cold_gross_mass_1, cold_gross_mass_2 = stage_1_gross_mass, stage_2_gross_mass
+
+    # Initial values
+    stage_1_thrust_req = T_W_req_stage_1 * g_0 * stage_1_gross_mass * 1.3
+    stage_2_thrust_req = T_W_req_stage_2 * g_0 * stage_2_gross_mass * 1.3
+
+    # warm start where both initial thrusts are usable
+    warm = np.zeros(stage_1_thrust_req.shape, dtype=bool)
+    if initial_thrust_1 is not None and initial_thrust_2 is not None:
+        initial_1 = np.broadcast_to(np.asarray(initial_thrust_1, dtype=float), shape).ravel()
+        initial_2 = np.broadcast_to(np.asarray(initial_thrust_2, dtype=float), shape).ravel()
+        with np.errstate(invalid='ignore'):
+            warm = np.isfinite(initial_1) & np.isfinite(initial_2) & (initial_1 > 0) & (initial_2 > 0)
+        stage_1_thrust_req = np.where(warm, initial_1, stage_1_thrust_req)
+        stage_2_thrust_req = np.where(warm, initial_2, stage_2_thrust_req)
+
+    iterations = np.zeros(stage_1_thrust_req.shape, dtype=int)
+    converged = np.zeros(stage_1_thrust_req.shape, dtype=bool)
+
+    finite = np.ones(stage_1_thrust_req.shape, dtype=bool)
+    for x in (stage_1_thrust_req, stage_2_thrust_req, m_pr_1, m_pr_2, m_pl, stage_1_other_masses, stage_2_other_masses):
+        finite &= np.isfinite(x)
+
+    # indices of the designs still iterating
+    active = np.flatnonzero(finite)
+
+    while active.size and iterations[active[0]] < max_iterations:
+        stage_1_thrust_req_0 = stage_1_thrust_req[active]
+        stage_2_thrust_req_0 = stage_2_thrust_req[active]
+
+        # obtain new gross masses
+        stage_1_gross_mass, stage_2_gross_mass, _ = thrust_mass_calculations_batch(
+            m_pr_1[active],
+            m_pr_2[active],
+            m_pl[active],
+            stage_1_other_masses[active],
+            stage_2_other_masses[active],
+            stage_1_thrust_req_0,
+            stage_2_thrust_req_0,
+            stage_1_mixture[active],
+            stage_2_mixture[active],
+            coefficients=Mfunc.take_coefficients(coefficients, active, stage_1_mixture.size),
+        )
+        iterations[active] += 1
+
+        # use new gross masses to calculate new thrust required
+        stage_1_thrust_req[active] = T_W_req_stage_1 * g_0 * stage_1_gross_mass * 1.3
+        stage_2_thrust_req[active] = T_W_req_stage_2 * g_0 * stage_2_gross_mass * 1.3
+
+        # relative change since the previous iteration
+        thrust_dif_1 = np.abs(stage_1_thrust_req[active] - stage_1_thrust_req_0) / stage_1_thrust_req_0
+        thrust_dif_2 = np.abs(stage_2_thrust_req[active] - stage_2_thrust_req_0) / stage_2_thrust_req_0
+
+        # freeze the designs within tolerance
+        done = (thrust_dif_1 < tolerance) & (thrust_dif_2 < tolerance)
+        converged[active[done]] = True
+        active = active[~done]
+
+    # warm starts that did not converge are solved again from the cold start
+    retry = np.flatnonzero(warm & finite & ~converged)
+    if retry.size:
+        stage_1_thrust_req[retry], stage_2_thrust_req[retry], retry_iterations, converged[retry] = thrust_convergance_batch(
+            cold_gross_mass_1[retry],
+            cold_gross_mass_2[retry],
+            m_pr_1[retry],
+            m_pr_2[retry],
+            m_pl[retry],
+            stage_1_other_masses[retry],
+            stage_2_other_masses[retry],
+            stage_1_mixture[retry],
+            stage_2_mixture[retry],
+            tolerance=tolerance,
+            max_iterations=max_iterations,
+            coefficients=Mfunc.take_coefficients(coefficients, retry, stage_1_mixture.size),
+        )
+        iterations[retry] += retry_iterations
+
+    return (
+        stage_1_thrust_req.reshape(shape),
+        stage_2_thrust_req.reshape(shape),
+        iterations.reshape(shape),
+        converged.reshape(shape),
+    )
+
+
+# Newton step, relative to thrust, after which the root is reached to rounding (see _stage_thrust_root)
+_NEWTON_STEP_TOLERANCE = np.sqrt(np.finfo(float).eps)
+
+
+def _equivalent_evaluations(stage_newton_steps):
+    # Newton steps on one stage -> thrust_mass_calculations calls, which evaluate both stages
+    return (stage_newton_steps + 1) // 2
+
+
+def _coefficient(coefficients: Optional[Dict], function: str, keyword: str):
+    # MER coefficient override, or the Mass_functions default
+    return Mfunc.mer_kwargs(coefficients, function).get(keyword, Mfunc.MER_COEFFICIENTS[function][keyword])
+
+
+def _stage_thrust_root(
+        constant_mass       : np.ndarray,
+        linear_coefficient  : np.ndarray,
+        gimbal_coefficient  : np.ndarray,
+        gimbal_exponent     : np.ndarray,
+        chamber_pressure    : np.ndarray,
+        thrust_factor       : float,
+        initial_thrust      : Optional[np.ndarray] = None,
+        max_iterations      : int = 50,
+    )-> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Inputs:
+        constant_mass       (np.ndarray): stage mass that does not depend on thrust (kg)
+        linear_coefficient  (np.ndarray): mass per unit thrust (kg/N)
+        gimbal_coefficient, gimbal_exponent, chamber_pressure (np.ndarray): M_gimbals terms
+        thrust_factor       (float)     : required thrust per kg of stage mass, T/W * g_0 * 1.3
+        initial_thrust      (np.ndarray): Newton starting point, defaults to the root without
+                                          the gimbal term (a lower bound)
+        max_iterations      (int)       : Newton iteration limit
+
+    Outputs:
+        thrust      (np.ndarray)        : root of T = thrust_factor * (constant + linear * T + gimbal(T)),
+                                          NaN where there is none
+        iterations  (np.ndarray[int])   : Newton iterations of each design
+        converged   (np.ndarray[bool])  : the root was reached to rounding
+
+    With the default gimbal exponent (< 1) the residual is convex in thrust, so the root is
+    unique and Newton converges after at most one overshoot. The gimbal mass is a small part
+    of the stage mass, which makes the quadratic convergence constant small as well: once a
+    step is below sqrt(eps) of the thrust the next one would be below rounding, so the
+    iteration stops there.
+    """
+    with np.errstate(divide='ignore', invalid='ignore'):
+        if initial_thrust is None:
+            initial_thrust = thrust_factor * constant_mass / (1 - thrust_factor * linear_coefficient)
+        thrust = np.where(initial_thrust > 0, initial_thrust, np.nan)
+
+        iterations = np.zeros(thrust.shape, dtype=int)
+        converged = np.zeros(thrust.shape, dtype=bool)
+        failed = ~np.isfinite(thrust)
+
+        # a handful of steps for every design, cheaper on the whole arrays than under a mask
+        for _ in range(max_iterations):
+            gimbal_mass = gimbal_coefficient * (thrust / chamber_pressure) ** gimbal_exponent
+            residual = thrust - thrust_factor * (constant_mass + linear_coefficient * thrust + gimbal_mass)
+            slope = 1 - thrust_factor * (linear_coefficient + gimbal_exponent * gimbal_mass / thrust)
+            step = np.where(converged, 0, residual / slope)
+
+            thrust = thrust - step
+            iterations += ~(converged | failed)
+
+            converged |= np.abs(step) <= _NEWTON_STEP_TOLERANCE * thrust
+            failed |= ~np.isfinite(thrust) | (thrust <= 0)
+            if np.all(converged | failed):
+                break
+
+    converged &= ~failed
+    thrust[~converged] = np.nan
+    return thrust, iterations, converged
+
+
+def _stage_engine_enumeration(
+        constant_mass       : np.ndarray,
+        engine_thrust       : np.ndarray,
+        expansion_ratio     : np.ndarray,
+        chamber_pressure    : np.ndarray,
+        thrust_factor       : float,
+        coefficients        : Optional[Dict],
+    )-> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    # one stage: smallest self-consistent engine count and its exact thrust, 1-D arrays
+    shape = constant_mass.shape
+    (thrust_coefficient, expansion_coefficient, fixed_mass, struct_coefficient, gimbal_coefficient, gimbal_exponent) = [
+        np.broadcast_to(np.asarray(_coefficient(coefficients, function, keyword), dtype=float), shape)
+        for function, keyword in (
+            ('Rocket_Engine', 'thrust_coefficient'),
+            ('Rocket_Engine', 'expansion_coefficient'),
+            ('Rocket_Engine', 'fixed_mass'),
+            ('Struct_Mass', 'coefficient'),
+            ('M_gimbals', 'coefficient'),
+            ('M_gimbals', 'exponent'),
+        )
+    ]
+
+    # for n engines of thrust T in total: engines n * Rocket_Engine(T / n) = (a + b sqrt(eps)) * T + n * fixed_mass,
+    # thrust structure Struct_Mass(T), gimbals M_gimbals(T)
+    linear_coefficient = thrust_coefficient + expansion_coefficient * np.sqrt(expansion_ratio) + struct_coefficient
+
+    def solve(engine_count, idx):
+        # fixed engine count, from the continuous root which is within a few engines' fixed mass of it
+        return _stage_thrust_root(
+            constant_mass[idx] + engine_count * fixed_mass[idx],
+            linear_coefficient[idx],
+            gimbal_coefficient[idx],
+            gimbal_exponent[idx],
+            chamber_pressure[idx],
+            thrust_factor,
+            initial_thrust=continuous_thrust[idx],
+        )
+
+    # n is self-consistent when (n - 1) * engine_thrust < T_n <= n * engine_thrust. T_n - n * engine_thrust
+    # decreases with n, so the smallest consistent count is the ceiling of the continuous count
+    # n = T / engine_thrust, whose thrust is the root with the fixed engine mass spread per newton
+    continuous_thrust, iterations, _ = _stage_thrust_root(
+        constant_mass,
+        linear_coefficient + fixed_mass / engine_thrust,
+        gimbal_coefficient,
+        gimbal_exponent,
+        chamber_pressure,
+        thrust_factor,
+    )
+    continuous_count = continuous_thrust / engine_thrust
+    engine_count = np.maximum(np.ceil(continuous_count), 1)
+
+    every = np.arange(engine_count.size)
+    thrust, count_iterations, converged = solve(engine_count, every)
+    iterations += count_iterations
+
+    # rounding can put the ceiling one engine off when the continuous count is an integer
+    near = np.flatnonzero(converged & (np.abs(continuous_count - np.round(continuous_count)) < 1e-9))
+    if near.size:
+        too_few = near[thrust[near] > engine_count[near] * engine_thrust[near]]
+        if too_few.size:
+            engine_count[too_few] += 1
+            thrust[too_few], more_iterations, converged[too_few] = solve(engine_count[too_few], too_few)
+            iterations[too_few] += more_iterations
+
+        near = near[engine_count[near] > 1]
+        thrust_fewer, fewer_iterations, converged_fewer = solve(engine_count[near] - 1, near)
+        fewer = converged_fewer & (thrust_fewer <= (engine_count[near] - 1) * engine_thrust[near])
+        thrust[near[fewer]] = thrust_fewer[fewer]
+        iterations[near] += fewer_iterations
+
+    stage_mass = thrust / thrust_factor
+    return thrust, stage_mass, iterations, converged
+
+
+def _stage_engine_enumeration_scalar(
+        constant_mass       : float,
+        engine_thrust       : float,
+        expansion_ratio     : float,
+        chamber_pressure    : float,
+        thrust_factor       : float,
+        max_iterations      : int = 50,
+    )-> Tuple[float, float, int, bool]:
+    # single design version of _stage_engine_enumeration, default MER coefficients
+    engine = Mfunc.MER_COEFFICIENTS['Rocket_Engine']
+    gimbal_coefficient = Mfunc.MER_COEFFICIENTS['M_gimbals']['coefficient']
+    gimbal_exponent = Mfunc.MER_COEFFICIENTS['M_gimbals']['exponent']
+    linear_coefficient = (engine['thrust_coefficient'] + engine['expansion_coefficient'] * math.sqrt(expansion_ratio)
+                          + Mfunc.MER_COEFFICIENTS['Struct_Mass']['coefficient'])
+    fixed_mass = engine['fixed_mass']
+
+    def root(constant, linear, thrust):
+        # Newton on T = thrust_factor * (constant + linear * T + gimbal(T)), see _stage_thrust_root
+        for iteration in range(1, max_iterations + 1):
+            gimbal_mass = gimbal_coefficient * (thrust / chamber_pressure) ** gimbal_exponent
+            residual = thrust - thrust_factor * (constant + linear * thrust + gimbal_mass)
+            slope = 1 - thrust_factor * (linear + gimbal_exponent * gimbal_mass / thrust)
+            step = residual / slope
+            thrust -= step
+            if not thrust > 0:
+                return math.nan, iteration, False
+            if abs(step) <= _NEWTON_STEP_TOLERANCE * thrust:
+                return thrust, iteration, True
+        return math.nan, max_iterations, False
+
+    continuous_linear = linear_coefficient + fixed_mass / engine_thrust
+    if not constant_mass > 0 or not thrust_factor * continuous_linear < 1:
+        return math.nan, math.nan, 0, False
+    continuous_thrust, iterations, converged = root(
+        constant_mass,
+        continuous_linear,
+        thrust_factor * constant_mass / (1 - thrust_factor * continuous_linear),
+    )
+    if not converged:
+        return math.nan, math.nan, iterations, False
+
+    continuous_count = continuous_thrust / engine_thrust
+    engine_count = max(math.ceil(continuous_count), 1)
+    thrust, count_iterations, converged = root(constant_mass + engine_count * fixed_mass, linear_coefficient, continuous_thrust)
+    iterations += count_iterations
+
+    # rounding can put the ceiling one engine off when the continuous count is an integer
+    if converged and abs(continuous_count - round(continuous_count)) < 1e-9:
+        if thrust > engine_count * engine_thrust:
+            engine_count += 1
+            thrust, more_iterations, converged = root(constant_mass + engine_count * fixed_mass, linear_coefficient, continuous_thrust)
+            iterations += more_iterations
+        elif engine_count > 1:
+            thrust_fewer, fewer_iterations, converged_fewer = root(
+                constant_mass + (engine_count - 1) * fixed_mass, linear_coefficient, continuous_thrust)
+            iterations += fewer_iterations
+            if converged_fewer and thrust_fewer <= (engine_count - 1) * engine_thrust:
+                thrust = thrust_fewer
+
+    if not converged:
+        return math.nan, math.nan, iterations, False
+    return thrust, thrust / thrust_factor, iterations, True
+
+
+def thrust_enumeration_batch(
+        m_pr_1                  : np.ndarray,
+        m_pr_2                  : np.ndarray,
+        m_pl                    : np.ndarray,
+        stage_1_other_masses    : np.ndarray,
+        stage_2_other_masses    : np.ndarray,
+        stage_1_mixture,
+        stage_2_mixture,
+        coefficients            : Optional[Dict] = None,
+    )-> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Inputs:
+        same as thrust_convergance_batch, without the gross masses: no initial thrust is needed
+
+    Outputs:
+        stage_1_thrust_req (np.ndarray)      : the required thrust for stage 1
+        stage_2_thrust_req (np.ndarray)      : the required thrust for stage 2
+        iterations         (np.ndarray[int]) : equivalent thrust_mass_calculations calls of each design,
+                                               Newton steps of both stages / 2 rounded up
+        converged          (np.ndarray[bool]): True where both stages have a solution
+
+    Exact fixed point of thrust_mass_calculations, solved by enumerating engine counts
+    instead of iterating on thrust. For a fixed engine count n the stage mass is
+        constant + (a + b sqrt(eps) + s) * T + n * fixed_mass + gimbal(T)
+    so the thrust requirement T = T/W * g_0 * 1.3 * mass is one equation in T, solved
+    by Newton to a few ulp. Stage 2 does not depend on stage 1 and is solved first, its
+    total mass is then part of the stage 1 constant mass.
+
+    Each stage takes the smallest self-consistent engine count: its thrust needs exactly
+    that many engines. Right above an engine count boundary n + 1 engines can be
+    self-consistent as well (the extra engine's fixed mass pushes the thrust just past it),
+    the fixed point iteration may land on either, this solver always returns the lighter one.
+    The result only depends on the inputs, not on a starting point or tolerance.
+
+    A thrust_mass_calculations call evaluates the thrust dependent masses of both stages,
+    a Newton step those of one stage, so two Newton steps count as one call and the
+    iterations can be compared with those of the fixed point iteration.
+    """
+    stage_1_mixture = to_mixture_codes(stage_1_mixture)
+    stage_2_mixture = to_mixture_codes(stage_2_mixture)
+
+    inputs = np.broadcast_arrays(
+        np.asarray(m_pr_1, dtype=float),
+        np.asarray(m_pr_2, dtype=float),
+        np.asarray(m_pl, dtype=float),
+        np.asarray(stage_1_other_masses, dtype=float),
+        np.asarray(stage_2_other_masses, dtype=float),
+        stage_1_mixture,
+        stage_2_mixture,
+    )
+    shape = inputs[0].shape
+    (m_pr_1, m_pr_2, m_pl, stage_1_other_masses, stage_2_other_masses,
+     stage_1_mixture, stage_2_mixture) = [x.ravel() for x in inputs]
+
+    # only the designs with finite inputs (e.g. physical dV splits) are solved
+    finite = np.ones(m_pr_1.shape, dtype=bool)
+    for x in (m_pr_1, m_pr_2, m_pl, stage_1_other_masses, stage_2_other_masses):
+        finite &= np.isfinite(x)
+    idx = np.flatnonzero(finite)
+    coefficients = Mfunc.take_coefficients(coefficients, idx, m_pr_1.size)
+    s1, s2 = stage_1_mixture[idx], stage_2_mixture[idx]
+
+    stage_2_thrust, stage_2_total_mass, stage_2_iterations, stage_2_converged = _stage_engine_enumeration(
+        m_pr_2[idx] + stage_2_other_masses[idx] + m_pl[idx],
+        _Thrust_stage2[s2],
+        _Expansion_ratio_stage2[s2],
+        _Chamber_pressure_stage2[s2],
+        T_W_req_stage_2 * g_0 * 1.3,
+        coefficients,
+    )
+    stage_1_thrust, _, stage_1_iterations, stage_1_converged = _stage_engine_enumeration(
+        m_pr_1[idx] + stage_1_other_masses[idx] + stage_2_total_mass,
+        _Thrust_stage1[s1],
+        _Expansion_ratio_stage1[s1],
+        _Chamber_pressure_stage1[s1],
+        T_W_req_stage_1 * g_0 * 1.3,
+        coefficients,
+    )
+
+    stage_1_thrust_req = np.full(m_pr_1.shape, np.nan)
+    stage_2_thrust_req = np.full(m_pr_1.shape, np.nan)
+    iterations = np.zeros(m_pr_1.shape, dtype=int)
+    converged = np.zeros(m_pr_1.shape, dtype=bool)
+    stage_1_thrust_req[idx] = stage_1_thrust
+    stage_2_thrust_req[idx] = stage_2_thrust
+    iterations[idx] = _equivalent_evaluations(stage_1_iterations + stage_2_iterations)
+    converged[idx] = stage_1_converged & stage_2_converged
+
+    return (
+        stage_1_thrust_req.reshape(shape),
+        stage_2_thrust_req.reshape(shape),
+        iterations.reshape(shape),
+        converged.reshape(shape),
+    )
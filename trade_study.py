@@ -0,0 +1,170 @@
+import numpy as np
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import Check_Solid_and_Storables as css
+import design_pipeline as dp
+import mass_estimation_part2 as me2
+import sweep
+
+from design_pipeline import INPUT_COLUMNS, OUTPUT_COLUMNS, STATUS_COLUMNS
+from dictionaries import mixture_names
+
+
+'''
+Branch-and-bound trade study over the mixture pairs.
+
+Every mixture pair gets a cheap lower bound on the objective, valid for every design of
+the pair in the study grid. Pairs are then fully evaluated (every X and radius of the grid)
+in order of increasing bound, and the study stops as soon as the next bound is no better
+than the best design found: none of the remaining pairs can beat it.
+
+The bound uses only the radius independent part of the mass budget:
+    propellant masses from mass_estimation, plus the mass margin times the tank / casing
+    masses of Check_Solid_and_Storables (tank mass depends on volume only).
+Insulation, engines, thrust structure, gimbals, fairings, wiring and avionics are all
+positive and left out, and the costs are increasing in the inert mass, so
+    bound <= total_mass, total_cost, total_cost_with_margin
+of every design of the pair, for the default MER coefficients.
+
+Usage Examples:
+    result = branch_and_bound(X_values = np.arange(1, 100, 0.1), stage_1_radii = [2.6, 5.2, 7.8])
+    print(result.best['s1_prop_mix'], result.best['s2_prop_mix'], result.best['total_mass'])
+    print(len(result.pruned), 'of', len(result.bounds), 'pairs skipped')
+'''
+
+OBJECTIVES = [
+    'total_mass',
+    'total_cost',
+    'total_cost_with_margin',
+]
+
+
+@dataclass(slots=True)
+class TradeStudyResult:
+    best        : Optional[Dict[str, object]]       # row of the best design, None if no design is feasible
+    objective   : str
+    bounds      : Dict[Tuple[str, str], float]      # lower bound of every pair
+    evaluated   : List[Tuple[str, str]] = field(default_factory=list)
+    pruned      : List[Tuple[str, str]] = field(default_factory=list)
+    evaluations : int = 0                           # designs evaluated
+
+
+def pair_lower_bound(
+        X               : np.ndarray,
+        s1_prop_mix     : str,
+        s2_prop_mix     : str,
+        objective       : str = 'total_mass',
+    )-> float:
+    """
+    Inputs:
+        X           (np.ndarray): stage 1 dV fraction percentages of the study
+        s1_prop_mix (str)       : stage 1 propellant name
+        s2_prop_mix (str)       : stage 2 propellant name
+        objective   (str)       : one of OBJECTIVES
+
+    Output:
+        bound (float): lower bound of the objective over every design of the pair at these X,
+            inf if none of them is physical
+    """
+    if objective not in OBJECTIVES:
+        raise ValueError(f'Unsupported objective {objective}, use one of {", ".join(OBJECTIVES)}')
+
+    m_pr_1, m_pr_2, m_0, m_0_2 = me2.mass_estimation(np.asarray(X, dtype=float), s1_prop_mix, s2_prop_mix)
+    physical = (m_0 > 0) & (m_0_2 > 0)
+    if not np.any(physical):
+        return np.inf
+    m_pr_1 = m_pr_1[physical]
+    m_pr_2 = m_pr_2[physical]
+
+    # tank / casing mass does not depend on the tank radius
+    s1_tanks_mass = css.Check_Solid_and_Storables(s1_prop_mix, m_pr_1)[2]
+    s2_tanks_mass = css.Check_Solid_and_Storables(s2_prop_mix, m_pr_2)[2]
+
+    if objective == 'total_mass':
+        bound = m_pr_1 + m_pr_2 + dp.MASS_MARGIN * (s1_tanks_mass + s2_tanks_mass)
+    else:
+        margin = dp.MASS_MARGIN if objective == 'total_cost_with_margin' else 1
+        bound = me2.stage_nre_cost(margin * s1_tanks_mass) + me2.stage_nre_cost(margin * s2_tanks_mass)
+
+    return float(np.min(bound))
+
+
+def branch_and_bound(
+        X_values        : Iterable[float] = np.arange(1, 100, 0.1),
+        stage_1_radii   : Iterable[float] = (2.6 * 3,),
+        stage_2_radii   : Iterable[float] = (2.6,),
+        nose_h          : float = 6,
+        nose_r          : float = 2.6,
+        m_pl            : float = 26000,
+        objective       : str = 'total_mass',
+        s1_mixtures     : Optional[Iterable[str]] = None,
+        s2_mixtures     : Optional[Iterable[str]] = None,
+        chunk_size      : int = sweep.CHUNK_SIZE,
+    )-> TradeStudyResult:
+    """
+    Inputs:
+        see sweep.sweep for the design space arguments
+        objective   (str)   : one of OBJECTIVES, minimised
+        chunk_size  (int)   : designs evaluated per batch
+
+    Output:
+        result (TradeStudyResult): best design over every pair, the pair bounds and which
+            pairs were evaluated or pruned. The best design is the same a full sweep of the
+            grid (feasible_only=True) would find.
+    """
+    s1_mixtures = mixture_names if s1_mixtures is None else list(s1_mixtures)
+    s2_mixtures = mixture_names if s2_mixtures is None else list(s2_mixtures)
+    X_values = np.asarray(list(X_values), dtype=float)
+    stage_1_radii = list(stage_1_radii)
+    stage_2_radii = list(stage_2_radii)
+
+    # bound over the X the sweep evaluates for the pair
+    bounds = {}
+    for s1_prop_mix in s1_mixtures:
+        for s2_prop_mix in s2_mixtures:
+            X_min, X_max = me2.feasible_X_window(s1_prop_mix, s2_prop_mix, me2.MIN_PAYLOAD_FRACTION)
+            X_pair = X_values[(X_values > X_min) & (X_values < X_max)]
+            bounds[(s1_prop_mix, s2_prop_mix)] = pair_lower_bound(X_pair, s1_prop_mix, s2_prop_mix, objective)
+
+    result = TradeStudyResult(best=None, objective=objective, bounds=bounds)
+    best_value = np.inf
+
+    for pair in sorted(bounds, key=bounds.get):
+        if not bounds[pair] < best_value:
+            result.pruned.append(pair)
+            continue
+
+        result.evaluated.append(pair)
+        for designs in sweep.sweep_chunks(
+                [pair[0]],
+                [pair[1]],
+                X_values,
+                stage_1_radii,
+                stage_2_radii,
+                nose_h=nose_h,
+                nose_r=nose_r,
+                m_pl=m_pl,
+                chunk_size=chunk_size,
+                feasible_only=True):
+            result.evaluations += len(designs['X'])
+
+            values = np.where(designs['feasible'], designs[objective], np.nan)
+            if np.all(np.isnan(values)):
+                continue
+            i = int(np.nanargmin(values))
+            if values[i] < best_value:
+                best_value = values[i]
+                result.best = {
+                    column: designs[column][i]
+                    for column in INPUT_COLUMNS + OUTPUT_COLUMNS + STATUS_COLUMNS
+                }
+
+    return result
+
+
+if __name__ == '__main__':
+    result = branch_and_bound()
+    print(f"Best: {result.best['s1_prop_mix']} / {result.best['s2_prop_mix']} at X = {result.best['X']:.1f} %, "
+          f"{result.objective} = {result.best[result.objective]:.3f}")
+    print(f'{len(result.evaluated)} pairs evaluated, {len(result.pruned)} pruned, {result.evaluations} designs')